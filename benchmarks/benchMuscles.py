@@ -0,0 +1,177 @@
+# Headless benchmark for the muscle generator
+# -----------------------------------
+# Runs muscleGenerator.core on plain Python against the recording maya stand-in in benchmarks/fake_maya,
+# which keeps the node graph in memory and counts and times every maya.cmds call.
+#
+#   python benchmarks/benchMuscles.py                      compare 1/10/100/1000 muscles against baseline.json
+#   python benchmarks/benchMuscles.py --sizes 1 10         only some sizes
+#   python benchmarks/benchMuscles.py --update-baseline    store the current numbers as the new baseline
+#
+# Exits with 1 when a phase issues more commands per muscle than the baseline, or gets slower per muscle than
+# the time tolerance allows.
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, 'fake_maya'))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from maya import _fake, cmds as mc
+from muscleGenerator import core as muscleGenerator
+
+DEFAULT_SIZES = (1, 10, 100, 1000)
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+PHASES = ('create', 'update', 'createDataNode', 'addSetDrivenKey', 'edit', 'mirror')
+
+
+def buildAttachJoints(muscleCount):
+    #one upper/lower joint pair per muscle on each side, Right mirrors Left across X
+    for side, sign in (('L', 1.0), ('R', -1.0)):
+        for index in range(muscleCount):
+            mc.select(clear=True)
+            mc.joint(name='{0}_upper{1}'.format(side, index), position=(sign * (2.0 + index), 10.0, 0.0))
+            mc.select(clear=True)
+            mc.joint(name='{0}_lower{1}'.format(side, index), position=(sign * (2.0 + index), 0.0, 1.0))
+
+
+def measure(muscleCount, action):
+    #Run action once and return the command count, API call count, wall time and peak memory it took
+    _fake.stats.reset()
+    tracemalloc.reset_peak()
+    memoryStart = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    action()
+    seconds = time.perf_counter() - start
+    peakMemory = tracemalloc.get_traced_memory()[1] - memoryStart
+    return {'commands': _fake.stats.total,
+            'commandsPerMuscle': _fake.stats.total / float(muscleCount),
+            'apiCallsPerMuscle': _fake.stats.apiCalls / float(muscleCount),
+            'seconds': seconds,
+            'secondsPerMuscle': seconds / muscleCount,
+            'peakMemory': peakMemory,
+            'commandCounts': dict(_fake.stats.counts)}
+
+
+def benchmarkSize(muscleCount):
+    _fake.reset()
+    muscleGenerator.muscleRegistry = None
+    #the fake scene drops its callbacks on reset, let the node handles register theirs again
+    muscleGenerator.removeNodeHandleCallbacks()
+    buildAttachJoints(muscleCount)
+    muscleGroups = []
+
+    def create():
+        for index in range(muscleCount):
+            muscleGroups.append(muscleGenerator.MuscleJointGroup.createFromAttachObjects(
+                'Left_muscle{0}'.format(index), 'L_upper{0}'.format(index), 'L_lower{0}'.format(index), 0.5, 1.5))
+
+    def update():
+        for index, muscleGroup in enumerate(muscleGroups):
+            mc.xform(muscleGroup.centerLoc, translation=(3.0 + index, 5.0, 1.5), worldSpace=True)
+            muscleGroup.update()
+
+    def createDataNode():
+        for muscleGroup in muscleGroups:
+            muscleGroup.createDataNode()
+
+    def addSetDrivenKey():
+        for muscleGroup in muscleGroups:
+            muscleGroup.removeVolumeDriver()
+            muscleGroup.addSetDrivenKey()
+
+    def edit():
+        for muscleGroup in muscleGroups:
+            muscleGroup.edit()
+
+    def mirror():
+        muscleGenerator.mirrorAll(side='Left', axis='x')
+
+    actions = {'create': create, 'update': update, 'createDataNode': createDataNode,
+               'addSetDrivenKey': addSetDrivenKey, 'edit': edit, 'mirror': mirror}
+    tracemalloc.start()
+    try:
+        return dict((phase, measure(muscleCount, actions[phase])) for phase in PHASES)
+    finally:
+        tracemalloc.stop()
+
+
+def runBenchmarks(sizes):
+    return dict((str(size), benchmarkSize(size)) for size in sizes)
+
+
+def printResults(results):
+    print("{0:>6} {1:<16} {2:>10} {3:>10} {4:>10} {5:>12} {6:>10}".format(
+        'muscles', 'phase', 'cmds', 'cmds/mus', 'api/mus', 'ms/mus', 'peak KB'))
+    for size, phases in results.items():
+        for phase, result in phases.items():
+            print("{0:>6} {1:<16} {2:>10} {3:>10.1f} {4:>10.1f} {5:>12.3f} {6:>10.1f}".format(
+                size, phase, result['commands'], result['commandsPerMuscle'], result['apiCallsPerMuscle'],
+                result['secondsPerMuscle'] * 1000.0, result['peakMemory'] / 1024.0))
+
+
+#Return a list of regression messages, the command count must not grow at all, time may grow by timeTolerance
+def compareToBaseline(results, baseline, timeTolerance):
+    regressions = []
+    for size, phases in results.items():
+        for phase, result in phases.items():
+            stored = baseline.get(size, {}).get(phase)
+            if stored is None:
+                continue
+            if result['commandsPerMuscle'] > stored['commandsPerMuscle'] + 1e-9:
+                regressions.append("{0} muscles, {1}: {2:.1f} commands per muscle, baseline {3:.1f}".format(
+                    size, phase, result['commandsPerMuscle'], stored['commandsPerMuscle']))
+            if result['secondsPerMuscle'] > stored['secondsPerMuscle'] * (1.0 + timeTolerance):
+                regressions.append("{0} muscles, {1}: {2:.3f}ms per muscle, baseline {3:.3f}ms".format(
+                    size, phase, result['secondsPerMuscle'] * 1000.0, stored['secondsPerMuscle'] * 1000.0))
+    return regressions
+
+
+def storedResults(results):
+    #only the numbers the comparison needs go into the baseline file
+    return dict((size, dict((phase, {'commandsPerMuscle': result['commandsPerMuscle'],
+                                     'secondsPerMuscle': result['secondsPerMuscle'],
+                                     'peakMemory': result['peakMemory']})
+                            for phase, result in phases.items()))
+                for size, phases in results.items())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark muscle builds against a recording maya stand-in")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--time-tolerance', type=float, default=1.0,
+                        help="allowed slowdown per muscle before failing, 1.0 means twice as slow")
+    parser.add_argument('--json', help="also write the full results to this file")
+    args = parser.parse_args(argv)
+
+    results = runBenchmarks(args.sizes)
+    printResults(results)
+    if args.json:
+        with open(args.json, 'w') as resultFile:
+            json.dump(results, resultFile, indent=2, sort_keys=True)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baselineFile:
+            baseline = json.load(baselineFile)
+
+    if args.update_baseline:
+        baseline.update(storedResults(results))
+        with open(args.baseline, 'w') as baselineFile:
+            json.dump(baseline, baselineFile, indent=2, sort_keys=True)
+        print("Baseline written to {0}".format(args.baseline))
+        return 0
+
+    regressions = compareToBaseline(results, baseline, args.time_tolerance)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,38 @@
+# Stand-in for the parts of maya.OpenMaya (API 1.0) the tool uses.
+import math
+
+
+class MVector(object):
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        if isinstance(x, MVector):
+            x, y, z = x.x, x.y, x.z
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __add__(self, other):
+        return MVector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return MVector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, scalar):
+        if isinstance(scalar, MVector):
+            return self.x * scalar.x + self.y * scalar.y + self.z * scalar.z
+        return MVector(self.x * scalar, self.y * scalar, self.z * scalar)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return MVector(-self.x, -self.y, -self.z)
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normal(self):
+        length = self.length()
+        return MVector(self) if not length else self * (1.0 / length)
+
+    def __repr__(self):
+        return 'MVector({0}, {1}, {2})'.format(self.x, self.y, self.z)
@@ -0,0 +1 @@
+# Headless stand-in for the maya package used by the muscle benchmarks.
@@ -0,0 +1,544 @@
+# In-memory stand-in for the Maya dependency graph.
+#
+# Only what the muscle generator touches is modelled: DAG parenting with
+# translation-only world space, user attributes, plug connections with pull
+# evaluation, point constraints, driven-key curves and a handful of utility
+# nodes.  Every command issued through the fake maya.cmds is counted and
+# timed in stats so benchmarks can report commands per muscle.
+import pickle
+import re
+import time
+import uuid as _uuid
+
+
+XYZ = ('X', 'Y', 'Z')
+RGB = ('R', 'G', 'B')
+
+# Compound attributes shared by every DAG node
+DAG_COMPOUNDS = {
+    'translate': tuple('translate' + a for a in XYZ),
+    'rotate': tuple('rotate' + a for a in XYZ),
+    'scale': tuple('scale' + a for a in XYZ),
+    'jointOrient': tuple('jointOrient' + a for a in XYZ),
+    'localScale': tuple('localScale' + a for a in XYZ),
+    'constraintTranslate': tuple('constraintTranslate' + a for a in XYZ),
+    'constraintRotate': tuple('constraintRotate' + a for a in XYZ),
+}
+
+TYPE_COMPOUNDS = {
+    'multiplyDivide': {
+        'input1': tuple('input1' + a for a in XYZ),
+        'input2': tuple('input2' + a for a in XYZ),
+        'output': tuple('output' + a for a in XYZ),
+    },
+    'setRange': dict((name, tuple(name + a for a in XYZ))
+                     for name in ('value', 'min', 'max', 'oldMin', 'oldMax', 'outValue')),
+    'plusMinusAverage': {
+        'output3D': tuple('output3D' + a for a in 'xyz'),
+    },
+    'blendColors': {
+        'color1': tuple('color1' + a for a in RGB),
+        'color2': tuple('color2' + a for a in RGB),
+        'output': tuple('output' + a for a in RGB),
+    },
+    'condition': dict((name, tuple(name + a for a in RGB)) for name in ('colorIfTrue', 'colorIfFalse', 'outColor')),
+    'pairBlend': dict((name.format(''), tuple(name.format(a) for a in XYZ))
+                      for name in ('inTranslate{0}1', 'inTranslate{0}2', 'inRotate{0}1', 'inRotate{0}2',
+                                   'outTranslate{0}', 'outRotate{0}')),
+}
+
+ALIASES = {
+    't': 'translate', 'r': 'rotate', 's': 'scale', 'jo': 'jointOrient', 'v': 'visibility',
+    'tx': 'translateX', 'ty': 'translateY', 'tz': 'translateZ',
+    'rx': 'rotateX', 'ry': 'rotateY', 'rz': 'rotateZ',
+    'sx': 'scaleX', 'sy': 'scaleY', 'sz': 'scaleZ',
+    'ssc': 'segmentScaleCompensate', 'ro': 'rotateOrder',
+}
+
+INPUT3D_PATTERN = re.compile(r'^input3D\[(\d+)\]$')
+
+DAG_TYPES = ('transform', 'joint', 'locator', 'mesh')
+SHAPE_TYPES = ('locator', 'mesh')
+
+VALID_DATA_TYPES = (
+    'string', 'stringArray', 'matrix', 'float2', 'float3', 'double2', 'double3',
+    'long2', 'long3', 'short2', 'short3', 'doubleArray', 'floatArray', 'Int32Array',
+    'vectorArray', 'pointArray', 'mesh', 'nurbsCurve', 'nurbsSurface', 'lattice',
+)
+
+VALID_ATTRIBUTE_TYPES = (
+    'bool', 'long', 'short', 'byte', 'char', 'enum', 'float', 'double', 'doubleAngle',
+    'doubleLinear', 'compound', 'message', 'time', 'fltMatrix', 'float2', 'float3',
+    'double2', 'double3', 'long2', 'long3', 'short2', 'short3', 'matrix',
+)
+
+
+class MayaError(RuntimeError):
+    pass
+
+
+class Stats(object):
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = {}
+        self.times = {}
+        self.apiCalls = 0
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def record(self, name, elapsed):
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.times[name] = self.times.get(name, 0.0) + elapsed
+
+
+stats = Stats()
+
+
+class Node(object):
+    def __init__(self, name, nodeType):
+        self.name = name
+        self.type = nodeType
+        self.parent = None
+        self.children = []
+        self.attrs = {}
+        self.userAttrs = {}
+        self.uuid = str(_uuid.uuid4()).upper()
+        self.keys = []
+        self.constraint = None
+        self.alive = True
+        # mesh vertex positions in object space
+        self.points = []
+        # connected attribute names, kept in step with Scene.sources/dests so lookups stay per node
+        self.inputs = {}
+        self.outputs = {}
+        # last computed outputs, what a node with a blocking nodeState keeps handing out
+        self.lastOutputs = {}
+        # skinCluster: bound geometry, influence nodes and per vertex {influenceIndex: weight}
+        self.skin = None
+
+    @property
+    def isDag(self):
+        return self.type in DAG_TYPES or self.type.endswith('Constraint')
+
+    def __repr__(self):
+        return '<Node {0} ({1})>'.format(self.name, self.type)
+
+
+class Scene(object):
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.clearNodes()
+        self.time = 1.0
+        self.sceneName = ''
+        self.deferred = []
+        self.nodeAddedCallbacks = {}
+        self.nodeRemovedCallbacks = {}
+        self.nameChangedCallbacks = {}
+        self.attributeChangedCallbacks = {}
+        self.timeChangedCallbacks = {}
+        self.dagChangedCallbacks = {}
+        self.sceneCallbacks = {}
+        self.callbackIds = iter(range(1, 1 << 30))
+        self.evalCache = None
+        self.undoChunkDepth = 0
+        self.undoEnabled = True
+        self.refreshSuspended = False
+
+    def clearNodes(self):
+        # file -new / -open: callbacks survive, like they do in Maya
+        self.nodes = {}
+        self.sources = {}
+        self.dests = {}
+        self.selection = []
+
+    # file -save / -open: the node graph is pickled to the scene path, so a scene saved by one process
+    # (a batch worker, a test) can be opened by another
+    def saveFile(self, path):
+        with open(path, 'wb') as sceneFile:
+            pickle.dump((self.nodes, self.sources, self.dests), sceneFile)
+
+    def loadFile(self, path):
+        with open(path, 'rb') as sceneFile:
+            self.nodes, self.sources, self.dests = pickle.load(sceneFile)
+
+    def sendSceneMessage(self, message):
+        for callback, messageFilter, clientData in list(self.sceneCallbacks.values()):
+            if messageFilter == message:
+                callback(clientData)
+
+    # ------------------------------------------------------------------ nodes
+    def uniqueName(self, name):
+        if name not in self.nodes:
+            return name
+        stem = re.sub(r'\d+$', '', name)
+        for index in range(1, 1 << 30):
+            candidate = '{0}{1}'.format(stem, index)
+            if candidate not in self.nodes:
+                return candidate
+
+    def createNode(self, nodeType, name=None, parent=None):
+        name = self.uniqueName(name or '{0}1'.format(nodeType))
+        node = Node(name, nodeType)
+        self.nodes[name] = node
+        if parent is not None:
+            self.setParent(node, parent, keepWorld=False)
+        for callback, nodeFilter, clientData in list(self.nodeAddedCallbacks.values()):
+            if nodeFilter in (None, nodeType):
+                callback(node, clientData)
+        return node
+
+    def node(self, name):
+        if isinstance(name, Node):
+            return name
+        if name is None:
+            raise MayaError('No object name specified.')
+        shortName = name.split('|')[-1]
+        if shortName not in self.nodes:
+            raise MayaError("No object matches name: {0}".format(name))
+        return self.nodes[shortName]
+
+    def exists(self, name):
+        try:
+            if '.' in name:
+                node, attr = self.plug(name)
+                return self.hasAttr(node, attr)
+            self.node(name)
+            return True
+        except MayaError:
+            return False
+
+    def rename(self, node, newName):
+        old = node.name
+        newName = self.uniqueName(newName)
+        del self.nodes[old]
+        node.name = newName
+        self.nodes[newName] = node
+        for callback, nodeFilter, clientData in list(self.nameChangedCallbacks.values()):
+            if nodeFilter in (None, node):
+                callback(node, old, clientData)
+        return newName
+
+    def delete(self, node):
+        if not node.alive:
+            return
+        for child in list(node.children):
+            self.delete(child)
+        for callback, nodeFilter, clientData in list(self.nodeRemovedCallbacks.values()):
+            if nodeFilter in (None, node.type):
+                callback(node, clientData)
+        upstreamCurves = set()
+        for attr in list(node.inputs):
+            src = self.sources[(node, attr)]
+            if src[0].type.startswith('animCurve'):
+                upstreamCurves.add(src[0])
+            self.unlink(src, (node, attr))
+        for attr in list(node.outputs):
+            for dst in list(self.dests[(node, attr)]):
+                self.disconnect((node, attr), dst)
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        node.alive = False
+        self.nodes.pop(node.name, None)
+        if node in self.selection:
+            self.selection.remove(node)
+        # curves left driving nothing are deleted with their node, like Maya does
+        for curve in upstreamCurves:
+            if curve.alive and not self.dests.get((curve, 'output')):
+                self.delete(curve)
+
+    def setParent(self, node, parent, keepWorld=True):
+        world = self.worldPosition(node) if keepWorld else None
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        node.parent = parent
+        if parent is not None:
+            parent.children.append(node)
+        if keepWorld and not self.isConnected(node, 'translateX'):
+            self.setWorldPosition(node, world)
+        for callback, clientData in list(self.dagChangedCallbacks.values()):
+            callback(node, clientData)
+
+    # -------------------------------------------------------------- attributes
+    def plug(self, plugName):
+        nodeName, attr = plugName.split('.', 1)
+        return self.node(nodeName), ALIASES.get(attr, attr)
+
+    def children(self, node, attr):
+        if attr in node.userAttrs and node.userAttrs[attr].get('children'):
+            return tuple(node.userAttrs[attr]['children'])
+        typeCompounds = TYPE_COMPOUNDS.get(node.type, {})
+        if attr in typeCompounds:
+            return typeCompounds[attr]
+        if node.isDag and attr in DAG_COMPOUNDS:
+            return DAG_COMPOUNDS[attr]
+        if node.type == 'plusMinusAverage' and INPUT3D_PATTERN.match(attr):
+            return tuple('{0}.input3D{1}'.format(attr, a) for a in 'xyz')
+        return ()
+
+    def hasAttr(self, node, attr):
+        base = attr.split('[')[0].split('.')[0]
+        if base in node.userAttrs or attr in node.attrs:
+            return True
+        if node.isDag and (base in DAG_COMPOUNDS or any(base in c for c in DAG_COMPOUNDS.values())):
+            return True
+        if node.isDag and base in ('worldMatrix', 'matrix', 'worldInverseMatrix', 'parentMatrix'):
+            return True
+        if base in ('message', 'nodeState', 'visibility', 'radius', 'segmentScaleCompensate',
+                    'overrideEnabled', 'overrideDisplayType', 'overrideColor', 'rotateOrder'):
+            return True
+        for name, children in TYPE_COMPOUNDS.get(node.type, {}).items():
+            if base == name or base in children:
+                return True
+        return node.type in ('multiplyDivide', 'setRange', 'plusMinusAverage', 'blendColors', 'condition',
+                             'pairBlend') \
+            or node.type.startswith('animCurve') or node.type.endswith('Constraint') \
+            or node.type in ('muscleSolver', 'skinCluster')
+
+    def default(self, attr):
+        if attr.startswith('scale') or attr in ('visibility', 'radius', 'segmentScaleCompensate'):
+            return 1.0
+        if attr.startswith('localScale'):
+            return 1.0
+        return 0.0
+
+    def isConnected(self, node, attr):
+        return (node, attr) in self.sources
+
+    # Reads are memoized for the duration of one top-level query, nothing can change while it runs.
+    # Without this every pointConstraint axis re-evaluates its targets' whole parent chains.
+    def value(self, node, attr):
+        if self.evalCache is None:
+            self.evalCache = {}
+            try:
+                return self.value(node, attr)
+            finally:
+                self.evalCache = None
+        key = (node, attr)
+        if key not in self.evalCache:
+            self.evalCache[key] = self.evaluate(node, attr)
+        return self.evalCache[key]
+
+    def evaluate(self, node, attr):
+        children = self.children(node, attr)
+        if children:
+            return tuple(self.value(node, child) for child in children)
+        source = self.sources.get((node, attr))
+        if source is not None:
+            return self.value(*source)
+        nodeState = self.value(node, 'nodeState') if 'nodeState' in node.inputs else node.attrs.get('nodeState', 0)
+        if int(nodeState) == 0:
+            computed = self.compute(node, attr)
+            if computed is not None:
+                node.lastOutputs[attr] = computed
+                return computed
+        elif attr in node.lastOutputs:
+            return node.lastOutputs[attr]
+        if attr in node.attrs:
+            return node.attrs[attr]
+        if attr in node.userAttrs:
+            return node.userAttrs[attr].get('default')
+        return self.default(attr)
+
+    def setValue(self, node, attr, value):
+        children = self.children(node, attr)
+        if children:
+            for child, childValue in zip(children, value):
+                self.setValue(node, child, childValue)
+            return
+        node.attrs[attr] = value
+        for callback, nodeFilter, clientData in list(self.attributeChangedCallbacks.values()):
+            if nodeFilter is node:
+                callback(node, attr, clientData)
+
+    # ------------------------------------------------------------- connections
+    def connect(self, src, dst, force=False):
+        srcChildren = self.children(*src)
+        dstChildren = self.children(*dst)
+        if srcChildren and dstChildren:
+            for srcChild, dstChild in zip(srcChildren, dstChildren):
+                self.connect((src[0], srcChild), (dst[0], dstChild), force)
+            return
+        if dst in self.sources:
+            if self.sources[dst] == src:
+                raise MayaError('{0}.{1} is already connected to {2}.{3}'.format(
+                    src[0].name, src[1], dst[0].name, dst[1]))
+            if not force:
+                raise MayaError('{0}.{1} already has an incoming connection'.format(*[dst[0].name, dst[1]]))
+            self.disconnect(self.sources[dst], dst)
+        self.link(src, dst)
+
+    def link(self, src, dst):
+        self.sources[dst] = src
+        self.dests.setdefault(src, []).append(dst)
+        dst[0].inputs[dst[1]] = True
+        src[0].outputs[src[1]] = True
+
+    def unlink(self, src, dst):
+        del self.sources[dst]
+        self.dests[src].remove(dst)
+        del dst[0].inputs[dst[1]]
+        if not self.dests[src]:
+            del self.dests[src]
+            del src[0].outputs[src[1]]
+
+    def disconnect(self, src, dst):
+        srcChildren = self.children(*src)
+        dstChildren = self.children(*dst)
+        if srcChildren and dstChildren:
+            for srcChild, dstChild in zip(srcChildren, dstChildren):
+                self.disconnect((src[0], srcChild), (dst[0], dstChild))
+            return
+        if self.sources.get(dst) != src:
+            return
+        # a destination keeps the value it had when the connection broke
+        try:
+            dst[0].attrs[dst[1]] = self.value(*dst)
+        except (MayaError, RecursionError, TypeError):
+            pass
+        self.unlink(src, dst)
+
+    # ------------------------------------------------------------- world space
+    def localTranslate(self, node):
+        return [float(self.value(node, 'translate' + a)) for a in XYZ]
+
+    def worldPosition(self, node):
+        if self.evalCache is None:
+            self.evalCache = {}
+            try:
+                return self.worldPosition(node)
+            finally:
+                self.evalCache = None
+        key = (node, None)
+        if key not in self.evalCache:
+            self.evalCache[key] = self.evaluateWorldPosition(node)
+        return list(self.evalCache[key])
+
+    def evaluateWorldPosition(self, node):
+        position = [0.0, 0.0, 0.0]
+        current = node
+        while current is not None:
+            local = self.localTranslate(current)
+            position = [p + l for p, l in zip(position, local)]
+            current = current.parent
+        return position
+
+    def parentWorld(self, node):
+        return self.worldPosition(node.parent) if node.parent is not None else [0.0, 0.0, 0.0]
+
+    def setWorldPosition(self, node, world):
+        parentWorld = self.parentWorld(node)
+        for axis, w, p in zip(XYZ, world, parentWorld):
+            node.attrs['translate' + axis] = w - p
+
+    # ---------------------------------------------------------------- compute
+    def compute(self, node, attr):
+        nodeType = node.type
+        if nodeType == 'pointConstraint' and attr.startswith('constraintTranslate'):
+            data = node.constraint
+            targets = [self.worldPosition(t) for t in data['targets'] if t.alive]
+            if not targets:
+                return None
+            average = [sum(p[i] for p in targets) / len(targets) for i in range(3)]
+            parentWorld = self.parentWorld(data['driven'])
+            index = XYZ.index(attr[-1])
+            return average[index] - parentWorld[index] + data['offset'][index]
+        if nodeType.startswith('animCurve') and attr == 'output':
+            if not node.keys:
+                return 0.0
+            x = float(self.value(node, 'input'))
+            keys = sorted(node.keys)
+            if x <= keys[0][0]:
+                return keys[0][1]
+            if x >= keys[-1][0]:
+                return keys[-1][1]
+            for (x0, y0), (x1, y1) in zip(keys, keys[1:]):
+                if x0 <= x <= x1:
+                    return y0 + (y1 - y0) * (x - x0) / (x1 - x0) if x1 != x0 else y1
+        if nodeType == 'multiplyDivide' and attr.startswith('output'):
+            axis = attr[-1]
+            a = float(self.value(node, 'input1' + axis))
+            b = float(self.value(node, 'input2' + axis))
+            operation = int(node.attrs.get('operation', 1))
+            if operation == 1:
+                return a * b
+            if operation == 2:
+                return a / b if b else 0.0
+            if operation == 3:
+                try:
+                    return a ** b
+                except (ZeroDivisionError, ValueError):
+                    return 0.0
+            return a
+        if nodeType == 'setRange' and attr.startswith('outValue'):
+            axis = attr[-1]
+            get = lambda name: float(self.value(node, name + axis))
+            value, lo, hi, oldLo, oldHi = get('value'), get('min'), get('max'), get('oldMin'), get('oldMax')
+            if oldHi == oldLo:
+                return lo
+            value = min(max(value, min(oldLo, oldHi)), max(oldLo, oldHi))
+            return lo + (value - oldLo) / (oldHi - oldLo) * (hi - lo)
+        if nodeType == 'plusMinusAverage' and attr.startswith('output3D'):
+            axis = attr[-1]
+            indices = sorted(set(int(m) for m in re.findall(
+                r'input3D\[(\d+)\]', ' '.join(list(node.attrs) + list(node.inputs)))))
+            values = [float(self.value(node, 'input3D[{0}].input3D{1}'.format(i, axis))) for i in indices]
+            operation = int(node.attrs.get('operation', 1))
+            if not values:
+                return 0.0
+            if operation == 2:
+                return values[0] - sum(values[1:])
+            if operation == 3:
+                return sum(values) / len(values)
+            return sum(values)
+        if nodeType == 'blendColors' and attr.startswith('output'):
+            channel = attr[-1]
+            blender = float(self.value(node, 'blender')) if 'blender' in node.attrs or \
+                self.isConnected(node, 'blender') else 0.5
+            c1 = float(self.value(node, 'color1' + channel))
+            c2 = float(self.value(node, 'color2' + channel))
+            return c1 * blender + c2 * (1.0 - blender)
+        if nodeType == 'pairBlend' and attr.startswith('out'):
+            #weight 0 is input 1, 1 is input 2, rotations blend linearly like the default rotInterpolation
+            weight = float(self.value(node, 'weight')) if 'weight' in node.attrs or \
+                self.isConnected(node, 'weight') else 1.0
+            name = 'in' + attr[len('out'):]
+            in1, in2 = float(self.value(node, name + '1')), float(self.value(node, name + '2'))
+            return in1 * (1.0 - weight) + in2 * weight
+        if nodeType == 'condition' and attr.startswith('outColor'):
+            channel = attr[-1]
+            first, second = float(self.value(node, 'firstTerm')), float(self.value(node, 'secondTerm'))
+            operation = int(node.attrs.get('operation', 0))
+            result = (first == second, first != second, first > second, first >= second, first < second,
+                      first <= second)[operation]
+            return float(self.value(node, ('colorIfTrue' if result else 'colorIfFalse') + channel))
+        return None
+
+
+scene = Scene()
+
+
+def reset():
+    # Clear the fake scene and command statistics.
+    scene.reset()
+    stats.reset()
+
+
+def command(func):
+    # Count and time every call of a fake maya command.
+    name = func.__name__
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats.record(name, time.perf_counter() - start)
+    wrapper.__name__ = name
+    wrapper.__doc__ = func.__doc__
+    return wrapper
@@ -0,0 +1,485 @@
+# Stand-in for the parts of maya.api.OpenMaya (API 2.0) the tool uses.
+#
+# Objects wrap maya._fake nodes directly; modifiers queue their edits and
+# apply them on doIt.  API calls are tallied in stats.apiCalls.
+import math
+
+from maya._fake import scene, stats, Node, MayaError, XYZ
+
+
+class MVector(object):
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        if isinstance(x, (MVector, list, tuple)):
+            x, y, z = x[0], x[1], x[2]
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __add__(self, other):
+        return MVector(self.x + other[0], self.y + other[1], self.z + other[2])
+
+    def __sub__(self, other):
+        return MVector(self.x - other[0], self.y - other[1], self.z - other[2])
+
+    def __mul__(self, scalar):
+        if isinstance(scalar, MVector):
+            return self.x * scalar.x + self.y * scalar.y + self.z * scalar.z
+        return MVector(self.x * scalar, self.y * scalar, self.z * scalar)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return MVector(-self.x, -self.y, -self.z)
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __len__(self):
+        return 3
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normal(self):
+        length = self.length()
+        return MVector(self) if not length else self * (1.0 / length)
+
+
+MPoint = MVector
+
+
+class MObject(object):
+    def __init__(self, node=None):
+        self._node = node
+
+    def isNull(self):
+        return self._node is None or not self._node.alive
+
+    def hasFn(self, fnType):
+        if fnType == MFn.kDagNode:
+            return self._node is not None and self._node.isDag
+        return self._node is not None and self._node.type in MFn.TYPES.get(fnType, ())
+
+    def __eq__(self, other):
+        return isinstance(other, MObject) and self._node is other._node
+
+    def __hash__(self):
+        return id(self._node)
+
+
+MObject.kNullObj = MObject()
+
+
+class MFn(object):
+    kDagNode = 107
+    kTransform = 110
+    kJoint = 121
+    kMesh = 296
+    kMeshVertComponent = 551
+    kSkinClusterFilter = 682
+    TYPES = {kTransform: ('transform', 'joint'), kJoint: ('joint',), kMesh: ('mesh',),
+             kSkinClusterFilter: ('skinCluster',)}
+
+
+class MIntArray(list):
+    pass
+
+
+class MDoubleArray(list):
+    pass
+
+
+def _node(obj):
+    stats.apiCalls += 1
+    if isinstance(obj, MObject):
+        if obj.isNull():
+            raise MayaError('Object is null or was deleted')
+        return obj._node
+    if isinstance(obj, MDagPath):
+        return obj._node
+    raise TypeError(obj)
+
+
+class MObjectHandle(object):
+    def __init__(self, obj=None):
+        self._node = obj._node if isinstance(obj, MObject) else None
+
+    def isValid(self):
+        return self._node is not None and self._node.alive
+
+    isAlive = isValid
+
+    def object(self):
+        return MObject(self._node)
+
+    def hashCode(self):
+        return id(self._node)
+
+
+class MPlug(object):
+    def __init__(self, node, attr):
+        self._node, self._attr = node, attr
+
+    def node(self):
+        return MObject(self._node)
+
+    def name(self):
+        return '{0}.{1}'.format(self._node.name, self._attr)
+
+    def partialName(self, *args, **kwargs):
+        return self._attr
+
+    def asDouble(self, *args):
+        stats.apiCalls += 1
+        return float(scene.value(self._node, self._attr))
+
+    asFloat = asDouble
+
+    def asInt(self, *args):
+        return int(self.asDouble())
+
+    def asString(self, *args):
+        stats.apiCalls += 1
+        return scene.value(self._node, self._attr)
+
+    def setDouble(self, value):
+        stats.apiCalls += 1
+        scene.setValue(self._node, self._attr, float(value))
+
+    setFloat = setDouble
+    setInt = setDouble
+
+    def isNull(self):
+        return self._node is None
+
+
+class MFnDependencyNode(object):
+    def __init__(self, obj=None):
+        self._node = _node(obj) if obj is not None else None
+
+    def setObject(self, obj):
+        self._node = _node(obj)
+
+    def name(self):
+        return self._node.name
+
+    def typeName(self):
+        return self._node.type
+
+    def uuid(self):
+        return MUuid(self._node.uuid)
+
+    def hasAttribute(self, attr):
+        return scene.hasAttr(self._node, attr)
+
+    def findPlug(self, attr, wantNetworkedPlug=False):
+        stats.apiCalls += 1
+        if not scene.hasAttr(self._node, attr):
+            raise MayaError('No attribute {0} on {1}'.format(attr, self._node.name))
+        return MPlug(self._node, attr)
+
+
+class MFnDagNode(MFnDependencyNode):
+    def partialPathName(self):
+        return self._node.name
+
+    def fullPathName(self):
+        parts, node = [], self._node
+        while node is not None:
+            parts.append(node.name)
+            node = node.parent
+        return '|' + '|'.join(reversed(parts))
+
+    def getPath(self):
+        return MDagPath(self._node)
+
+    def childCount(self):
+        return len(self._node.children)
+
+    def child(self, index):
+        return MObject(self._node.children[index])
+
+    def parent(self, index):
+        return MObject(self._node.parent)
+
+
+class MUuid(object):
+    def __init__(self, value=''):
+        self._value = value
+
+    def asString(self):
+        return self._value
+
+    def valid(self):
+        return bool(self._value)
+
+
+class MDagPath(object):
+    def __init__(self, node=None):
+        self._node = node
+        self._parents = self._chain()
+
+    def _chain(self):
+        chain, node = [], self._node
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        return chain
+
+    @staticmethod
+    def getAPathTo(obj):
+        return MDagPath(_node(obj))
+
+    def isValid(self):
+        return self._node is not None and self._node.alive and self._chain() == self._parents
+
+    def node(self):
+        return MObject(self._node)
+
+    def partialPathName(self):
+        stats.apiCalls += 1
+        return self._node.name
+
+    def inclusiveMatrix(self):
+        stats.apiCalls += 1
+        position = scene.worldPosition(self._node)
+        return [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0] + list(position) + [1.0]
+
+    def fullPathName(self):
+        return MFnDagNode(MObject(self._node)).fullPathName()
+
+    def extendToShape(self):
+        shapes = [child for child in self._node.children if child.type in ('mesh', 'locator')]
+        if len(shapes) != 1:
+            raise MayaError('{0} does not have exactly one shape'.format(self._node.name))
+        self._node = shapes[0]
+        self._parents = self._chain()
+        return self
+
+
+class MSpace(object):
+    kObject = 2
+    kWorld = 4
+
+
+class MFnMesh(object):
+    def __init__(self, obj):
+        self._node = _node(obj)
+        if self._node.type != 'mesh':
+            raise MayaError('{0} is not a mesh'.format(self._node.name))
+
+    def numVertices(self):
+        return len(self._node.points)
+
+    def getPoints(self, space=MSpace.kObject):
+        stats.apiCalls += 1
+        offset = scene.worldPosition(self._node) if space == MSpace.kWorld else [0.0, 0.0, 0.0]
+        return [MPoint(x + offset[0], y + offset[1], z + offset[2]) for x, y, z in self._node.points]
+
+
+class MFnSingleIndexedComponent(object):
+    # Components are plain MObjects carrying their element list
+    def __init__(self, obj=None):
+        self._object = obj
+
+    def create(self, componentType):
+        self._object = MObject()
+        self._object.componentType = componentType
+        self._object.elements = []
+        return self._object
+
+    def addElements(self, elements):
+        self._object.elements.extend(int(element) for element in elements)
+        return self
+
+    def getElements(self):
+        return MIntArray(self._object.elements)
+
+    @property
+    def elementCount(self):
+        return len(self._object.elements)
+
+
+class MSelectionList(object):
+    def __init__(self):
+        self._items = []
+
+    def add(self, name):
+        stats.apiCalls += 1
+        if isinstance(name, MObject):
+            self._items.append(name._node)
+            return self
+        nodeName = name.split('.')[0].split('|')[-1]
+        if nodeName in scene.nodes:
+            self._items.append(scene.nodes[nodeName])
+            return self
+        matches = [n for n in scene.nodes.values() if n.uuid == name]
+        self._items.append(matches[0] if matches else scene.node(nodeName))
+        return self
+
+    def length(self):
+        return len(self._items)
+
+    def getDependNode(self, index):
+        return MObject(self._items[index])
+
+    def getDagPath(self, index):
+        return MDagPath(self._items[index])
+
+
+class MDGModifier(object):
+    def __init__(self):
+        self._operations = []
+
+    def createNode(self, nodeType, parent=None):
+        stats.apiCalls += 1
+        parentNode = parent._node if isinstance(parent, MObject) and not parent.isNull() else None
+        createdTransform = nodeType in ('locator', 'mesh') and parentNode is None
+        if createdTransform:
+            parentNode = scene.createNode('transform', 'transform1')
+        node = scene.createNode(nodeType, '{0}1'.format(nodeType), parentNode)
+        if nodeType == 'multiplyDivide':
+            node.attrs['operation'] = 1
+            for axis in XYZ:
+                node.attrs['input2' + axis] = 1.0
+        return MObject(parentNode if createdTransform else node)
+
+    def renameNode(self, obj, name):
+        self._operations.append(lambda: scene.rename(obj._node, name))
+
+    def reparentNode(self, obj, parent=None):
+        newParent = parent._node if isinstance(parent, MObject) and not parent.isNull() else None
+        self._operations.append(lambda: scene.setParent(obj._node, newParent))
+
+    def _plugValue(self, plug, value):
+        self._operations.append(lambda: scene.setValue(plug._node, plug._attr, value))
+
+    def newPlugValueDouble(self, plug, value):
+        self._plugValue(plug, float(value))
+
+    newPlugValueFloat = newPlugValueDouble
+
+    def newPlugValueInt(self, plug, value):
+        self._plugValue(plug, float(value))
+
+    def newPlugValueBool(self, plug, value):
+        self._plugValue(plug, float(bool(value)))
+
+    def newPlugValueString(self, plug, value):
+        self._plugValue(plug, value)
+
+    def connect(self, src, dst):
+        self._operations.append(lambda: scene.connect((src._node, src._attr), (dst._node, dst._attr)))
+
+    def disconnect(self, src, dst):
+        self._operations.append(lambda: scene.disconnect((src._node, src._attr), (dst._node, dst._attr)))
+
+    def deleteNode(self, obj):
+        self._operations.append(lambda: scene.delete(obj._node))
+
+    def doIt(self):
+        stats.apiCalls += 1
+        operations, self._operations = self._operations, []
+        for operation in operations:
+            operation()
+
+    def undoIt(self):
+        pass
+
+
+class MDagModifier(MDGModifier):
+    pass
+
+
+def _typeFilter(nodeType):
+    return None if nodeType in ('dependNode', 'dagNode') else nodeType
+
+
+def _register(callbacks, entry):
+    callbackId = next(scene.callbackIds)
+    callbacks[callbackId] = entry
+    return callbackId
+
+
+class MMessage(object):
+    @staticmethod
+    def removeCallback(callbackId):
+        for callbacks in (scene.nodeAddedCallbacks, scene.nodeRemovedCallbacks, scene.nameChangedCallbacks,
+                          scene.attributeChangedCallbacks, scene.timeChangedCallbacks, scene.dagChangedCallbacks,
+                          scene.sceneCallbacks):
+            callbacks.pop(callbackId, None)
+
+    @staticmethod
+    def removeCallbacks(callbackIds):
+        for callbackId in list(callbackIds):
+            MMessage.removeCallback(callbackId)
+
+
+class MTime(object):
+    kFilm = 6
+
+    def __init__(self, value=0.0, unit=None):
+        self._value = float(value)
+
+    def value(self):
+        return self._value
+
+    def asUnits(self, unit):
+        return self._value
+
+    @staticmethod
+    def uiUnit():
+        return MTime.kFilm
+
+
+class MDGMessage(MMessage):
+    @staticmethod
+    def addTimeChangeCallback(function, clientData=None):
+        return _register(scene.timeChangedCallbacks, (lambda time, data: function(MTime(time), data), clientData))
+
+    @staticmethod
+    def addNodeAddedCallback(function, nodeType='dependNode', clientData=None):
+        return _register(scene.nodeAddedCallbacks,
+                         (lambda node, data: function(MObject(node), data), _typeFilter(nodeType), clientData))
+
+    @staticmethod
+    def addNodeRemovedCallback(function, nodeType='dependNode', clientData=None):
+        return _register(scene.nodeRemovedCallbacks,
+                         (lambda node, data: function(MObject(node), data), _typeFilter(nodeType), clientData))
+
+
+class MDagMessage(MMessage):
+    kParentAdded = 2
+
+    @staticmethod
+    def addAllDagChangesCallback(function, clientData=None):
+        return _register(scene.dagChangedCallbacks,
+                         (lambda node, data: function(MDagMessage.kParentAdded, MDagPath(node), MDagPath(node.parent),
+                                                      data), clientData))
+
+
+class MNodeMessage(MMessage):
+    kAttributeSet = 1 << 3
+
+    @staticmethod
+    def addNameChangedCallback(node, function, clientData=None):
+        nodeFilter = None if node is None or node.isNull() else node._node
+        return _register(scene.nameChangedCallbacks,
+                         (lambda n, old, data: function(MObject(n), old, data), nodeFilter, clientData))
+
+    @staticmethod
+    def addAttributeChangedCallback(node, function, clientData=None):
+        return _register(scene.attributeChangedCallbacks,
+                         (lambda n, attr, data: function(MNodeMessage.kAttributeSet, MPlug(n, attr), MPlug(None, None),
+                                                         data), node._node, clientData))
+
+
+class MSceneMessage(MMessage):
+    kBeforeNew = 'beforeNew'
+    kAfterNew = 'afterNew'
+    kBeforeOpen = 'beforeOpen'
+    kAfterOpen = 'afterOpen'
+    kBeforeSave = 'beforeSave'
+    kAfterSave = 'afterSave'
+
+    @staticmethod
+    def addCallback(message, function, clientData=None):
+        return _register(scene.sceneCallbacks, (function, message, clientData))
@@ -0,0 +1,61 @@
+# Stand-in for the parts of maya.api.OpenMayaAnim (API 2.0) the tool uses.
+#
+# Skin weights live on the fake skinCluster node (Node.skin), one
+# {influenceIndex: weight} dict per vertex of the bound mesh.
+from maya._fake import stats, MayaError
+from maya.api.OpenMaya import MDagPath, MDoubleArray, _node
+
+
+class MFnSkinCluster(object):
+    def __init__(self, obj):
+        self._node = _node(obj)
+        if self._node.type != 'skinCluster':
+            raise MayaError('{0} is not a skinCluster'.format(self._node.name))
+
+    def influenceObjects(self):
+        stats.apiCalls += 1
+        return [MDagPath(influence) for influence in self._node.skin['influences']]
+
+    def indexForInfluenceObject(self, path):
+        return self._node.skin['influences'].index(path._node)
+
+    def _vertices(self, shape, components):
+        if shape._node is not self._node.skin['geometry']:
+            raise MayaError('{0} is not deformed by {1}'.format(shape._node.name, self._node.name))
+        elements = getattr(components, 'elements', None)
+        return range(len(self._node.skin['weights'])) if elements is None else elements
+
+    def getWeights(self, shape, components, influences=None):
+        stats.apiCalls += 1
+        allInfluences = influences is None
+        if allInfluences:
+            influences = range(len(self._node.skin['influences']))
+        elif isinstance(influences, int):
+            influences = [influences]
+        weights = self._node.skin['weights']
+        result = MDoubleArray(weights[vertex].get(index, 0.0) for vertex in self._vertices(shape, components)
+                              for index in influences)
+        return (result, len(influences)) if allInfluences else result
+
+    def setWeights(self, shape, components, influences, weights, normalize=True, returnOldWeights=False):
+        stats.apiCalls += 1
+        if isinstance(influences, int):
+            influences, weights = [influences], [weights] if isinstance(weights, float) else weights
+        vertices = self._vertices(shape, components)
+        influenceCount = len(influences)
+        if len(weights) != len(vertices)*influenceCount:
+            raise MayaError('Expected {0} weights, got {1}'.format(len(vertices)*influenceCount, len(weights)))
+        for row, vertex in enumerate(vertices):
+            vertexWeights = self._node.skin['weights'][vertex]
+            values = weights[row*influenceCount:(row + 1)*influenceCount]
+            for index, value in zip(influences, values):
+                vertexWeights[index] = float(value)
+            if normalize:
+                # the other influences are scaled to fill what the set ones leave
+                others = [index for index in vertexWeights if index not in influences]
+                otherTotal = sum(vertexWeights[index] for index in others)
+                remainder = max(0.0, 1.0 - sum(float(value) for value in values))
+                for index in others:
+                    vertexWeights[index] = vertexWeights[index]*remainder/otherTotal if otherTotal else 0.0
+            for index in [index for index, value in vertexWeights.items() if not value]:
+                del vertexWeights[index]
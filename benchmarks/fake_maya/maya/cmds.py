@@ -0,0 +1,764 @@
+# Recording stand-in for maya.cmds backed by maya._fake.
+import fnmatch
+import math
+import os
+import re
+
+from maya._fake import scene, command, MayaError, XYZ, VALID_DATA_TYPES, VALID_ATTRIBUTE_TYPES, SHAPE_TYPES
+
+
+UUID_PATTERN = re.compile(r'^[0-9A-F]{8}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{12}$')
+
+
+def _flag(kwargs, *names, **default):
+    for name in names:
+        if name in kwargs:
+            return kwargs[name]
+    return default.get('default')
+
+
+def _names(args):
+    result = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            result.extend(_names(arg))
+        elif arg is not None:
+            result.append(arg)
+    return result
+
+
+# ---------------------------------------------------------------- selection
+@command
+def select(*args, **kwargs):
+    if _flag(kwargs, 'clear', 'cl'):
+        scene.selection = []
+        return
+    nodes = [scene.node(n) for n in _names(args)]
+    if _flag(kwargs, 'add'):
+        scene.selection.extend(nodes)
+    else:
+        scene.selection = nodes
+
+
+# -------------------------------------------------------------- node creation
+@command
+def createNode(nodeType, name=None, parent=None, skipSelect=False, **kwargs):
+    name = name or _flag(kwargs, 'n')
+    parentNode = scene.node(parent) if parent else None
+    if nodeType in SHAPE_TYPES and parentNode is None:
+        parentNode = scene.createNode('transform', '{0}1'.format(nodeType))
+    node = scene.createNode(nodeType, name, parentNode)
+    if nodeType == 'multiplyDivide':
+        node.attrs['operation'] = 1
+        for axis in XYZ:
+            node.attrs['input2' + axis] = 1.0
+    if nodeType == 'plusMinusAverage':
+        node.attrs['operation'] = 1
+    return node.name
+
+
+@command
+def polySphere(*args, **kwargs):
+    radius = float(_flag(kwargs, 'radius', 'r', default=1.0))
+    axisCount = int(_flag(kwargs, 'subdivisionsAxis', 'sa', default=20))
+    heightCount = int(_flag(kwargs, 'subdivisionsHeight', 'sh', default=20))
+    transform = scene.createNode('transform', _flag(kwargs, 'name', 'n') or 'pSphere1')
+    shape = scene.createNode('mesh', transform.name + 'Shape', transform)
+    shape.points = [(0.0, -radius, 0.0), (0.0, radius, 0.0)]
+    for ring in range(1, heightCount):
+        polar = math.pi * ring / heightCount
+        for segment in range(axisCount):
+            azimuth = 2.0 * math.pi * segment / axisCount
+            shape.points.append((radius * math.sin(polar) * math.cos(azimuth), -radius * math.cos(polar),
+                                 radius * math.sin(polar) * math.sin(azimuth)))
+    return [transform.name, 'polySphere1']
+
+
+@command
+def joint(*args, **kwargs):
+    name = _flag(kwargs, 'name', 'n')
+    parent = None
+    if scene.selection and scene.selection[0].type == 'joint':
+        parent = scene.selection[0]
+    node = scene.createNode('joint', name or 'joint1', parent)
+    position = _flag(kwargs, 'position', 'p')
+    if position:
+        scene.setWorldPosition(node, list(position))
+    scene.selection = [node]
+    return node.name
+
+
+@command
+def spaceLocator(*args, **kwargs):
+    name = _flag(kwargs, 'name', 'n') or 'locator1'
+    transform = scene.createNode('transform', name)
+    scene.createNode('locator', '{0}Shape'.format(transform.name), transform)
+    scene.selection = [transform]
+    return [transform.name]
+
+
+@command
+def group(*args, **kwargs):
+    name = _flag(kwargs, 'name', 'n') or 'group1'
+    node = scene.createNode('transform', name)
+    for child in _names(args):
+        scene.setParent(scene.node(child), node)
+    scene.selection = [node]
+    return node.name
+
+
+@command
+def rename(old, new, **kwargs):
+    return scene.rename(scene.node(old), new)
+
+
+@command
+def duplicate(*args, **kwargs):
+    result = []
+    for name in _names(args):
+        source = scene.node(name)
+        node = scene.createNode(source.type, source.name, source.parent)
+        node.attrs = dict((k, v) for k, v in source.attrs.items() if not k.startswith('_'))
+        node.userAttrs = dict((k, dict(v)) for k, v in source.userAttrs.items())
+        node.keys = list(source.keys)
+        result.append(node.name)
+    return result
+
+
+@command
+def delete(*args, **kwargs):
+    names = _names(args)
+    if not names:
+        raise MayaError('delete: Not enough objects or values.')
+    for name in names:
+        scene.delete(scene.node(name))
+
+
+@command
+def parent(*args, **kwargs):
+    names = _names(args)
+    if _flag(kwargs, 'world', 'w'):
+        children, newParent = names, None
+    else:
+        children, newParent = names[:-1], scene.node(names[-1])
+    result = []
+    for child in children:
+        node = scene.node(child)
+        if node.parent is newParent:
+            raise MayaError('Object {0} is already a child of the given parent.'.format(child))
+        scene.setParent(node, newParent)
+        result.append(node.name)
+    return result
+
+
+@command
+def objExists(name):
+    return scene.exists(name)
+
+
+@command
+def nodeType(name, **kwargs):
+    return scene.node(name).type
+
+
+def _matchName(name, pattern, recursive=False):
+    # a wildcard stays inside its namespace like in Maya, recursive also matches the name in any namespace
+    if name.count(':') == pattern.count(':') and fnmatch.fnmatchcase(name, pattern):
+        return True
+    return bool(recursive) and ':' not in pattern and fnmatch.fnmatchcase(name.rsplit(':', 1)[-1], pattern)
+
+
+@command
+def ls(*args, **kwargs):
+    names = _names(args)
+    recursive = _flag(kwargs, 'recursive', 'r')
+    nodeTypes = _flag(kwargs, 'type', 'typ')
+    if isinstance(nodeTypes, str):
+        nodeTypes = (nodeTypes,)
+    if _flag(kwargs, 'selection', 'sl'):
+        candidates = list(scene.selection)
+    elif names:
+        candidates = []
+        for name in names:
+            if name.split('|')[-1] in scene.nodes:
+                candidates.append(scene.nodes[name.split('|')[-1]])
+                continue
+            if UUID_PATTERN.match(name):
+                candidates.extend(n for n in scene.nodes.values() if n.uuid == name)
+                continue
+            if '.' in name:
+                nodePattern, attr = name.split('.', 1)
+                for node in list(scene.nodes.values()):
+                    if _matchName(node.name, nodePattern.split('|')[-1], recursive) and \
+                            scene.hasAttr(node, attr) and (attr in node.userAttrs or attr in node.attrs):
+                        candidates.append(node if _flag(kwargs, 'objectsOnly', 'o') else
+                                          '{0}.{1}'.format(node.name, attr))
+                continue
+            pattern = name.split('|')[-1]
+            if not any(c in pattern for c in '*?['):
+                continue
+            candidates.extend(n for n in list(scene.nodes.values()) if _matchName(n.name, pattern, recursive))
+    else:
+        candidates = list(scene.nodes.values())
+    result = []
+    for candidate in candidates:
+        if isinstance(candidate, str):
+            result.append(candidate)
+            continue
+        if nodeTypes and candidate.type not in nodeTypes:
+            continue
+        if _flag(kwargs, 'uuid'):
+            result.append(candidate.uuid)
+        elif _flag(kwargs, 'long', 'l'):
+            result.append(_longName(candidate))
+        else:
+            result.append(candidate.name)
+    return result
+
+
+def _longName(node):
+    parts = []
+    while node is not None:
+        parts.append(node.name)
+        node = node.parent
+    return '|' + '|'.join(reversed(parts))
+
+
+@command
+def listRelatives(*args, **kwargs):
+    nodes = [scene.node(n) for n in _names(args)]
+    result = []
+    for node in nodes:
+        if _flag(kwargs, 'parent', 'p'):
+            if node.parent is not None:
+                result.append(node.parent)
+        elif _flag(kwargs, 'allDescendents', 'ad'):
+            stack = list(node.children)
+            while stack:
+                child = stack.pop()
+                result.append(child)
+                stack.extend(child.children)
+        else:
+            result.extend(node.children)
+    nodeTypes = _flag(kwargs, 'type', 'typ')
+    if isinstance(nodeTypes, str):
+        nodeTypes = (nodeTypes,)
+    if _flag(kwargs, 'shapes', 's'):
+        nodeTypes = SHAPE_TYPES
+    if nodeTypes:
+        result = [n for n in result if n.type in nodeTypes]
+    if not result:
+        return None
+    return [_longName(n) if _flag(kwargs, 'fullPath', 'f') else n.name for n in result]
+
+
+# ---------------------------------------------------------------- attributes
+@command
+def setAttr(plugName, *values, **kwargs):
+    node, attr = scene.plug(plugName)
+    if not scene.hasAttr(node, attr):
+        raise MayaError("setAttr: No object matches name: {0}".format(plugName))
+    if not values and _flag(kwargs, 'type', 'typ') is None:
+        # keyable / channelBox / lock only change how the attribute is shown
+        return
+    if _flag(kwargs, 'type', 'typ') == 'string':
+        scene.setValue(node, attr, values[0])
+        return
+    if len(values) == 1 and isinstance(values[0], (list, tuple)):
+        values = tuple(values[0])
+    if scene.children(node, attr):
+        scene.setValue(node, attr, values)
+    else:
+        value = values[0]
+        scene.setValue(node, attr, float(value) if isinstance(value, (bool, int)) else value)
+
+
+def _multiIndices(node, attr):
+    pattern = re.compile(r'^' + re.escape(attr) + r'\[(\d+)\]')
+    names = list(node.attrs) + list(node.inputs)
+    return sorted(set(int(m.group(1)) for m in map(pattern.match, names) if m))
+
+
+@command
+def removeMultiInstance(plugName, **kwargs):
+    node, attr = scene.plug(plugName)
+    for inputAttr in list(node.inputs):
+        if inputAttr == attr or inputAttr.startswith(attr + '.'):
+            scene.disconnect(scene.sources[(node, inputAttr)], (node, inputAttr))
+    for key in [k for k in node.attrs if k == attr or k.startswith(attr + '.')]:
+        del node.attrs[key]
+
+
+@command
+def getAttr(plugName, **kwargs):
+    node, attr = scene.plug(plugName)
+    if _flag(kwargs, 'multiIndices', 'mi'):
+        return _multiIndices(node, attr) or None
+    if not scene.hasAttr(node, attr):
+        raise MayaError("getAttr: No object matches name: {0}".format(plugName))
+    if _flag(kwargs, 'type'):
+        spec = node.userAttrs.get(attr, {})
+        return spec.get('dataType') or spec.get('attributeType') or 'double'
+    value = scene.value(node, attr)
+    if isinstance(value, tuple):
+        return [value]
+    return value
+
+
+@command
+def addAttr(*args, **kwargs):
+    node = scene.node(_names(args)[0])
+    longName = _flag(kwargs, 'longName', 'ln')
+    dataType = _flag(kwargs, 'dataType', 'dt')
+    attributeType = _flag(kwargs, 'attributeType', 'at')
+    if dataType and dataType not in VALID_DATA_TYPES:
+        raise MayaError("addAttr: Type '{0}' is not a valid data type.".format(dataType))
+    if attributeType and attributeType not in VALID_ATTRIBUTE_TYPES:
+        raise MayaError("addAttr: Type '{0}' is not a valid attribute type.".format(attributeType))
+    if longName in node.userAttrs:
+        raise MayaError("addAttr: Attribute '{0}' already exists on '{1}'".format(longName, node.name))
+    parentAttr = _flag(kwargs, 'parent', 'p')
+    if parentAttr:
+        parentSpec = node.userAttrs.get(parentAttr)
+        if parentSpec is None or not parentSpec.get('attributeType'):
+            raise MayaError("addAttr: '{0}' is not a compound attribute".format(parentAttr))
+        parentSpec.setdefault('children', []).append(longName)
+    node.userAttrs[longName] = {
+        'dataType': dataType,
+        'attributeType': attributeType,
+        'multi': bool(_flag(kwargs, 'multi', 'm')),
+        'default': _flag(kwargs, 'defaultValue', 'dv', default='' if dataType == 'string' else 0.0),
+        'parent': parentAttr,
+    }
+    if dataType == 'string':
+        node.userAttrs[longName]['default'] = None
+
+
+@command
+def deleteAttr(*args, **kwargs):
+    names = _names(args)
+    if kwargs.get('attribute') or kwargs.get('at'):
+        node, attr = scene.node(names[0]), _flag(kwargs, 'attribute', 'at')
+    else:
+        node, attr = scene.plug(names[0])
+    for inputAttr in list(node.inputs):
+        if inputAttr.split('[')[0] == attr:
+            scene.disconnect(scene.sources[(node, inputAttr)], (node, inputAttr))
+    for outputAttr in list(node.outputs):
+        if outputAttr.split('[')[0] == attr:
+            for dst in list(scene.dests[(node, outputAttr)]):
+                scene.disconnect((node, outputAttr), dst)
+    node.userAttrs.pop(attr, None)
+    node.attrs.pop(attr, None)
+
+
+@command
+def attributeQuery(attr, node=None, **kwargs):
+    target = scene.node(node)
+    if _flag(kwargs, 'exists', 'ex'):
+        return attr in target.userAttrs or (scene.hasAttr(target, attr) and attr in target.attrs)
+    if _flag(kwargs, 'multi', 'm'):
+        return target.userAttrs.get(attr, {}).get('multi', False)
+    return None
+
+
+@command
+def listAttr(*args, **kwargs):
+    node = scene.node(_names(args)[0])
+    if _flag(kwargs, 'userDefined', 'ud'):
+        return list(node.userAttrs) or None
+    return list(node.userAttrs) + list(node.attrs)
+
+
+@command
+def connectAttr(src, dst, force=False, **kwargs):
+    force = force or _flag(kwargs, 'f')
+    srcPlug, dstPlug = scene.plug(src), scene.plug(dst)
+    for plug, name in ((srcPlug, src), (dstPlug, dst)):
+        base = plug[1].split('[')[0]
+        if not scene.hasAttr(plug[0], plug[1]) and base not in plug[0].userAttrs:
+            raise MayaError('connectAttr: The attribute {0} does not exist'.format(name))
+    scene.connect(srcPlug, dstPlug, force)
+
+
+@command
+def disconnectAttr(src, dst, **kwargs):
+    scene.disconnect(scene.plug(src), scene.plug(dst))
+
+
+@command
+def listConnections(*args, **kwargs):
+    source = _flag(kwargs, 'source', 's', default=True)
+    destination = _flag(kwargs, 'destination', 'd', default=True)
+    plugs = _flag(kwargs, 'plugs', 'p')
+    connections = _flag(kwargs, 'connections', 'c')
+    nodeTypes = _flag(kwargs, 'type', 't')
+    if isinstance(nodeTypes, str):
+        nodeTypes = (nodeTypes,)
+    result = []
+    for name in _names(args):
+        if '.' in name:
+            node, attr = scene.plug(name)
+            match = lambda a, attr=attr: a == attr or a.startswith(attr + '[') or a.startswith(attr + '.') \
+                or a in scene.children(node, attr)
+        else:
+            node = scene.node(name)
+            match = lambda a: True
+        pairs = []
+        if source:
+            for attr in node.inputs:
+                if match(attr):
+                    pairs.append(((node, attr), scene.sources[(node, attr)]))
+        if destination:
+            for attr in node.outputs:
+                if match(attr):
+                    pairs.extend(((node, attr), dst) for dst in scene.dests[(node, attr)])
+        for own, other in pairs:
+            if nodeTypes and other[0].type not in nodeTypes:
+                continue
+            if connections:
+                result.append('{0}.{1}'.format(own[0].name, own[1]))
+            result.append('{0}.{1}'.format(other[0].name, other[1]) if plugs else other[0].name)
+    return result or None
+
+
+# ------------------------------------------------------------------ transform
+@command
+def xform(*args, **kwargs):
+    node = scene.node(_names(args)[0])
+    query = _flag(kwargs, 'query', 'q')
+    translation = _flag(kwargs, 'translation', 't')
+    worldSpace = _flag(kwargs, 'worldSpace', 'ws')
+    if query:
+        if _flag(kwargs, 'matrix', 'm'):
+            position = scene.worldPosition(node) if worldSpace else scene.localTranslate(node)
+            return [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0] + list(position) + [1.0]
+        if translation is not None or _flag(kwargs, 'rotatePivot', 'rp'):
+            return scene.worldPosition(node) if worldSpace else scene.localTranslate(node)
+        if _flag(kwargs, 'rotation', 'ro'):
+            return [float(scene.value(node, 'rotate' + a)) for a in XYZ]
+        return None
+    if translation is not None:
+        if worldSpace:
+            scene.setWorldPosition(node, list(translation))
+        else:
+            scene.setValue(node, 'translate', tuple(translation))
+
+
+@command
+def matchTransform(*args, **kwargs):
+    names = _names(args)
+    target = scene.node(names[-1])
+    for name in names[:-1]:
+        scene.setWorldPosition(scene.node(name), scene.worldPosition(target))
+
+
+# ---------------------------------------------------------------- constraints
+def _constraint(kind, args, kwargs):
+    names = _names(args)
+    targets = [scene.node(n) for n in names[:-1]]
+    driven = scene.node(names[-1])
+    name = _flag(kwargs, 'name', 'n') or '{0}_{1}1'.format(driven.name, kind)
+    node = scene.createNode(kind, name, driven)
+    node.constraint = {'targets': targets, 'driven': driven, 'offset': [0.0, 0.0, 0.0]}
+    for index, target in enumerate(targets):
+        node.userAttrs['target[{0}]'.format(index)] = {'attributeType': 'compound'}
+        scene.link((target, 'worldMatrix'), (node, 'target[{0}]'.format(index)))
+    if kind == 'pointConstraint':
+        maintainOffset = _flag(kwargs, 'maintainOffset', 'mo')
+        if maintainOffset:
+            before = scene.worldPosition(driven)
+            targetsWorld = [scene.worldPosition(t) for t in targets]
+            average = [sum(p[i] for p in targetsWorld) / len(targetsWorld) for i in range(3)]
+            node.constraint['offset'] = [b - a for b, a in zip(before, average)]
+        scene.connect((node, 'constraintTranslate'), (driven, 'translate'), force=True)
+    else:
+        scene.connect((node, 'constraintRotate'), (driven, 'rotate'), force=True)
+    return [node.name]
+
+
+@command
+def pointConstraint(*args, **kwargs):
+    return _constraint('pointConstraint', args, kwargs)
+
+
+@command
+def aimConstraint(*args, **kwargs):
+    return _constraint('aimConstraint', args, kwargs)
+
+
+@command
+def orientConstraint(*args, **kwargs):
+    return _constraint('orientConstraint', args, kwargs)
+
+
+# ---------------------------------------------------------------- driven keys
+def _curveFor(drivenPlug, driverPlug):
+    driven = scene.plug(drivenPlug)
+    source = scene.sources.get(driven)
+    if source is not None and source[0].type.startswith('animCurve'):
+        return source[0]
+    curveType = 'animCurveUL' if driven[1].startswith('translate') else 'animCurveUU'
+    curve = scene.createNode(curveType, '{0}_{1}'.format(driven[0].name, driven[1]))
+    scene.connect(scene.plug(driverPlug), (curve, 'input'))
+    scene.connect((curve, 'output'), driven, force=True)
+    return curve
+
+
+def _addKey(curve, x, y):
+    curve.keys = [k for k in curve.keys if abs(k[0] - x) > 1e-9] + [(float(x), float(y))]
+
+
+@command
+def setDrivenKeyframe(drivenPlug, currentDriver=None, **kwargs):
+    driver = currentDriver or _flag(kwargs, 'cd')
+    driverValue = _flag(kwargs, 'driverValue', 'dv')
+    value = _flag(kwargs, 'value', 'v')
+    drivenNode, drivenAttr = scene.plug(drivenPlug)
+    if value is None:
+        value = drivenNode.attrs.get(drivenAttr, scene.default(drivenAttr))
+    if driverValue is None:
+        driverNode, driverAttr = scene.plug(driver)
+        driverValue = driverNode.attrs.get(driverAttr, scene.default(driverAttr))
+    else:
+        driverValue = driverValue[0] if isinstance(driverValue, (list, tuple)) else driverValue
+    curve = _curveFor(drivenPlug, driver)
+    _addKey(curve, driverValue, value)
+
+
+@command
+def setKeyframe(*args, **kwargs):
+    curve = scene.node(_names(args)[0])
+    x = _flag(kwargs, 'float', 'f')
+    if isinstance(x, (list, tuple)):
+        x = x[0]
+    _addKey(curve, x, _flag(kwargs, 'value', 'v', default=0.0))
+    return 1
+
+
+@command
+def keyframe(*args, **kwargs):
+    curve = scene.node(_names(args)[0])
+    if _flag(kwargs, 'query', 'q'):
+        if _flag(kwargs, 'keyframeCount', 'kc'):
+            return len(curve.keys)
+        if _flag(kwargs, 'floatChange', 'fc'):
+            return [k[0] for k in sorted(curve.keys)]
+        if _flag(kwargs, 'valueChange', 'vc'):
+            return [k[1] for k in sorted(curve.keys)]
+    return None
+
+
+@command
+def keyTangent(*args, **kwargs):
+    return None
+
+
+# ------------------------------------------------------------------- skinning
+def _meshShape(node):
+    if node.type == 'mesh':
+        return node
+    shapes = [child for child in node.children if child.type == 'mesh']
+    if not shapes:
+        raise MayaError('{0} has no mesh to bind'.format(node.name))
+    return shapes[0]
+
+
+@command
+def skinCluster(*args, **kwargs):
+    # create binds every vertex fully to its closest joint
+    names = _names(args)
+    if _flag(kwargs, 'query', 'q'):
+        node = scene.node(names[0])
+        if _flag(kwargs, 'influence', 'inf'):
+            return [influence.name for influence in node.skin['influences'] if influence.alive]
+        if _flag(kwargs, 'geometry', 'g'):
+            return [node.skin['geometry'].name]
+        raise MayaError('skinCluster: unsupported query {0}'.format(sorted(kwargs)))
+    if _flag(kwargs, 'edit', 'e'):
+        node = scene.node(names[0])
+        for name in _names([_flag(kwargs, 'addInfluence', 'ai')]):
+            influence = scene.node(name)
+            if influence in node.skin['influences']:
+                raise MayaError('{0} is already an influence of {1}'.format(name, node.name))
+            node.skin['influences'].append(influence)
+        return None
+    nodes = [scene.node(name) for name in names]
+    joints = [node for node in nodes if node.type == 'joint']
+    shape = _meshShape([node for node in nodes if node.type != 'joint'][0])
+    if not joints:
+        raise MayaError('skinCluster needs at least one joint')
+    node = scene.createNode('skinCluster', _flag(kwargs, 'name', 'n') or 'skinCluster1')
+    jointPositions = [scene.worldPosition(joint) for joint in joints]
+    offset = scene.worldPosition(shape)
+    weights = []
+    for point in shape.points:
+        world = [p + o for p, o in zip(point, offset)]
+        distances = [sum((w - j)**2 for w, j in zip(world, position)) for position in jointPositions]
+        weights.append({distances.index(min(distances)): 1.0})
+    node.skin = {'geometry': shape, 'influences': joints, 'weights': weights}
+    scene.link((node, 'outputGeometry[0]'), (shape, 'inMesh'))
+    return [node.name]
+
+
+@command
+def listHistory(*args, **kwargs):
+    # upstream nodes through incoming connections, starting at the given nodes and their mesh shapes
+    pending = []
+    for name in _names(args):
+        node = scene.node(name)
+        pending.append(node)
+        pending.extend(child for child in node.children if child.type == 'mesh')
+    result = []
+    while pending:
+        node = pending.pop(0)
+        if node in result:
+            continue
+        result.append(node)
+        pending.extend(scene.sources[(node, attr)][0] for attr in node.inputs)
+    return [node.name for node in result] or None
+
+
+# ------------------------------------------------------------------- session
+@command
+def undoInfo(*args, **kwargs):
+    if _flag(kwargs, 'openChunk', 'ock'):
+        scene.undoChunkDepth += 1
+    elif _flag(kwargs, 'closeChunk', 'cck'):
+        scene.undoChunkDepth -= 1
+    elif _flag(kwargs, 'query', 'q'):
+        return scene.undoEnabled
+    elif _flag(kwargs, 'stateWithoutFlush', 'swf', 'state', 'st') is not None:
+        scene.undoEnabled = bool(_flag(kwargs, 'stateWithoutFlush', 'swf', 'state', 'st'))
+    return None
+
+
+@command
+def undo(*args, **kwargs):
+    return None
+
+
+@command
+def refresh(*args, **kwargs):
+    if 'suspend' in kwargs or 'su' in kwargs:
+        scene.refreshSuspended = bool(_flag(kwargs, 'suspend', 'su'))
+
+
+@command
+def currentTime(*args, **kwargs):
+    if _flag(kwargs, 'query', 'q'):
+        return scene.time
+    scene.time = float(args[0])
+    for callback, clientData in list(scene.timeChangedCallbacks.values()):
+        callback(scene.time, clientData)
+    return scene.time
+
+
+@command
+def playbackOptions(*args, **kwargs):
+    if _flag(kwargs, 'query', 'q'):
+        if _flag(kwargs, 'minTime', 'min'):
+            return 1.0
+        if _flag(kwargs, 'maxTime', 'max'):
+            return 24.0
+    return None
+
+
+@command
+def evalDeferred(*args, **kwargs):
+    scene.deferred.append(args[0] if args else None)
+
+
+def flushDeferred():
+    # Run queued evalDeferred callables, the way Maya does on idle.
+    while scene.deferred:
+        item = scene.deferred.pop(0)
+        if callable(item):
+            item()
+
+
+@command
+def scriptJob(*args, **kwargs):
+    if _flag(kwargs, 'kill', 'k') is not None:
+        return None
+    if _flag(kwargs, 'exists', 'ex') is not None:
+        return False
+    return next(scene.callbackIds)
+
+
+@command
+def file(*args, **kwargs):
+    if _flag(kwargs, 'query', 'q'):
+        if _flag(kwargs, 'sceneName', 'sn'):
+            return scene.sceneName
+        return None
+    if _flag(kwargs, 'new', 'f') and 'new' in kwargs:
+        scene.sendSceneMessage('beforeNew')
+        scene.clearNodes()
+        scene.sceneName = ''
+        scene.sendSceneMessage('afterNew')
+        return None
+    if _flag(kwargs, 'open', 'o'):
+        if not os.path.exists(args[0]):
+            raise MayaError('File not found: {0}'.format(args[0]))
+        scene.sendSceneMessage('beforeOpen')
+        scene.clearNodes()
+        scene.loadFile(args[0])
+        scene.sceneName = args[0]
+        scene.sendSceneMessage('afterOpen')
+        return args[0]
+    if _flag(kwargs, 'rename', 'rn'):
+        scene.sceneName = kwargs.get('rename') or kwargs.get('rn')
+        return scene.sceneName
+    if _flag(kwargs, 'save', 's'):
+        scene.sendSceneMessage('beforeSave')
+        if scene.sceneName:
+            scene.saveFile(scene.sceneName)
+        scene.sendSceneMessage('afterSave')
+        return scene.sceneName
+    return None
+
+
+@command
+def loadPlugin(*args, **kwargs):
+    return list(args)
+
+
+@command
+def pluginInfo(*args, **kwargs):
+    return False
+
+
+@command
+def warning(*args, **kwargs):
+    return None
+
+
+@command
+def error(*args, **kwargs):
+    raise MayaError(' '.join(str(a) for a in args))
+
+
+# ------------------------------------------------------------------------ UI
+def _uiCommand(name):
+    def ui(*args, **kwargs):
+        if _flag(kwargs, 'exists', 'ex'):
+            return False
+        if _flag(kwargs, 'query', 'q'):
+            if _flag(kwargs, 'value', 'v') is not None:
+                return 0.5 if name == 'floatSlider' else False
+            if _flag(kwargs, 'text', 'tx') is not None:
+                return ''
+            return None
+        return '{0}{1}'.format(name, next(scene.callbackIds))
+    ui.__name__ = name
+    return command(ui)
+
+
+for _ui in ('window', 'deleteUI', 'columnLayout', 'rowLayout', 'frameLayout', 'text', 'textField',
+            'floatSlider', 'intSlider', 'button', 'showWindow', 'optionMenu', 'menuItem', 'checkBox',
+            'textScrollList', 'scrollField', 'setParent', 'separator', 'fileDialog2', 'intField',
+            'floatField', 'confirmDialog', 'menu', 'shelfButton', 'scriptTable', 'rowColumnLayout', 'shelfLayout',
+            'tabLayout'):
+    globals()[_ui] = _uiCommand(_ui)
+del _ui
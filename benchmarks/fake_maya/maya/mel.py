@@ -0,0 +1,7 @@
+# Stand-in for maya.mel, global MEL variables evaluate to a fixed control name.
+from maya._fake import command
+
+
+@command
+def eval(script):
+    return 'MayaWindow' if 'gMainWindow' in script else 'ShelfLayout'
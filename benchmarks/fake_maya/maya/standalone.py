@@ -0,0 +1,10 @@
+"""Stand-in for ``maya.standalone``: the fake scene needs no initialization."""
+from maya._fake import scene
+
+
+def initialize(name='python'):
+    scene.standaloneInitialized = True
+
+
+def uninitialize():
+    scene.standaloneInitialized = False
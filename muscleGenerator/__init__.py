@@ -0,0 +1,42 @@
+# Muscle generator package
+# -----------------------------------
+# Importing the package loads nothing: no maya, no numpy, no window. The modules are imported on first use,
+# either directly (import muscleGenerator.core) or through the names below (muscleGenerator.MuscleJointGroup).
+#   core             - MuscleJointGroup, mirror, batch builds, presets, auto placement, registry, cache
+#   dataNode         - the network node every muscle keeps its state on
+#   solver           - loading the muscleSolver plugin and moving muscles onto it
+#   geometry         - the numpy muscle math, no maya import
+#   ui               - the Muscle Control Panel and profile windows
+#   shelf            - shelf button and main menu installers
+#   cli              - mayapy entry point, also run by python -m muscleGenerator
+#   farm             - runs a muscle setup over many scenes on a pool of mayapy worker processes
+#   muscleSolverNode - the plugin itself, loaded by Maya from its path
+import importlib
+
+SUBMODULES = ('core', 'dataNode', 'solver', 'geometry', 'ui', 'shelf', 'cli', 'farm')
+LAZY_NAMES = {
+    'MuscleJointGroup': 'core', 'mirror': 'core', 'mirrorAll': 'core', 'batchCreateMuscles': 'core',
+    'loadMuscleSpecs': 'core', 'exportMusclePreset': 'core', 'importMusclePreset': 'core',
+    'autoPlaceMuscles': 'core', 'getMuscleRegistry': 'core', 'updateDirtyMuscles': 'core',
+    'bakeMuscleCache': 'core', 'startCachedPlayback': 'core', 'stopCachedPlayback': 'core',
+    'setBuildBackend': 'core', 'setProfiling': 'core', 'MuscleTransaction': 'core',
+    'startLiveEdit': 'core', 'stopLiveEdit': 'core', 'createMuscleLod': 'core', 'setMuscleLod': 'core',
+    'removeMuscleLod': 'core', 'capsuleSkinWeights': 'core',
+    'readDataNode': 'dataNode', 'migrateLegacyDataNodes': 'dataNode',
+    'connectMusclesToSolver': 'solver', 'loadMuscleSolverPlugin': 'solver',
+    'create_muscle_ui': 'ui', 'show_profile_ui': 'ui',
+    'installShelfButton': 'shelf', 'installMenu': 'shelf',
+    'runFarm': 'farm',
+}
+
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module("{0}.{1}".format(__name__, name))
+    if name in LAZY_NAMES:
+        return getattr(importlib.import_module("{0}.{1}".format(__name__, LAZY_NAMES[name])), name)
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(SUBMODULES) | set(LAZY_NAMES))
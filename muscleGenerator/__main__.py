@@ -0,0 +1,5 @@
+import sys
+
+from muscleGenerator.cli import main
+
+sys.exit(main())
@@ -0,0 +1,107 @@
+# Command line entry point
+# -----------------------------------
+# Builds muscles into a scene with no UI, through mayapy:
+#   mayapy -m muscleGenerator specs.json more.csv --scene rig.ma --output rig_muscles.ma
+#   mayapy -m muscleGenerator --preset arms.json --attach-map map.json --scene rig.mb --output rig.mb --mirror Left
+# Spec files are the batch build JSON/CSV files, presets come from Export Preset. Exits with 1 when a muscle failed.
+import argparse
+import json
+import os
+import sys
+
+SCENE_TYPES = {'.ma': 'mayaAscii', '.mb': 'mayaBinary'}
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(prog='muscleGenerator', description="Build muscles into a Maya scene")
+    parser.add_argument('specs', nargs='*', help="batch build spec files, .json or .csv")
+    parser.add_argument('--preset', action='append', default=[], help="muscle preset to import, may be repeated")
+    parser.add_argument('--attach-map', help="json file renaming preset attach objects, {\"old\": \"new\"}")
+    parser.add_argument('--scene', help="scene to open first, the current (empty) scene when left out")
+    parser.add_argument('--output', help="save the scene here, nothing is saved when left out")
+    parser.add_argument('--mirror', choices=('Left', 'Right'), help="mirror this side's muscles afterwards")
+    parser.add_argument('--axis', default='x', choices=('x', 'y', 'z'))
+    parser.add_argument('--report', help="also write the build report to this json file")
+    args = parser.parse_args(argv)
+    if not args.specs and not args.preset:
+        parser.error("give at least one spec file or --preset")
+    return args
+
+
+def mergeReports(reports):
+    merged = {'total': 0.0, 'muscles': [], 'failed': []}
+    for report in reports:
+        merged['total'] += report['total']
+        merged['muscles'].extend(report['muscles'])
+        merged['failed'].extend(report['failed'])
+    return merged
+
+
+def openScene(scenePath):
+    import maya.cmds as mc
+    mc.file(scenePath, open=True, force=True)
+
+
+def saveScene(outputPath):
+    import maya.cmds as mc
+    mc.file(rename=outputPath)
+    mc.file(save=True, force=True, type=SCENE_TYPES.get(os.path.splitext(outputPath)[1].lower(), 'mayaAscii'))
+
+
+def loadAttachMap(attachMapPath):
+    if not attachMapPath:
+        return None
+    with open(attachMapPath) as attachMapFile:
+        return json.load(attachMapFile)
+
+
+#Build spec files and presets into the current scene, then mirror. Muscles the specs name that already exist are
+#rebuilt, so the same setup can be re-run on a scene after a skeleton update. Returns the merged report
+def buildMuscleSetup(specPaths=(), presetPaths=(), attachMap=None, mirror=None, axis='x'):
+    from . import core
+
+    reports = []
+    specs = []
+    for specPath in specPaths:
+        specs.extend(core.loadMuscleSpecs(specPath))
+    if specs:
+        registry = core.getMuscleRegistry()
+        with core.MuscleTransaction('muscleGeneratorCli'):
+            for spec in specs:
+                existing = registry.getMuscle(spec['name'])
+                if existing:
+                    existing.delete()
+            reports.append(core.batchCreateMuscles(specs, chunkName='muscleGeneratorCli')[1])
+    for presetPath in presetPaths:
+        reports.append(core.importMusclePreset(presetPath, attachMap=attachMap)[1])
+    if mirror:
+        reports.append(core.mirrorAll(side=mirror, axis=axis)[1])
+    return mergeReports(reports)
+
+
+def main(argv=None):
+    args = parseArguments(argv)
+
+    #standalone has to be up before the package touches maya.cmds
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+    try:
+        from . import core
+
+        if args.scene:
+            openScene(args.scene)
+        report = buildMuscleSetup(args.specs, args.preset, loadAttachMap(args.attach_map), args.mirror, args.axis)
+        if args.output:
+            saveScene(args.output)
+
+        core.printBatchReport(report)
+        if args.report:
+            with open(args.report, 'w') as reportFile:
+                json.dump(report, reportFile, indent=2, sort_keys=True)
+        return 1 if report['failed'] else 0
+    finally:
+        maya.standalone.uninitialize()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
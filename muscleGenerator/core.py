@@ -0,0 +1,2492 @@
+# Muscle generator core
+# -----------------------------------
+# MuscleJointGroup and everything that builds, edits, mirrors, batches, caches and tracks muscles. No UI here,
+# the window lives in muscleGenerator.ui and is only imported when it is opened.
+import importlib
+import maya.cmds as mc
+import maya.api.OpenMaya as om2
+import maya.api.OpenMayaAnim as oma2
+import re
+import os
+import csv
+import json
+import time
+
+import numpy as np
+
+from . import geometry as muscleGeometry
+from .dataNode import (MUSCLE_MEMBER_ROLES, getDataNodeName, parseMemberConnections, readDataNode, writeDataNode,
+                       migrateLegacyDataNodes)
+
+# The public names, what `from muscleGenerator.core import *` (MayaMuscleGenerator_v1.py) hands out. Module state
+# (buildBackend, muscleRegistry, ...) isn't in it, a star import would only copy its value at import time
+__all__ = [
+    'BUILD_BACKENDS', 'VOLUME_MODES', 'setBuildBackend', 'compareBuildBackends',
+    'MuscleTransaction', 'transaction', 'MuscleProfiler', 'profiler', 'setProfiling', 'profilePhase',
+    'NodeHandle', 'createJnt', 'getWorldPosition', 'getWorldPositions', 'MuscleJointGroup',
+    'mirror', 'getMirrorName', 'mirrorAll',
+    'normalizeMuscleSpec', 'loadMuscleSpecs', 'batchCreateMuscles', 'printBatchReport',
+    'exportMusclePreset', 'loadMusclePreset', 'importMusclePreset',
+    'getMeshPoints', 'getMeshIndex', 'autoPlaceMuscles',
+    'getSkinCluster', 'listBindJoints', 'capsuleSkinWeights', 'setSkinWeights',
+    'getMuscleSide', 'MuscleRegistry', 'getMuscleRegistry', 'updateDirtyMuscles', 'printUpdateReport',
+    'LiveEditSession', 'startLiveEdit', 'stopLiveEdit',
+    'MUSCLE_LOD_LEVELS', 'getMuscleLodNode', 'createMuscleLod', 'getMuscleLod', 'setMuscleLod', 'removeMuscleLod',
+    'bakeMuscleCache', 'readMuscleCache', 'MuscleCachePlayer', 'startCachedPlayback', 'stopCachedPlayback',
+]
+
+
+# Build backend: 'cmds' builds the joints and locators with maya.cmds,
+# 'api' builds the same nodes through one OpenMaya 2.0 MDagModifier per muscle.
+# Modifier edits made outside of an MPxCommand never reach the undo queue, undoing an api built muscle would take
+# back its cmds edits (constraints, keys) and leave the joints behind. So the api backend refuses to run while undo
+# is on, it is meant for batch sessions that turn undo off (mc.undoInfo(stateWithoutFlush=False))
+BUILD_BACKENDS = ('cmds', 'api')
+buildBackend = 'cmds'
+
+
+def setBuildBackend(backend):
+    global buildBackend
+    if backend not in BUILD_BACKENDS:
+        raise RuntimeError("Invalid build backend '{0}', use one of {1}".format(backend, BUILD_BACKENDS))
+    checkBuildBackend(backend)
+    buildBackend = backend
+
+
+def checkBuildBackend(backend=None):
+    if (backend or buildBackend) == 'api' and mc.undoInfo(query=True, state=True):
+        raise RuntimeError("The 'api' build backend isn't undoable and only runs with undo turned off, "
+                           "use 'cmds' or turn undo off first")
+
+
+# Volume mode: 'sdk' keys JOmuscle with set driven keys,
+# 'network' drives it with a small setRange/multiplyDivide network evaluating sqrt(1/ratio) exactly
+VOLUME_MODES = ('sdk', 'network')
+VOLUME_NODE_TYPES = ('animCurveUU', 'animCurveUL', 'setRange', 'plusMinusAverage', 'multiplyDivide')
+
+# Driven key curve sets keyed by (compressionFactor, stretchFactor, stretchOffset, compressionOffset). The curves are
+# normalized to the rest length, so every muscle built with the same parameters (the UI defaults, a batch spec's
+# defaults) takes its keys from one entry
+VOLUME_CURVE_DECIMALS = 6
+volumeCurveCache = {}
+
+
+def getVolumeCurves(compressionFactor, stretchFactor, stretchOffset, compressionOffset):
+    key = (round(compressionFactor, VOLUME_CURVE_DECIMALS), round(stretchFactor, VOLUME_CURVE_DECIMALS),
+           tuple(round(value, VOLUME_CURVE_DECIMALS) for value in stretchOffset),
+           tuple(round(value, VOLUME_CURVE_DECIMALS) for value in compressionOffset))
+    curves = volumeCurveCache.get(key)
+    if curves is None:
+        curves = volumeCurveCache[key] = muscleGeometry.volumeCurves(*key)
+    return curves
+
+# Locator moves smaller than this don't make a muscle dirty
+DIRTY_POSITION_TOLERANCE = 1e-4
+
+
+def getMObject(nodeName):
+    selectionList = om2.MSelectionList()
+    selectionList.add(nodeName)
+    return selectionList.getDependNode(0)
+
+
+def setPlugValue(modifier, node, attr, value):
+    plug = om2.MFnDependencyNode(node).findPlug(attr, False)
+    if isinstance(value, bool):
+        modifier.newPlugValueBool(plug, value)
+    elif isinstance(value, int):
+        modifier.newPlugValueInt(plug, value)
+    else:
+        modifier.newPlugValueDouble(plug, value)
+
+
+# MuscleJointGroup class definition 
+# -----------------------------------
+def getWorldPosition(obj, cache=None):
+    #The maya debug log says the xform return data need to be unpacked
+    if cache is not None and obj in cache:
+        return cache[obj]
+    position = om2.MVector(*mc.xform(obj, translation=True, worldSpace=True, query=True))
+    if cache is not None:
+        cache[obj] = position
+    return position
+
+
+# Transactions
+# -----------------------------------
+# Every public operation runs in a MuscleTransaction: one undo chunk, viewport refresh suspended, and every node
+# created meanwhile recorded through a node-added callback. If the operation raises, exactly those nodes are deleted
+# again before the error goes on, so a typo in an attach object name doesn't leave half a muscle behind.
+# Transactions nest, only the outermost one opens the chunk and suspends the refresh. An inner one that fails
+# still rolls back its own nodes, which lets a batch build drop one bad muscle and carry on with the rest.
+class MuscleTransaction(object):
+    stack = []
+
+    def __init__(self, chunkName):
+        self.chunkName = chunkName
+        self.createdNodes = []
+        self.callbackId = None
+
+    def __enter__(self):
+        if not MuscleTransaction.stack:
+            mc.undoInfo(openChunk=True, chunkName=self.chunkName)
+            mc.refresh(suspend=True)
+            self.callbackId = om2.MDGMessage.addNodeAddedCallback(MuscleTransaction.onNodeAdded, "dependNode")
+        MuscleTransaction.stack.append(self)
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        MuscleTransaction.stack.pop()
+        try:
+            if excType is not None:
+                self.rollback()
+        finally:
+            if self.callbackId is not None:
+                om2.MMessage.removeCallback(self.callbackId)
+                self.callbackId = None
+                mc.refresh(suspend=False)
+                mc.undoInfo(closeChunk=True)
+        #never swallow the error
+        return False
+
+    @staticmethod
+    def onNodeAdded(node, clientData=None):
+        handle = om2.MObjectHandle(node)
+        for transaction in MuscleTransaction.stack:
+            transaction.createdNodes.append(handle)
+
+    def rollback(self):
+        #newest first, so children and constraints go before their parents. Deleting a node can take others
+        #with it (children, sdk curves), the handles tell which ones are already gone
+        for handle in reversed(self.createdNodes):
+            if not handle.isValid():
+                continue
+            node = handle.object()
+            if node.hasFn(om2.MFn.kDagNode):
+                nodeName = om2.MDagPath.getAPathTo(node).fullPathName()
+            else:
+                nodeName = om2.MFnDependencyNode(node).name()
+            mc.delete(nodeName)
+        self.createdNodes = []
+
+
+def transaction(chunkName):
+    #Decorator running the function in a MuscleTransaction
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            with MuscleTransaction(chunkName):
+                return func(*args, **kwargs)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+    return decorator
+
+
+# Profiling
+# -----------------------------------
+# Opt-in. While enabled, the package modules' mc is swapped for a proxy counting every maya.cmds call, and each
+# @profilePhase function records its time and command count per phase and per muscle. Phases nest and are
+# inclusive, e.g. update also holds the time of the addSetDrivenKey and createDataNode calls it makes.
+# When disabled a phase costs one attribute check and mc is maya.cmds itself.
+class CountingCmds:
+    def __init__(self, cmds, profiler):
+        self.cmds = cmds
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        command = getattr(self.cmds, name)
+        if not callable(command):
+            return command
+        profiler = self.profiler
+
+        def countedCommand(*args, **kwargs):
+            profiler.commandTotal += 1
+            profiler.commandCounts[name] = profiler.commandCounts.get(name, 0) + 1
+            return command(*args, **kwargs)
+        #cache the wrapper, __getattr__ only runs for names not found on the instance
+        setattr(self, name, countedCommand)
+        return countedCommand
+
+
+class MuscleProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.commandTotal = 0
+        self.commandCounts = {}
+        self.reset()
+
+    def reset(self):
+        self.phases = {}    # phase -> {'calls', 'seconds', 'commands', 'commandCounts'}
+        self.muscles = {}   # muscleName -> phase -> {'calls', 'seconds', 'commands'}
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            for module in getProfiledModules():
+                module.mc = CountingCmds(module.mc, self)
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            for module in getProfiledModules():
+                module.mc = module.mc.cmds
+
+    def record(self, phase, muscleName, seconds, commands, commandCounts):
+        phaseRecord = self.phases.setdefault(phase, {'calls': 0, 'seconds': 0.0, 'commands': 0, 'commandCounts': {}})
+        phaseRecord['calls'] += 1
+        phaseRecord['seconds'] += seconds
+        phaseRecord['commands'] += commands
+        for command, count in commandCounts.items():
+            phaseRecord['commandCounts'][command] = phaseRecord['commandCounts'].get(command, 0) + count
+        if muscleName:
+            muscleRecord = self.muscles.setdefault(muscleName, {}).setdefault(
+                phase, {'calls': 0, 'seconds': 0.0, 'commands': 0})
+            muscleRecord['calls'] += 1
+            muscleRecord['seconds'] += seconds
+            muscleRecord['commands'] += commands
+
+    def getReport(self):
+        return {'phases': self.phases, 'muscles': self.muscles}
+
+    def dump(self, filePath):
+        with open(filePath, 'w') as profileFile:
+            json.dump(self.getReport(), profileFile, indent=2, sort_keys=True)
+
+    def formatTable(self):
+        lines = ["{0:<22} {1:>7} {2:>10} {3:>10} {4:>9}".format('Phase', 'Calls', 'Total ms', 'ms/call', 'cmds/call')]
+        for phase, record in sorted(self.phases.items(), key=lambda item: -item[1]['seconds']):
+            lines.append("{0:<22} {1:>7} {2:>10.1f} {3:>10.2f} {4:>9.1f}".format(
+                phase, record['calls'], record['seconds']*1000.0, record['seconds']*1000.0/record['calls'],
+                record['commands']/float(record['calls'])))
+        return "\n".join(lines)
+
+
+profiler = MuscleProfiler()
+#every package module issuing maya.cmds calls, they all get their mc swapped
+PROFILED_MODULES = ('core', 'dataNode', 'solver')
+
+
+def getProfiledModules():
+    return [importlib.import_module("{0}.{1}".format(__package__, name)) for name in PROFILED_MODULES]
+
+
+def setProfiling(enabled):
+    if enabled:
+        profiler.enable()
+    else:
+        profiler.disable()
+
+
+def profilePhase(phase):
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            #methods and mirror() get the muscle from their first argument
+            muscleName = getattr(args[0], 'muscleName', None) if args else None
+            commandStart = profiler.commandTotal
+            countsStart = dict(profiler.commandCounts)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                commandCounts = dict((command, count - countsStart.get(command, 0))
+                                     for command, count in profiler.commandCounts.items()
+                                     if count != countsStart.get(command, 0))
+                profiler.record(phase, muscleName, seconds, profiler.commandTotal - commandStart, commandCounts)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+    return decorator
+
+
+# Node Handles
+# -----------------------------------
+# Muscle members are kept as NodeHandles instead of names: an MObjectHandle to the node, its UUID to find it again
+# once the MObject is gone (file reload, reference reload), and its unique path name cached. Renames, reparents and
+# deletions anywhere in the scene bump nodeHandleGeneration, which makes every handle look its name up again on next
+# use, so between edits a name costs nothing and after a rig cleanup pass renamed things it is still right.
+nodeHandleGeneration = 0
+nodeHandleCallbackIds = []
+
+
+def onNodeHandlesChanged(*args):
+    global nodeHandleGeneration
+    nodeHandleGeneration += 1
+
+
+def addNodeHandleCallbacks():
+    if not nodeHandleCallbackIds:
+        nodeHandleCallbackIds.extend([
+            om2.MNodeMessage.addNameChangedCallback(om2.MObject.kNullObj, onNodeHandlesChanged),
+            om2.MDagMessage.addAllDagChangesCallback(onNodeHandlesChanged),
+            om2.MDGMessage.addNodeRemovedCallback(onNodeHandlesChanged, "dependNode"),
+        ])
+
+
+def removeNodeHandleCallbacks():
+    if nodeHandleCallbackIds:
+        om2.MMessage.removeCallbacks(nodeHandleCallbackIds)
+    del nodeHandleCallbackIds[:]
+
+
+class NodeHandle(object):
+    def __init__(self, nodeName):
+        addNodeHandleCallbacks()
+        self.cachedName = nodeName
+        self.generation = nodeHandleGeneration
+        self.handle = None
+        self.uuid = None
+        self.isDag = False
+        try:
+            node = getMObject(nodeName)
+        except RuntimeError:
+            #not in the scene (yet), keep the name so objExists checks still answer for it
+            return
+        self.handle = om2.MObjectHandle(node)
+        self.uuid = om2.MFnDependencyNode(node).uuid().asString()
+        self.isDag = node.hasFn(om2.MFn.kDagNode)
+        self.cachedName = self.pathName(node)
+
+    @classmethod
+    def fromName(cls, value):
+        if not value:
+            return None
+        return value if isinstance(value, cls) else cls(value)
+
+    def pathName(self, node):
+        #the shortest path that is unique, plain short names can be ambiguous for DAG nodes
+        if self.isDag:
+            return om2.MDagPath.getAPathTo(node).partialPathName()
+        return om2.MFnDependencyNode(node).name()
+
+    def object(self):
+        #Return the node's MObject, or None when it is deleted
+        if self.handle is not None and self.handle.isValid():
+            return self.handle.object()
+        #deleted nodes still in the undo queue come back with the same MObject, only look gone ones up by UUID
+        if self.uuid is None or (self.handle is not None and self.handle.isAlive()):
+            return None
+        nodes = mc.ls(self.uuid)
+        if not nodes:
+            return None
+        node = getMObject(nodes[0])
+        self.handle = om2.MObjectHandle(node)
+        return node
+
+    def name(self):
+        #the current name, or the last known one once the node is deleted
+        if self.generation != nodeHandleGeneration:
+            self.generation = nodeHandleGeneration
+            node = self.object()
+            if node is not None:
+                self.cachedName = self.pathName(node)
+        return self.cachedName
+
+    def exists(self):
+        return self.object() is not None
+
+    def __str__(self):
+        return self.name()
+
+
+class NodeHandleAttribute(object):
+    #Class level descriptor storing a NodeHandle per instance. Reads give the node's current name, so every
+    #mc call keeps taking plain strings, writes take a name (or None)
+    def __set_name__(self, owner, name):
+        self.key = '_{0}Handle'.format(name)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        handle = instance.__dict__.get(self.key)
+        return handle.name() if handle is not None else None
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.key] = NodeHandle.fromName(value)
+
+
+# MuscleJointGroup Class and createJnt Function
+# -----------------------------------
+@profilePhase('createJnt')
+def createJnt(jointName, parent=None, radius=1.0, **kwargs): #**kwargs allows you to add other joint attributes may needed by cmds.joint while using this function 
+    mc.select(clear=True)
+    jnt=mc.joint(name=jointName, **kwargs)
+    mc.setAttr("{0}.radius".format(jnt), radius)
+    #if set a parent, put the child's translation to parent's automatically
+    if parent:
+        mc.parent(jnt,parent)
+        mc.setAttr("{0}.translate".format(jnt), 0, 0, 0)
+        mc.setAttr("{0}.rotate".format(jnt), 0, 0, 0)
+        #mc.setAttr("{0}.scale".format(jnt), 0, 0, 0)
+        mc.setAttr("{0}.jo".format(jnt), 0, 0, 0)
+    return jnt
+
+
+class MuscleJointGroup:
+    #every member node is held by a NodeHandle, see Node Handles
+    originAttachObj = NodeHandleAttribute()
+    insertionAttachObj = NodeHandleAttribute()
+    muscleOrigin = NodeHandleAttribute()
+    muscleBase = NodeHandleAttribute()
+    muscleInsertion = NodeHandleAttribute()
+    muscleTip = NodeHandleAttribute()
+    muscleDriver = NodeHandleAttribute()
+    muscleOffset = NodeHandleAttribute()
+    JOmuscle = NodeHandleAttribute()
+    mainPointConstraint = NodeHandleAttribute()
+    mainAimConstraint = NodeHandleAttribute()
+    solver = NodeHandleAttribute()
+    _originLoc = NodeHandleAttribute()
+    _insertionLoc = NodeHandleAttribute()
+    _centerLoc = NodeHandleAttribute()
+
+    def __init__(self, muscleName, muscleLength, compressionFactor, stretchFactor,
+                 stretchOffset=None,
+                 compressionOffset=None,
+                 volumeMode='sdk',
+                 segmentCount=1,
+                 segmentProfile='smooth'):
+        self.initAttributes(muscleName, muscleLength, compressionFactor, stretchFactor,
+                            stretchOffset, compressionOffset, volumeMode, segmentCount, segmentProfile)
+
+        #Use create function to create all the joints
+        self.create()
+        self.edit()
+
+    def initAttributes(self, muscleName, muscleLength, compressionFactor, stretchFactor,
+                       stretchOffset=None, compressionOffset=None, volumeMode='sdk', segmentCount=1,
+                       segmentProfile='smooth'):
+        if volumeMode not in VOLUME_MODES:
+            raise RuntimeError("Invalid volume mode '{0}', use one of {1}".format(volumeMode, VOLUME_MODES))
+        if int(segmentCount) < 1:
+            raise RuntimeError("Invalid segment count {0}, a muscle needs at least one segment".format(segmentCount))
+        self.muscleName = muscleName
+        self.muscleLength = muscleLength
+        self.compressionFactor = compressionFactor
+        self.stretchFactor = stretchFactor
+        self.stretchOffset = stretchOffset
+        self.compressionOffset = compressionOffset
+        self.volumeMode = volumeMode
+        #with more than one segment, segmentJoints are the bind joints instead of JOmuscle
+        self.segmentCount = int(segmentCount)
+        self.segmentProfile = segmentProfile
+
+        self.muscleOrigin = None
+        self.muscleBase = None
+        self.muscleInsertion = None
+        self.muscleTip = None
+        self.muscleDriver = None
+        self.muscleOffset = None
+        self.JOmuscle = None
+        self.segmentJoints = []
+
+        #classmethod parameters
+        self.originAttachObj = None
+        self.insertionAttachObj = None
+
+        #set when a muscleSolver node drives this muscle instead of its own constraints
+        self.solver = None
+        self.solverIndex = None
+
+        #last applied locator positions and parameters, see updateIfDirty
+        self.appliedState = None
+
+        #edit locators and their temporary constraints, see the properties below
+        self._originLoc = None
+        self._insertionLoc = None
+        self._centerLoc = None
+        self._ptConstraintsTmp = None
+
+    @property
+    def allJoints(self):
+        #the joint chain in build order, then the segments
+        joints = [self.muscleOrigin, self.muscleBase, self.muscleInsertion, self.muscleTip,
+                  self.muscleDriver, self.muscleOffset, self.JOmuscle]
+        return [joint for joint in joints if joint] + list(self.segmentJoints)
+
+    # Edit locators
+    # They only exist between edit() and update(), muscles loaded from a data node look them up on first use
+    def findEditNode(self, suffix):
+        nodeName = "{0}_{1}".format(self.muscleName, suffix)
+        return nodeName if mc.objExists(nodeName) else None
+
+    @property
+    def originLoc(self):
+        if self._originLoc is None:
+            self._originLoc = self.findEditNode("muscleOrigin_loc")
+        return self._originLoc
+
+    @originLoc.setter
+    def originLoc(self, value):
+        self._originLoc = value
+
+    @property
+    def insertionLoc(self):
+        if self._insertionLoc is None:
+            self._insertionLoc = self.findEditNode("muscleInsertion_loc")
+        return self._insertionLoc
+
+    @insertionLoc.setter
+    def insertionLoc(self, value):
+        self._insertionLoc = value
+
+    @property
+    def centerLoc(self):
+        if self._centerLoc is None:
+            self._centerLoc = self.findEditNode("muscleCenterLoc")
+        return self._centerLoc
+
+    @centerLoc.setter
+    def centerLoc(self, value):
+        self._centerLoc = value
+
+    @property
+    def ptConstraints_tmp(self):
+        #the point constraints the locators drive the joints with while editing
+        if self._ptConstraintsTmp is None:
+            locs = [loc for loc in (self.originLoc, self.insertionLoc, self.centerLoc) if loc and mc.objExists(loc)]
+            constraints = mc.listConnections(locs, type="pointConstraint", source=False, destination=True) if locs else None
+            self._ptConstraintsTmp = list(dict.fromkeys(constraints or []))
+        return self._ptConstraintsTmp
+
+    @ptConstraints_tmp.setter
+    def ptConstraints_tmp(self, value):
+        self._ptConstraintsTmp = value
+
+
+    @profilePhase('create')
+    @transaction('create')
+    def create(self):
+        #Build the joints with the selected backend, both give the same hierarchy
+        checkBuildBackend()
+        if buildBackend == 'api':
+            self.createJointChainApi()
+        else:
+            self.createJointChain()
+
+        #this may not be necessary, it's used for modify the orientation muscleInsertion
+        mc.delete(mc.aimConstraint(self.muscleInsertion, self.muscleOrigin, 
+                                   aimVector = [1, 0, 0], upVector=[0, 1, 0],
+                                   worldUpType = 'scene', offset = [0, 0, 0], weight = 1))
+        mc.pointConstraint(self.muscleOrigin, self.muscleBase, mo=False, weight=1)
+        self.mainAimConstraint = mc.aimConstraint(self.muscleInsertion, self.muscleBase, 
+                         aimVector = [1, 0, 0], upVector = [0, 1, 0],
+                         worldUpType = 'objectrotation', worldUpObject = self.muscleOrigin,
+                         worldUpVector = [0, 1, 0], weight = 1)[0]
+        
+        #muscleTip's location's the same as muscleInsertion. And use muscleInsertion to pointCOnstraint it 
+        mc.pointConstraint(self.muscleInsertion, self.muscleTip, mo=False, weight=1)
+        self.mainPointConstraint = mc.pointConstraint(self.muscleBase, self.muscleTip, self.muscleDriver, mo=False, weight=1)[0]
+
+        #self.muscleNodes = []
+        self.addVolumeDriver()
+        self.addSegments()
+        self.connectLod()
+
+    @profilePhase('createJointChain')
+    def createJointChain(self):
+        self.muscleOrigin = createJnt("{0}_muscleOrigin".format(self.muscleName))
+
+        self.muscleInsertion = createJnt("{0}_muscleInsertion".format(self.muscleName))
+
+        # move self.muscleInsertion to the end of the muscle
+        mc.setAttr("{0}.tx".format(self.muscleInsertion), self.muscleLength)
+
+        #Create muscleBase under muscleOrigin and make its radius a little smaller
+        self.muscleBase = createJnt("{0}_muscleBase".format(self.muscleName), radius=0.5, parent=self.muscleOrigin)
+
+        #Create a joint muscleTip, it's the child of muscleBase
+        self.muscleTip = createJnt("{0}_muscleTip".format(self.muscleName), parent = self.muscleBase)
+
+        self.muscleDriver = createJnt("{0}_muscleDriver".format(self.muscleName), radius=0.5, parent=self.muscleBase)
+
+        #Create muscleOffset, its translate should be the same as the muscle driver, and it should be the child of muscleDriver
+        #The createJnt has a feature that if the parent is set, the child's translate will be the same as the parent
+        self.muscleOffset = createJnt("{0}_muscleOffset".format(self.muscleName), radius=0.75, parent=self.muscleDriver)
+
+        self.JOmuscle = createJnt("{0}_JOmuscle".format(self.muscleName), radius=1.0, parent=self.muscleOffset)
+        #if segmentScaleCompensate is off, the child joint will scale along with the parent joint
+        mc.setAttr("{0}.segmentScaleCompensate".format(self.JOmuscle), 0)
+
+    @profilePhase('createJointChain')
+    def createJointChainApi(self):
+        #Same joints as createJointChain, queued on one MDagModifier and applied with a single doIt().
+        #Not undoable, see checkBuildBackend
+        dagModifier = om2.MDagModifier()
+
+        def addJoint(suffix, parent=om2.MObject.kNullObj, radius=1.0):
+            jnt = dagModifier.createNode("joint", parent)
+            dagModifier.renameNode(jnt, "{0}_{1}".format(self.muscleName, suffix))
+            setPlugValue(dagModifier, jnt, "radius", radius)
+            return jnt
+
+        muscleOrigin = addJoint("muscleOrigin")
+        muscleInsertion = addJoint("muscleInsertion")
+        setPlugValue(dagModifier, muscleInsertion, "translateX", self.muscleLength)
+        muscleBase = addJoint("muscleBase", muscleOrigin, radius=0.5)
+        muscleTip = addJoint("muscleTip", muscleBase)
+        muscleDriver = addJoint("muscleDriver", muscleBase, radius=0.5)
+        muscleOffset = addJoint("muscleOffset", muscleDriver, radius=0.75)
+        JOmuscle = addJoint("JOmuscle", muscleOffset, radius=1.0)
+        setPlugValue(dagModifier, JOmuscle, "segmentScaleCompensate", False)
+        dagModifier.doIt()
+
+        (self.muscleOrigin, self.muscleInsertion, self.muscleBase, self.muscleTip,
+         self.muscleDriver, self.muscleOffset, self.JOmuscle) = [
+            om2.MFnDagNode(jnt).partialPathName() for jnt in
+            (muscleOrigin, muscleInsertion, muscleBase, muscleTip, muscleDriver, muscleOffset, JOmuscle)]
+
+    @profilePhase('createEditLocators')
+    def createEditLocators(self):
+
+        def createSpaceLocator(scaleValue, **kwargs):
+            loc = mc.spaceLocator(**kwargs)[0]
+            for axis in 'XYZ':
+                mc.setAttr('{0}.localScale{1}'.format(loc, axis), scaleValue)
+            return loc
+        
+        mc.setAttr('{0}.overrideEnabled'.format(self.muscleOrigin), 1)
+        mc.setAttr('{0}.overrideDisplayType'.format(self.muscleOrigin), 1)
+        mc.setAttr('{0}.overrideEnabled'.format(self.muscleInsertion), 1)
+        mc.setAttr('{0}.overrideDisplayType'.format(self.muscleInsertion), 1)
+
+        self.originLoc = createSpaceLocator(5.0, name='{0}_muscleOrigin_loc'.format(self.muscleName))
+        # 开启 overrideEnabled 属性
+        mc.setAttr("{}.overrideEnabled".format(self.originLoc), 1)
+        # 设置 overrideColor 属性为 13（红色）
+        mc.setAttr("{}.overrideColor".format(self.originLoc), 13)
+
+        self.insertionLoc = createSpaceLocator(5.0, name="{0}_muscleInsertion_loc".format(self.muscleName))
+        # 开启 overrideEnabled 属性
+        mc.setAttr("{}.overrideEnabled".format(self.insertionLoc), 1)
+        # 设置 overrideColor 属性为 21 (light blue)
+        mc.setAttr("{}.overrideColor".format(self.insertionLoc), 5)
+
+        driverGrp = mc.group(name="{0}_muscleCenter_loc".format(self.muscleName), empty=True)
+        self.centerLoc = createSpaceLocator(5.0, name="{0}_muscleCenterLoc".format(self.muscleName))
+        # 开启 overrideEnabled 属性
+        mc.setAttr("{}.overrideEnabled".format(self.centerLoc), 1)
+        # 设置 overrideColor 属性为 14 (purple)
+        mc.setAttr("{}.overrideColor".format(self.centerLoc), 9)
+
+        mc.parent(self.centerLoc, driverGrp)
+        return driverGrp
+
+    @profilePhase('createEditLocators')
+    def createEditLocatorsApi(self):
+        #Same locators as createEditLocators, queued on one MDagModifier and applied with a single doIt()
+        dagModifier = om2.MDagModifier()
+
+        def addLocator(name, color, parent=om2.MObject.kNullObj):
+            loc = dagModifier.createNode("transform", parent)
+            locShape = dagModifier.createNode("locator", loc)
+            dagModifier.renameNode(loc, name)
+            dagModifier.renameNode(locShape, "{0}Shape".format(name))
+            for axis in 'XYZ':
+                setPlugValue(dagModifier, locShape, "localScale{0}".format(axis), 5.0)
+            setPlugValue(dagModifier, loc, "overrideEnabled", True)
+            setPlugValue(dagModifier, loc, "overrideColor", color)
+            return loc
+
+        for jnt in (self.muscleOrigin, self.muscleInsertion):
+            setPlugValue(dagModifier, getMObject(jnt), "overrideEnabled", True)
+            setPlugValue(dagModifier, getMObject(jnt), "overrideDisplayType", 1)
+
+        originLoc = addLocator("{0}_muscleOrigin_loc".format(self.muscleName), 13)
+        insertionLoc = addLocator("{0}_muscleInsertion_loc".format(self.muscleName), 5)
+        driverGrp = dagModifier.createNode("transform")
+        dagModifier.renameNode(driverGrp, "{0}_muscleCenter_loc".format(self.muscleName))
+        centerLoc = addLocator("{0}_muscleCenterLoc".format(self.muscleName), 9, parent=driverGrp)
+        dagModifier.doIt()
+
+        self.originLoc, self.insertionLoc, self.centerLoc, driverGrp = [
+            om2.MFnDagNode(loc).partialPathName() for loc in (originLoc, insertionLoc, centerLoc, driverGrp)]
+        return driverGrp
+    
+    @profilePhase('edit')
+    @transaction('edit')
+    def edit(self):
+        #Create the locators with the selected backend, then wire them up
+        checkBuildBackend()
+        self.disconnectLodRest()
+        if buildBackend == 'api':
+            driverGrp = self.createEditLocatorsApi()
+        else:
+            driverGrp = self.createEditLocators()
+
+        self.ptConstraints_tmp = []
+        
+        if self.originAttachObj:
+            mc.parent(self.originLoc, self.originAttachObj)
+        #Move origin locator to the place
+        mc.delete(mc.pointConstraint(self.muscleOrigin, self.originLoc, maintainOffset = False, weight = 1))
+        self.ptConstraints_tmp.append(mc.pointConstraint(self.originLoc, self.muscleOrigin, maintainOffset = False, weight = 1)[0])
+
+        if self.insertionAttachObj:
+            mc.parent(self.insertionLoc, self.insertionAttachObj)
+
+        # use X axis as the main axis and make aim constraint
+        # By using this, the 2 locators will rotate and point to each other when they're moved
+        mc.aimConstraint(self.insertionLoc, self.originLoc, aimVector=[1,0,0], upVector=[0,1,0],
+                         worldUpType='scene', offset=[0,0,0],weight=1)
+        mc.aimConstraint(self.originLoc, self.insertionLoc, aimVector=[-1,0,0], upVector=[0,1,0],
+                         worldUpType='scene', offset=[0,0,0],weight=1)
+        
+        mc.delete(mc.pointConstraint(self.muscleInsertion, self.insertionLoc, maintainOffset=False, weight=1))
+        self.ptConstraints_tmp.append(mc.pointConstraint(self.insertionLoc, self.muscleInsertion, maintainOffset=False, weight=True)[0])
+
+        mc.delete(mc.pointConstraint(self.muscleDriver, driverGrp, maintainOffset=False, weight=True))
+        mc.parent(driverGrp,self.originLoc)
+        mc.pointConstraint(self.originLoc, self.insertionLoc, driverGrp, maintainOffset = True, weight = True)
+        mc.setAttr("{0}.rotate".format(driverGrp), 0,0,0)
+        if self.solver:
+            #the solver keeps aiming muscleBase, only hand the driver over to the center locator
+            mc.disconnectAttr(self.solverPlug("output", "driverTranslate"), "{0}.translate".format(self.muscleDriver))
+        else:
+            mc.delete(self.mainPointConstraint)
+        self.ptConstraints_tmp.append(mc.pointConstraint(self.centerLoc, self.muscleDriver, maintainOffset=False, weight=True)[0])
+
+        if liveEditSession is not None:
+            liveEditSession.watch(self)
+
+
+
+    @profilePhase('update')
+    @transaction('update')
+    def update(self):
+        #"""apply the edits"""#
+        positions = self.getLocatorPositions()
+        self.finishEdit()
+        self.disconnectLodRest()
+        self.appliedState = {'positions': positions or (self.appliedState or {}).get('positions'),
+                             'parameters': self.getParameterState()}
+
+        if self.solver:
+            self.updateSolver()
+            self.connectLod()
+            self.createDataNode()
+            return
+
+        mc.delete(self.mainAimConstraint)
+
+        self.mainPointConstraint = mc.pointConstraint(self.muscleBase, self.muscleTip, self.muscleDriver,
+                                                    maintainOffset=True, weight=1)[0]
+            
+        # use X axis as aim axis, make muscleOrigin point to the end of muscle
+        mc.delete(mc.aimConstraint(self.muscleInsertion, self.muscleOrigin, aimVector=[1,0,0], upVector=[0,1,0],
+                                    worldUpType='scene', offset=[0,0,0],weight=1))
+            
+        self.mainAimConstraint = mc.aimConstraint(self.muscleInsertion, self.muscleBase, aimVector=[1,0,0], upVector=[0,1,0],
+                                                    worldUpType='objectrotation', worldUpObject= self.muscleOrigin,
+                                                    worldUpVector=[0,1,0])[0]
+                                                      
+        # remove existing sdk / volume network nodes
+        self.removeVolumeDriver()
+
+        #After Updating, drive the volume again
+        self.addVolumeDriver()
+
+        self.connectLod()
+        self.createDataNode()
+
+    def finishEdit(self):
+        if liveEditSession is not None:
+            liveEditSession.unwatch(self)
+
+        # remove control
+        for ptConstraint_tmp in self.ptConstraints_tmp:
+            if mc.objExists(ptConstraint_tmp):
+                mc.delete(ptConstraint_tmp)
+
+        for loc in [self.originLoc, self.insertionLoc, self.centerLoc]:
+            if loc and mc.objExists(loc):
+                mc.delete(loc)
+
+        mc.setAttr("{0}.overrideEnabled".format(self.muscleOrigin), 0)
+        mc.setAttr("{0}.overrideDisplayType".format(self.muscleOrigin), 0)
+        mc.setAttr("{0}.overrideEnabled".format(self.muscleInsertion), 0)
+        mc.setAttr("{0}.overrideDisplayType".format(self.muscleInsertion), 0)
+
+    # Dirty tracking
+    # update() records the locator positions and parameters it applied, updateIfDirty() only redoes what changed
+    def getLocatorPositions(self):
+        #world positions of the edit locators, None when the muscle isn't being edited
+        locs = (self.originLoc, self.insertionLoc, self.centerLoc)
+        if not all(loc and mc.objExists(loc) for loc in locs):
+            return None
+        return [mc.xform(loc, translation=True, worldSpace=True, query=True) for loc in locs]
+
+    def getParameterState(self):
+        return {'compressionFactor': self.compressionFactor,
+                'stretchFactor': self.stretchFactor,
+                'stretchOffset': list(self.stretchOffset or (0, 0, 0)),
+                'compressionOffset': list(self.compressionOffset or (0, 0, 0)),
+                'volumeMode': self.volumeMode}
+
+    def getDirtyParts(self, positions):
+        applied = self.appliedState or {}
+        dirty = set()
+        appliedPositions = applied.get('positions')
+        if positions is not None and (appliedPositions is None or any(
+                abs(value - appliedValue) > DIRTY_POSITION_TOLERANCE
+                for position, appliedPosition in zip(positions, appliedPositions)
+                for value, appliedValue in zip(position, appliedPosition))):
+            dirty.add('positions')
+        if self.getParameterState() != applied.get('parameters'):
+            dirty.add('volume')
+        return dirty
+
+    @profilePhase('updateIfDirty')
+    @transaction('updateIfDirty')
+    def updateIfDirty(self):
+        #Returns 'rebuilt', 'volume' (only the volume driver was redone) or 'skipped'
+        positions = self.getLocatorPositions()
+        dirty = self.getDirtyParts(positions)
+        #the solver update only sets a few inputs, it isn't worth splitting
+        if 'positions' in dirty or (self.solver and dirty):
+            self.update()
+            return 'rebuilt' if 'positions' in dirty else 'volume'
+
+        if positions is not None:
+            #nothing moved, close the edit and give the driver back to the main constraint
+            self.finishEdit()
+            if self.solver:
+                self.updateSolver()
+            else:
+                self.mainPointConstraint = mc.pointConstraint(self.muscleBase, self.muscleTip, self.muscleDriver,
+                                                              maintainOffset=True, weight=1)[0]
+        if dirty:
+            self.disconnectLodRest()
+            self.removeVolumeDriver()
+            self.addVolumeDriver()
+            self.appliedState = dict(self.appliedState or {}, parameters=self.getParameterState())
+        if positions is not None or dirty:
+            self.connectLod()
+            self.createDataNode()
+        return 'volume' if dirty else 'skipped'
+
+    @profilePhase('liveUpdate')
+    @transaction('liveUpdate')
+    def liveUpdate(self, previousRestLength):
+        #Edit mode preview for a live edit session: the joints already follow the locators, only what depends on
+        #the rest length is redone, for driven keys that's the divisor of their ratio node.
+        #Nothing is closed or written, the next update() still applies the edit.
+        #Returns the rest length now in use
+        restLength = mc.getAttr("{0}.translateX".format(self.muscleTip))
+        if abs(restLength - previousRestLength) <= DIRTY_POSITION_TOLERANCE:
+            return previousRestLength
+        volumeRatio = self.getVolumeRatioNode() if self.volumeMode == 'sdk' and not self.solver else None
+        if self.solver:
+            self.setSolverInputs(restLength, mc.getAttr("{0}.translate".format(self.muscleDriver))[0])
+        elif volumeRatio:
+            mc.setAttr("{0}.input2X".format(volumeRatio), restLength)
+        else:
+            self.removeVolumeDriver()
+            self.addVolumeDriver()
+        return restLength
+
+    def solverPlug(self, arrayAttr, attr):
+        return "{0}.{1}[{2}].{3}".format(self.solver, arrayAttr, self.solverIndex, attr)
+
+    def setSolverInputs(self, restLength, driverTranslate):
+        #the driver sits halfway along the muscle plus whatever offset the center locator gave it
+        mc.setAttr(self.solverPlug("muscle", "restLength"), restLength)
+        mc.setAttr(self.solverPlug("muscle", "compressionFactor"), self.compressionFactor)
+        mc.setAttr(self.solverPlug("muscle", "stretchFactor"), self.stretchFactor)
+        mc.setAttr(self.solverPlug("muscle", "stretchOffset"), *(self.stretchOffset or [0.0, 0.0, 0.0]))
+        mc.setAttr(self.solverPlug("muscle", "compressionOffset"), *(self.compressionOffset or [0.0, 0.0, 0.0]))
+        mc.setAttr(self.solverPlug("muscle", "centerOffset"),
+                   driverTranslate[0] - restLength*0.5, driverTranslate[1], driverTranslate[2])
+
+    @profilePhase('connectToSolver')
+    @transaction('connectToSolver')
+    def connectToSolver(self, solver):
+        #Replace the aim/point constraints and the volume driver of an updated muscle with one muscleSolver element
+        if any(loc and mc.objExists(loc) for loc in (self.originLoc, self.insertionLoc)):
+            raise RuntimeError("Update {0} before connecting it to a muscle solver".format(self.muscleName))
+
+        indices = mc.getAttr("{0}.muscle".format(solver), multiIndices=True) or []
+        self.solver = solver
+        self.solverIndex = max(indices) + 1 if indices else 0
+
+        restLength = mc.getAttr("{0}.translateX".format(self.muscleTip))
+        driverTranslate = mc.getAttr("{0}.translate".format(self.muscleDriver))[0]
+
+        self.disconnectLodRest()
+        self.removeVolumeDriver()
+        constraints = mc.listRelatives(self.muscleBase, self.muscleTip, self.muscleDriver,
+                                       type=('pointConstraint', 'aimConstraint')) or []
+        if constraints:
+            mc.delete(constraints)
+        self.mainPointConstraint = None
+        self.mainAimConstraint = None
+
+        mc.connectAttr("{0}.worldMatrix[0]".format(self.muscleOrigin), self.solverPlug("muscle", "originMatrix"))
+        mc.connectAttr("{0}.worldMatrix[0]".format(self.muscleInsertion), self.solverPlug("muscle", "insertionMatrix"))
+        self.setSolverInputs(restLength, driverTranslate)
+
+        mc.connectAttr(self.solverPlug("output", "baseRotate"), "{0}.rotate".format(self.muscleBase), force=True)
+        mc.connectAttr(self.solverPlug("output", "tipTranslateX"), "{0}.translateX".format(self.muscleTip), force=True)
+        mc.connectAttr(self.solverPlug("output", "driverTranslate"), "{0}.translate".format(self.muscleDriver), force=True)
+        mc.connectAttr(self.solverPlug("output", "jointScale"), "{0}.scale".format(self.JOmuscle), force=True)
+        mc.connectAttr(self.solverPlug("output", "jointTranslate"), "{0}.translate".format(self.JOmuscle), force=True)
+
+        self.connectLod()
+        self.createDataNode()
+
+    def updateSolver(self):
+        #Same as the constraint rebuild in update(), but the solver element just gets its new rest state
+        restLength = mc.getAttr("{0}.translateX".format(self.muscleTip))
+        driverTranslate = mc.getAttr("{0}.translate".format(self.muscleDriver))[0]
+
+        # use X axis as aim axis, make muscleOrigin point to the end of muscle
+        mc.delete(mc.aimConstraint(self.muscleInsertion, self.muscleOrigin, aimVector=[1,0,0], upVector=[0,1,0],
+                                    worldUpType='scene', offset=[0,0,0],weight=1))
+
+        self.setSolverInputs(restLength, driverTranslate)
+        driverPlug = "{0}.translate".format(self.muscleDriver)
+        if not mc.listConnections(driverPlug, source=True, destination=False):
+            mc.connectAttr(self.solverPlug("output", "driverTranslate"), driverPlug)
+
+
+    def addVolumeDriver(self):
+        if self.volumeMode == 'network':
+            self.addVolumeNetwork()
+        else:
+            self.addSetDrivenKey()
+
+    def listVolumeNodes(self, attrs=None):
+        #Walk upstream from JOmuscle (or only the given attributes of it) through the sdk curves / math nodes that drive it
+        volumeNodes = []
+        nodes = [self.JOmuscle] if attrs is None else ["{0}.{1}".format(self.JOmuscle, attr) for attr in attrs]
+        restBlends = self.listLodRestBlends()
+        while nodes:
+            sources = mc.listConnections(nodes, source=True, destination=False) or []
+            #the LOD rest blends sit between JOmuscle and its driver, the walk goes through them
+            passThrough = [node for node in set(sources) if node in restBlends]
+            nodes = [node for node in set(mc.ls(sources, type=VOLUME_NODE_TYPES)) if node not in volumeNodes]
+            volumeNodes.extend(nodes)
+            nodes += passThrough
+        return volumeNodes
+
+    def removeVolumeDriver(self):
+        volumeNodes = self.listVolumeNodes()
+        if volumeNodes:
+            mc.delete(volumeNodes)
+
+    @profilePhase('addVolumeNetwork')
+    def addVolumeNetwork(self):
+        #Drive JOmuscle analytically instead of with 6 sdk curves:
+        #  ratio = muscleTip.translateX / restLength, clamped to [compressionFactor, stretchFactor] by a setRange
+        #  scaleX = ratio, scaleY = scaleZ = ratio ^ -0.5 (same as sqrt(1/ratio))
+        #  translateY/Z blend linearly to the stretch/compression offsets, like the sdk keys did
+        #The translate part is only built when there is an offset, so the default muscle costs 2 nodes
+        if not self.stretchOffset:
+            self.stretchOffset = [0.0, 0.0, 0.0]
+        if not self.compressionOffset:
+            self.compressionOffset = [0.0, 0.0, 0.0]
+
+        tipLength = "{0}.translateX".format(self.muscleTip)
+        restLength = mc.getAttr(tipLength)
+        stretchLength = restLength*self.stretchFactor
+        compressionLength = restLength*self.compressionFactor
+
+        stretchRange = mc.createNode("setRange", name="{0}_volumeStretch_setRange".format(self.muscleName))
+        mc.connectAttr(tipLength, "{0}.valueX".format(stretchRange))
+        mc.setAttr("{0}.oldMinX".format(stretchRange), compressionLength)
+        mc.setAttr("{0}.oldMaxX".format(stretchRange), stretchLength)
+        mc.setAttr("{0}.minX".format(stretchRange), self.compressionFactor)
+        mc.setAttr("{0}.maxX".format(stretchRange), self.stretchFactor)
+
+        volumeScale = mc.createNode("multiplyDivide", name="{0}_volumeScale_multiplyDivide".format(self.muscleName))
+        #operation 3 is power
+        mc.setAttr("{0}.operation".format(volumeScale), 3)
+        mc.setAttr("{0}.input2X".format(volumeScale), -0.5)
+        mc.connectAttr("{0}.outValueX".format(stretchRange), "{0}.input1X".format(volumeScale))
+
+        mc.connectAttr("{0}.outValueX".format(stretchRange), "{0}.scaleX".format(self.JOmuscle), force=True)
+        mc.connectAttr("{0}.outputX".format(volumeScale), "{0}.scaleY".format(self.JOmuscle), force=True)
+        mc.connectAttr("{0}.outputX".format(volumeScale), "{0}.scaleZ".format(self.JOmuscle), force=True)
+        mc.setAttr("{0}.translate".format(self.JOmuscle), 0.0, 0.0, 0.0)
+
+        if not any(self.stretchOffset[1:]) and not any(self.compressionOffset[1:]):
+            return
+
+        #Y/Z channels of the stretch range go from 0 at rest to the stretch offset,
+        #the compression range goes from the compression offset to 0 at rest, only one of them is non-zero at a time
+        compressionRange = mc.createNode("setRange", name="{0}_volumeCompression_setRange".format(self.muscleName))
+        offsetSum = mc.createNode("plusMinusAverage", name="{0}_volumeOffset_plusMinusAverage".format(self.muscleName))
+        for index, axis in [(1, 'Y'), (2, 'Z')]:
+            mc.connectAttr(tipLength, "{0}.value{1}".format(stretchRange, axis))
+            mc.setAttr("{0}.oldMin{1}".format(stretchRange, axis), restLength)
+            mc.setAttr("{0}.oldMax{1}".format(stretchRange, axis), stretchLength)
+            mc.setAttr("{0}.max{1}".format(stretchRange, axis), self.stretchOffset[index])
+
+            mc.connectAttr(tipLength, "{0}.value{1}".format(compressionRange, axis))
+            mc.setAttr("{0}.oldMin{1}".format(compressionRange, axis), compressionLength)
+            mc.setAttr("{0}.oldMax{1}".format(compressionRange, axis), restLength)
+            mc.setAttr("{0}.min{1}".format(compressionRange, axis), self.compressionOffset[index])
+
+            mc.connectAttr("{0}.outValue{1}".format(stretchRange, axis),
+                           "{0}.input3D[0].input3D{1}".format(offsetSum, axis.lower()))
+            mc.connectAttr("{0}.outValue{1}".format(compressionRange, axis),
+                           "{0}.input3D[1].input3D{1}".format(offsetSum, axis.lower()))
+            mc.connectAttr("{0}.output3D{1}".format(offsetSum, axis.lower()),
+                           "{0}.translate{1}".format(self.JOmuscle, axis), force=True)
+
+    @profilePhase('addSetDrivenKey')
+    def addSetDrivenKey(self):
+        #Set a default offset value
+        if not self.stretchOffset:
+            self.stretchOffset = [0.0, 0.0, 0.0]
+        if not self.compressionOffset:
+            self.compressionOffset = [0.0, 0.0, 0.0]
+            
+        #Tip is the child of muscleBase put in the origin location of muscle
+        #So its translateX is the muscleLength
+        restLength = mc.getAttr("{0}.translateX".format(self.muscleTip))
+
+        #The curves are keyed against the length ratio muscleTip.translateX / restLength instead of the length itself,
+        #so they only depend on the factors and offsets and a new rest length is one setAttr on the ratio node
+        volumeRatio = mc.createNode("multiplyDivide", name="{0}_volumeRatio_multiplyDivide".format(self.muscleName))
+        #operation 2 is divide
+        mc.setAttr("{0}.operation".format(volumeRatio), 2)
+        mc.setAttr("{0}.input2X".format(volumeRatio), restLength)
+        mc.connectAttr("{0}.translateX".format(self.muscleTip), "{0}.input1X".format(volumeRatio))
+        mc.setAttr("{0}.translate".format(self.JOmuscle), 0.0, 0.0, 0.0)
+
+        #Key the curves directly: rest, stretch and compression key, the compression one with a linear in tangent
+        for drivenAttrs, keys in getVolumeCurves(self.compressionFactor, self.stretchFactor,
+                                                 self.stretchOffset, self.compressionOffset):
+            curveType = 'animCurveUL' if drivenAttrs[0].startswith('translate') else 'animCurveUU'
+            #named from muscleName, JOmuscle is a partial path that holds '|' when short names clash
+            curve = mc.createNode(curveType, name="{0}_JOmuscle_{1}".format(self.muscleName, drivenAttrs[0]))
+            for key, (ratio, value) in enumerate(keys):
+                keyFlags = {'inTangentType': "linear"} if key == 2 else {}
+                mc.setKeyframe(curve, float=ratio, value=value, **keyFlags)
+            mc.connectAttr("{0}.outputX".format(volumeRatio), "{0}.input".format(curve))
+            for drivenAttr in drivenAttrs:
+                mc.connectAttr("{0}.output".format(curve), "{0}.{1}".format(self.JOmuscle, drivenAttr), force=True)
+
+    def getVolumeRatioNode(self):
+        #the multiplyDivide feeding the driven key curves, None for network muscles and ones keyed by absolute length
+        curves = mc.listConnections("{0}.scaleX".format(self.JOmuscle), source=True, destination=False,
+                                    type='animCurveUU')
+        if not curves:
+            return None
+        ratios = mc.listConnections("{0}.input".format(curves[0]), source=True, destination=False,
+                                    type='multiplyDivide')
+        return ratios[0] if ratios else None
+
+    # LOD
+    def listLodNodes(self):
+        #The nodes each LOD level takes out of evaluation on top of the levels before it:
+        #  'cheap' - the aim constraint and whatever only drives the Y/Z offsets, JOmuscle keeps scaling with length
+        #  'off'   - the point constraints, the rest of the volume driver and the solver, the joints go to rest
+        #The segment nodes aren't blocked, they follow JOmuscle and muscleTip and so hold still or go to rest with them
+        constraints = mc.listRelatives(self.muscleBase, self.muscleTip, self.muscleDriver,
+                                       type=('pointConstraint', 'aimConstraint')) or []
+        scaleNodes = self.listVolumeNodes(('scaleX', 'scaleY', 'scaleZ'))
+        offsetNodes = [node for node in self.listVolumeNodes(('translateY', 'translateZ')) if node not in scaleNodes]
+        cheap = mc.ls(constraints, type='aimConstraint') + offsetNodes
+        off = mc.ls(constraints, type='pointConstraint') + scaleNodes
+        if self.solver:
+            off.append(self.solver)
+        return {'cheap': cheap, 'off': off}
+
+    def connectLod(self):
+        #Hook this muscle's nodes to the scene's muscle LOD switch, nothing to do when there is none
+        lodNode = getMuscleLodNode()
+        if not lodNode:
+            return
+        lodNodes = self.listLodNodes()
+        statePlugs = ["{0}.nodeState".format(node) for nodes in lodNodes.values() for node in nodes]
+        if not statePlugs:
+            return
+        connections = mc.listConnections(statePlugs, source=True, destination=False, connections=True,
+                                         plugs=True) or []
+        connected = dict(zip(connections[::2], connections[1::2]))
+        for level, nodes in lodNodes.items():
+            levelPlug = getMuscleLodPlug(lodNode, level)
+            for node in nodes:
+                statePlug = "{0}.nodeState".format(node)
+                if connected.get(statePlug) != levelPlug:
+                    mc.connectAttr(levelPlug, statePlug, force=True)
+        self.connectLodRest(getMuscleLodRestPlug(lodNode))
+
+    def getLodRestBlend(self, role, channel, nodeType):
+        return "{0}_{1}_{2}_lodRest_{3}".format(self.muscleName, role, channel, nodeType)
+
+    def listLodRestBlends(self):
+        return mc.ls([self.getLodRestBlend(*restChannel[:3]) for restChannel in MUSCLE_LOD_REST_CHANNELS]) or []
+
+    def getLodRestValues(self):
+        #The driven joint channels at rest, worked out from the locator positions update() applied so the pose the
+        #scene is in doesn't matter: muscleBase doesn't turn against muscleOrigin, muscleTip sits at the rest length
+        #and muscleDriver where the center locator was. Before the first update only JOmuscle's are known
+        restValues = {('JOmuscle', 'translate'): (0.0, 0.0, 0.0), ('JOmuscle', 'scale'): (1.0, 1.0, 1.0)}
+        positions = (self.appliedState or {}).get('positions')
+        if positions:
+            plan = muscleGeometry.planMuscles(*[[position] for position in positions])
+            restLength = float(plan['restLength'][0])
+            centerOffset = plan['centerOffset'][0].tolist()
+            restValues[('muscleBase', 'rotate')] = (0.0, 0.0, 0.0)
+            restValues[('muscleTip', 'translate')] = (restLength, 0.0, 0.0)
+            restValues[('muscleDriver', 'translate')] = (restLength*0.5 + centerOffset[0], centerOffset[1],
+                                                         centerOffset[2])
+        return restValues
+
+    def connectLodRest(self, restPlug):
+        #Blocked nodes hold their last output, so at 'off' a blend per driven joint channel takes over and picks the
+        #joint's rest value instead of its live driver. The live drivers are moved onto the blends here, a new
+        #blend gets its rest value from getLodRestValues, or the live one for a muscle that was never updated
+        restValues = self.getLodRestValues()
+        for role, channel, nodeType, liveAttr, restAttr, outAttr, switchAttr in MUSCLE_LOD_REST_CHANNELS:
+            joint = getattr(self, role)
+            blend = self.getLodRestBlend(role, channel, nodeType)
+            connections = mc.listConnections("{0}.{1}".format(joint, channel), source=True, destination=False,
+                                             connections=True, plugs=True) or []
+            live = [(source, destination) for destination, source in zip(connections[::2], connections[1::2])
+                    if source.split('.', 1)[0] != blend]
+            if not live:
+                continue
+            created = not mc.objExists(blend)
+            if created:
+                mc.createNode(nodeType, name=blend)
+                mc.connectAttr(restPlug, "{0}.{1}".format(blend, switchAttr))
+            for source, destination in live:
+                #the compound or one axis of it, the blend's plugs have the axis letter in the same place
+                attr = destination.split('.', 1)[1]
+                axis = attr[len(channel):]
+                blendAxis = BLEND_AXES[nodeType]['XYZ'.index(axis)] if axis else ''
+                mc.disconnectAttr(source, destination)
+                mc.connectAttr(source, "{0}.{1}".format(blend, liveAttr.format(blendAxis)), force=True)
+                mc.connectAttr("{0}.{1}".format(blend, outAttr.format(blendAxis)), destination, force=True)
+            if created:
+                restValue = restValues.get((role, channel)) or \
+                    mc.getAttr("{0}.{1}".format(blend, liveAttr.format('')))[0]
+                mc.setAttr("{0}.{1}".format(blend, restAttr.format('')), *restValue)
+
+    def disconnectLodRest(self):
+        #Put the live drivers straight back on the joints and delete the rest blends, for the edits and rebuilds
+        #that reconnect the joint channels themselves. connectLod brings the blends back afterwards
+        blends = self.listLodRestBlends()
+        for role, channel, nodeType, liveAttr, restAttr, outAttr, switchAttr in MUSCLE_LOD_REST_CHANNELS:
+            blend = self.getLodRestBlend(role, channel, nodeType)
+            if blend not in blends:
+                continue
+            liveAttrs = dict((outAttr.format(axis), liveAttr.format(axis)) for axis in ('',) + tuple(BLEND_AXES[nodeType]))
+            inputs = mc.listConnections(blend, source=True, destination=False, connections=True, plugs=True) or []
+            sources = dict((plug.split('.', 1)[1], source) for plug, source in zip(inputs[::2], inputs[1::2]))
+            outputs = mc.listConnections(blend, source=False, destination=True, connections=True, plugs=True) or []
+            restore = {}
+            for plug, destination in zip(outputs[::2], outputs[1::2]):
+                live = liveAttrs.get(plug.split('.', 1)[1])
+                if live in sources:
+                    restore[destination] = sources[live]
+                elif liveAttr.format('') in sources:
+                    #a compound driver, e.g. the solver's, goes back onto the whole channel
+                    restore["{0}.{1}".format(destination.split('.', 1)[0], channel)] = sources[liveAttr.format('')]
+            #reconnect before the delete, Maya deletes driven key curves left driving nothing with their node
+            for destination, source in restore.items():
+                mc.connectAttr(source, destination, force=True)
+            mc.delete(blend)
+
+    # Segments
+    # segmentCount > 1 puts that many bind joints next to JOmuscle, spread along the muscle. They all hang off the
+    # one base/tip/driver chain and follow JOmuscle's volume change weighted by the segment profile, so the volume
+    # driver (sdk or network) is still built once per muscle and the segments never need rebuilding on update.
+    @profilePhase('addSegments')
+    def addSegments(self):
+        self.segmentJoints = []
+        if self.segmentCount < 2:
+            return
+        positions, weights = muscleGeometry.segmentProfile(self.segmentCount, self.segmentProfile)
+
+        #translateX = muscleTip.translateX * (position - 0.5), one multiplyDivide spreads three segments
+        spreadPlugs = []
+        for first in range(0, self.segmentCount, 3):
+            spread = mc.createNode("multiplyDivide",
+                                   name="{0}_segmentSpread{1}_multiplyDivide".format(self.muscleName, first//3))
+            for axis, position in zip('XYZ', positions[first:first + 3].tolist()):
+                mc.connectAttr("{0}.translateX".format(self.muscleTip), "{0}.input1{1}".format(spread, axis))
+                mc.setAttr("{0}.input2{1}".format(spread, axis), position - 0.5)
+                spreadPlugs.append("{0}.output{1}".format(spread, axis))
+
+        for index, (spreadPlug, weight) in enumerate(zip(spreadPlugs, weights.tolist())):
+            segment = createJnt("{0}_JOmuscleSegment{1}".format(self.muscleName, index), radius=0.75,
+                                parent=self.muscleOffset)
+            mc.setAttr("{0}.segmentScaleCompensate".format(segment), 0)
+            mc.connectAttr(spreadPlug, "{0}.translateX".format(segment))
+
+            #blender is the segment's weight: 1 takes JOmuscle's scale/offset, 0 stays at rest
+            scaleBlend = mc.createNode("blendColors", name="{0}_scale_blendColors".format(segment))
+            mc.setAttr("{0}.blender".format(scaleBlend), weight)
+            mc.setAttr("{0}.color2".format(scaleBlend), 1.0, 1.0, 1.0)
+            mc.connectAttr("{0}.scale".format(self.JOmuscle), "{0}.color1".format(scaleBlend))
+            mc.connectAttr("{0}.output".format(scaleBlend), "{0}.scale".format(segment))
+
+            offsetBlend = mc.createNode("blendColors", name="{0}_offset_blendColors".format(segment))
+            mc.setAttr("{0}.blender".format(offsetBlend), weight)
+            mc.setAttr("{0}.color2".format(offsetBlend), 0.0, 0.0, 0.0)
+            mc.connectAttr("{0}.translate".format(self.JOmuscle), "{0}.color1".format(offsetBlend))
+            mc.connectAttr("{0}.outputG".format(offsetBlend), "{0}.translateY".format(segment))
+            mc.connectAttr("{0}.outputB".format(offsetBlend), "{0}.translateZ".format(segment))
+            self.segmentJoints.append(segment)
+
+    def listSegmentJoints(self):
+        #every joint next to JOmuscle under muscleOffset is a segment, in creation order
+        if not self.muscleOffset:
+            return []
+        joints = mc.listRelatives(self.muscleOffset, children=True, type='joint') or []
+        return [joint for joint in joints if joint != self.JOmuscle]
+
+    def listSegmentNodes(self):
+        if not self.segmentJoints:
+            return []
+        nodes = mc.listConnections(self.segmentJoints, source=True, destination=False,
+                                   type=('blendColors', 'multiplyDivide')) or []
+        return list(dict.fromkeys(nodes))
+
+    def removeSegments(self):
+        nodes = self.listSegmentNodes() + self.segmentJoints
+        if nodes:
+            mc.delete(nodes)
+        self.segmentJoints = []
+
+    #Rebuild the segments with another count or profile, segmentCount 1 goes back to JOmuscle alone
+    @transaction('setSegments')
+    def setSegments(self, segmentCount, segmentProfile='smooth'):
+        if int(segmentCount) < 1:
+            raise RuntimeError("Invalid segment count {0}, a muscle needs at least one segment".format(segmentCount))
+        self.removeSegments()
+        self.segmentCount = int(segmentCount)
+        self.segmentProfile = segmentProfile
+        self.addSegments()
+        self.connectLod()
+        if mc.objExists(getDataNodeName(self.muscleName)):
+            self.createDataNode()
+
+    @profilePhase('createDataNode')
+    @transaction('createDataNode')
+    def createDataNode(self):
+        data = {'name': self.muscleName,
+                'volumeMode': self.volumeMode,
+                'restLength': self.muscleLength,
+                'compressionFactor': self.compressionFactor,
+                'stretchFactor': self.stretchFactor,
+                'compressionOffset': list(self.compressionOffset or (0, 0, 0)),
+                'stretchOffset': list(self.stretchOffset or (0, 0, 0)),
+                'solverIndex': self.solverIndex,
+                'appliedState': self.appliedState,
+                'segmentCount': self.segmentCount,
+                'segmentProfile': self.segmentProfile}
+        #solver-backed muscles have no main constraints, the solver element replaces them
+        members = {role: getattr(self, role) for role in MUSCLE_MEMBER_ROLES}
+        return writeDataNode(getDataNodeName(self.muscleName), data, members)
+
+    @transaction('delete')
+    def delete(self):
+        #Remove every node of this muscle group, the volume driver nodes included
+        if self.solver and mc.objExists(self.solver):
+            mc.removeMultiInstance(f"{self.solver}.muscle[{self.solverIndex}]", b=True)
+        if self.JOmuscle and mc.objExists(self.JOmuscle):
+            self.disconnectLodRest()
+            self.removeVolumeDriver()
+        nodes = [getattr(self, 'originLoc', None), getattr(self, 'insertionLoc', None),
+                 self.muscleOrigin, self.muscleInsertion, getDataNodeName(self.muscleName)] + self.listSegmentNodes()
+        nodes = [node for node in nodes if node and mc.objExists(node)]
+        if nodes:
+            mc.delete(nodes)
+
+    @classmethod
+    @transaction('createMuscle')
+    def createFromAttachObjects(cls, muscleName, originAttachObj, insertionAttachObj, compressionFactor=1.0,
+                               stretchFactor=1.0, stretchOffset=None, compressionOffset=None, positionCache=None,
+                               volumeMode='sdk', segmentCount=1, segmentProfile='smooth'):
+        #positionCache lets batch builds share the attach object queries between muscles
+        originAttachPos = getWorldPosition(originAttachObj, positionCache)
+        insertionAttachPos = getWorldPosition(insertionAttachObj, positionCache)
+        muscleLength = om2.MVector(insertionAttachPos - originAttachPos).length()
+
+        #create a muscleJointGroup class
+        muscleJointGroup = cls(muscleName, muscleLength, compressionFactor, stretchFactor,
+                               stretchOffset=stretchOffset, compressionOffset=compressionOffset,
+                               volumeMode=volumeMode, segmentCount=segmentCount, segmentProfile=segmentProfile)
+        muscleJointGroup.originAttachObj = originAttachObj
+        muscleJointGroup.insertionAttachObj = insertionAttachObj
+
+        #Match transform and parent joints to the attachObj
+        mc.matchTransform(muscleJointGroup.originLoc, originAttachObj)
+        mc.matchTransform(muscleJointGroup.insertionLoc, insertionAttachObj)
+
+        mc.parent(muscleJointGroup.muscleOrigin, originAttachObj)
+        mc.parent(muscleJointGroup.muscleInsertion, insertionAttachObj)
+
+        mc.parent(muscleJointGroup.originLoc, originAttachObj)
+        mc.parent(muscleJointGroup.insertionLoc, insertionAttachObj)
+
+        return muscleJointGroup
+    
+    @classmethod
+    def getMuscleObjFromDataNode(cls, dataNode):
+        data, members = readDataNode(dataNode)
+
+        #bind to the existing nodes without building anything, the edit locators are looked up when first used
+        muscleObj = cls.__new__(cls)
+        muscleObj.initAttributes(data['name'], data['restLength'], data['compressionFactor'], data['stretchFactor'],
+                                 data['stretchOffset'], data['compressionOffset'], volumeMode=data['volumeMode'],
+                                 segmentCount=data['segmentCount'], segmentProfile=data['segmentProfile'])
+        for role in MUSCLE_MEMBER_ROLES:
+            setattr(muscleObj, role, members.get(role))
+        muscleObj.solverIndex = data['solverIndex'] if muscleObj.solver else None
+        muscleObj.appliedState = data['appliedState']
+        muscleObj.muscleOffset = (mc.listRelatives(muscleObj.JOmuscle, parent=True) or [None])[0]
+        muscleObj.segmentJoints = muscleObj.listSegmentJoints() if muscleObj.segmentCount > 1 else []
+        return muscleObj
+
+
+#Mirror Function
+# Mirror Function with corrections
+@profilePhase('mirror')
+@transaction('mirror')
+def mirror(muscleJointGroup, muscleOriginAttachObj, muscleInsertionAttachObj, mirrorAxis='x'):
+    if mirrorAxis not in MIRROR_AXES:
+        raise RuntimeError("Invalid Mirror Axis")
+
+    # Mirror the origin, insertion and center positions based on the specified axis
+    positions = [mc.xform(node, translation=True, worldSpace=True, query=True)
+                 for node in (muscleJointGroup.muscleOrigin, muscleJointGroup.muscleInsertion, muscleJointGroup.muscleDriver)]
+    mirrorOriginPos, mirrorInsertionPos, mirrorCenterPos = muscleGeometry.mirrorPositions(positions, mirrorAxis).tolist()
+
+    # Determine mirrored muscle name
+    newMuscleName = getMirrorName(muscleJointGroup.muscleName)
+    if newMuscleName is None:
+        raise RuntimeError("Invalid Side Information, muscle joint name should contain 'Left'/'Right' or 'L_'/'R_'")
+
+    # Create mirrored MuscleJointGroup using original attach objects and factors
+    mirrorMuscleGroup = MuscleJointGroup.createFromAttachObjects(
+        newMuscleName, muscleOriginAttachObj, muscleInsertionAttachObj, 
+        compressionFactor=muscleJointGroup.compressionFactor,
+        stretchFactor=muscleJointGroup.stretchFactor,
+        stretchOffset=muscleJointGroup.stretchOffset,
+        compressionOffset=muscleJointGroup.compressionOffset,
+        volumeMode=muscleJointGroup.volumeMode,
+        segmentCount=muscleJointGroup.segmentCount,
+        segmentProfile=muscleJointGroup.segmentProfile
+    )
+
+    # Set the mirrored joint positions
+    mc.xform(mirrorMuscleGroup.originLoc, translation=mirrorOriginPos, worldSpace=True)
+    mc.xform(mirrorMuscleGroup.insertionLoc, translation=mirrorInsertionPos, worldSpace=True)
+    mc.xform(mirrorMuscleGroup.centerLoc, translation=mirrorCenterPos, worldSpace=True)
+
+    # Re-parent mirrored joints to attach objects if they are not already children
+    def safeParent(child, parent):
+        current_parent = mc.listRelatives(child, parent=True)
+        if current_parent is None or current_parent[0] != parent:
+            mc.parent(child, parent)
+
+    safeParent(mirrorMuscleGroup.muscleOrigin, muscleOriginAttachObj)
+    safeParent(mirrorMuscleGroup.originLoc, muscleOriginAttachObj)
+    safeParent(mirrorMuscleGroup.muscleInsertion, muscleInsertionAttachObj)
+    safeParent(mirrorMuscleGroup.insertionLoc, muscleInsertionAttachObj)
+
+
+    mirrorMuscleGroup.update()
+    return mirrorMuscleGroup
+
+
+# Mirror All
+# -----------------------------------
+# Left/Right name tokens, the first one found in a name is swapped. L_/R_ only count at the start of a name
+# or after a non-alphanumeric character, so "SPINAL_" or "CURL_" aren't sides
+MIRROR_NAME_TOKENS = (('Left', 'Right'), ('L_', 'R_'))
+MIRROR_AXES = muscleGeometry.MIRROR_AXES
+mirrorNameCache = {}
+
+
+def _mirrorTokenPattern(token):
+    if token.endswith('_') and len(token) == 2:
+        return re.compile(r'(?<![A-Za-z0-9]){0}'.format(re.escape(token)))
+    return re.compile(re.escape(token))
+
+
+MIRROR_NAME_PATTERNS = [(_mirrorTokenPattern(left), right, _mirrorTokenPattern(right), left)
+                        for left, right in MIRROR_NAME_TOKENS]
+
+
+#Return the name on the other side, or None when the name has no side token. Results are cached
+def getMirrorName(name):
+    if name in mirrorNameCache:
+        return mirrorNameCache[name]
+    mirrorName = None
+    for leftPattern, right, rightPattern, left in MIRROR_NAME_PATTERNS:
+        if leftPattern.search(name):
+            mirrorName = leftPattern.sub(right, name)
+            break
+        if rightPattern.search(name):
+            mirrorName = rightPattern.sub(left, name)
+            break
+    mirrorNameCache[name] = mirrorName
+    return mirrorName
+
+
+def getWorldPositions(nodes):
+    #World translation of many transforms in one API pass, returns an (N, 3) array
+    selectionList = om2.MSelectionList()
+    for node in nodes:
+        selectionList.add(node)
+    positions = np.empty((len(nodes), 3))
+    for index in range(len(nodes)):
+        matrix = selectionList.getDagPath(index).inclusiveMatrix()
+        positions[index] = (matrix[12], matrix[13], matrix[14])
+    return positions
+
+
+#Mirror every muscle on one side to the other side in one batch. The counterpart attach objects are found by
+#name, muscles already on the other side are rebuilt. Returns (muscleGroups, report) like batchCreateMuscles
+@profilePhase('mirrorAll')
+def mirrorAll(side='Left', axis='x'):
+    if axis not in MIRROR_AXES:
+        raise RuntimeError("Invalid Mirror Axis")
+    registry = getMuscleRegistry()
+    dataNodes = sorted(registry.getDataNodesBySide(side))
+
+    sources = []
+    failed = []
+    for dataNode in dataNodes:
+        data, members = readDataNode(dataNode)
+        mirrorName = getMirrorName(data['name'])
+        mirrorAttachObjs = [getMirrorName(members.get(role) or '') for role in ('originAttachObj', 'insertionAttachObj')]
+        missing = [attachObj for attachObj in mirrorAttachObjs if not attachObj or not mc.objExists(attachObj)]
+        if missing or not mirrorName:
+            failed.append({'name': data['name'], 'error': "No mirrored attach object for {0}".format(
+                [members.get('originAttachObj'), members.get('insertionAttachObj')])})
+            continue
+        sources.append((data, members, mirrorName, mirrorAttachObjs))
+
+    specs = []
+    if sources:
+        #origin, insertion and center of every muscle reflected in one step
+        positions = getWorldPositions([members[role] for _, members, _, _ in sources
+                                       for role in ('muscleOrigin', 'muscleInsertion', 'muscleDriver')])
+        positions = muscleGeometry.mirrorPositions(positions, axis).reshape(len(sources), 3, 3)
+        for (data, members, mirrorName, mirrorAttachObjs), musclePositions in zip(sources, positions):
+            specs.append({'name': mirrorName,
+                          'originAttachObj': mirrorAttachObjs[0],
+                          'insertionAttachObj': mirrorAttachObjs[1],
+                          'compressionFactor': data['compressionFactor'],
+                          'stretchFactor': data['stretchFactor'],
+                          'stretchOffset': data['stretchOffset'],
+                          'compressionOffset': data['compressionOffset'],
+                          'volumeMode': data['volumeMode'],
+                          'segmentCount': data['segmentCount'],
+                          'segmentProfile': data['segmentProfile'],
+                          'originPos': musclePositions[0].tolist(),
+                          'insertionPos': musclePositions[1].tolist(),
+                          'centerPos': musclePositions[2].tolist()})
+
+    with MuscleTransaction('mirrorAll'):
+        for spec in specs:
+            existing = registry.getMuscle(spec['name'])
+            if existing:
+                existing.delete()
+        muscleGroups, report = batchCreateMuscles(specs, chunkName='mirrorAll')
+    report['failed'] = failed + report['failed']
+    return muscleGroups, report
+
+
+# Batch Build Functions
+# -----------------------------------
+MUSCLE_SPEC_REQUIRED_KEYS = ('name', 'originAttachObj', 'insertionAttachObj')
+MUSCLE_SPEC_VECTOR_KEYS = ('stretchOffset', 'compressionOffset', 'originPos', 'insertionPos', 'centerPos')
+
+
+def _parseSpecVector(value):
+    #CSV cells hold vectors as "x y z" or "x;y;z", JSON holds them as lists
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        value = value.replace(';', ' ').replace(',', ' ').split()
+    vector = [float(v) for v in value]
+    if len(vector) != 3:
+        raise ValueError("Expected 3 values, got {0}".format(value))
+    return vector
+
+
+#Return a clean copy of one muscle spec, raise ValueError on bad entries
+def normalizeMuscleSpec(spec):
+    for key in MUSCLE_SPEC_REQUIRED_KEYS:
+        if not spec.get(key):
+            raise ValueError("Muscle spec {0} is missing '{1}'".format(spec, key))
+    muscleSpec = {key: spec[key] for key in MUSCLE_SPEC_REQUIRED_KEYS}
+    muscleSpec['compressionFactor'] = float(spec.get('compressionFactor') or 0.5)
+    muscleSpec['stretchFactor'] = float(spec.get('stretchFactor') or 1.5)
+    muscleSpec['volumeMode'] = spec.get('volumeMode') or 'sdk'
+    muscleSpec['segmentCount'] = int(spec.get('segmentCount') or 1)
+    #CSV cells hold a profile name, JSON may also hold a list of weights
+    muscleSpec['segmentProfile'] = spec.get('segmentProfile') or 'smooth'
+    for key in MUSCLE_SPEC_VECTOR_KEYS:
+        muscleSpec[key] = _parseSpecVector(spec.get(key))
+    return muscleSpec
+
+
+#Read muscle specs from a .json (a list, or {"muscles": [...]}) or a .csv file
+def loadMuscleSpecs(filePath):
+    extension = os.path.splitext(filePath)[1].lower()
+    if extension == '.json':
+        with open(filePath) as specFile:
+            data = json.load(specFile)
+        if isinstance(data, dict):
+            data = data.get('muscles', [])
+    elif extension == '.csv':
+        with open(filePath, newline='') as specFile:
+            data = list(csv.DictReader(specFile))
+    else:
+        raise RuntimeError("Unsupported muscle spec file: {0}".format(filePath))
+    return [normalizeMuscleSpec(spec) for spec in data]
+
+
+#Build many muscle groups in one undo chunk with the viewport suspended.
+#Specs carrying locator positions (originPos/insertionPos/centerPos, world space) get them applied and are updated,
+#the others are left in edit mode just like the Create button. Returns (muscleGroups, report)
+@profilePhase('batchCreateMuscles')
+def batchCreateMuscles(specs, chunkName='batchCreateMuscles'):
+    specs = [normalizeMuscleSpec(spec) for spec in specs]
+    positionCache = {}
+    muscleGroups = []
+    report = {'total': 0.0, 'muscles': [], 'failed': []}
+
+    #a muscle whose origin and insertion positions coincide can't be aimed, fail it before building anything
+    placedSpecs = [spec for spec in specs if spec['originPos'] and spec['insertionPos']]
+    lengths = muscleGeometry.restLengths([spec['originPos'] for spec in placedSpecs],
+                                         [spec['insertionPos'] for spec in placedSpecs])
+    zeroLengthSpecs = set(id(spec) for spec, length in zip(placedSpecs, lengths) if length < muscleGeometry.EPSILON)
+
+    batchStart = time.perf_counter()
+    with MuscleTransaction(chunkName):
+        for spec in specs:
+            if id(spec) in zeroLengthSpecs:
+                report['failed'].append({'name': spec['name'], 'error': "Origin and insertion positions are the same"})
+                continue
+            muscleStart = time.perf_counter()
+            try:
+                #a muscle failing halfway is rolled back on its own, the batch goes on with the next one
+                with MuscleTransaction(spec['name']):
+                    muscleGroup = MuscleJointGroup.createFromAttachObjects(
+                        spec['name'], spec['originAttachObj'], spec['insertionAttachObj'],
+                        compressionFactor=spec['compressionFactor'],
+                        stretchFactor=spec['stretchFactor'],
+                        stretchOffset=spec['stretchOffset'],
+                        compressionOffset=spec['compressionOffset'],
+                        positionCache=positionCache,
+                        volumeMode=spec['volumeMode'],
+                        segmentCount=spec['segmentCount'],
+                        segmentProfile=spec['segmentProfile'])
+
+                    locatorPositions = ((muscleGroup.originLoc, spec['originPos']),
+                                        (muscleGroup.insertionLoc, spec['insertionPos']),
+                                        (muscleGroup.centerLoc, spec['centerPos']))
+                    if any(position for _, position in locatorPositions):
+                        for loc, position in locatorPositions:
+                            if position:
+                                mc.xform(loc, translation=position, worldSpace=True)
+                        muscleGroup.update()
+            except Exception as e:
+                report['failed'].append({'name': spec['name'], 'error': str(e)})
+                continue
+            muscleGroups.append(muscleGroup)
+            report['muscles'].append({'name': spec['name'], 'seconds': time.perf_counter() - muscleStart})
+    report['total'] = time.perf_counter() - batchStart
+    return muscleGroups, report
+
+
+def printBatchReport(report):
+    for muscle in report['muscles']:
+        print("  {0:<40} {1:8.3f}s".format(muscle['name'], muscle['seconds']))
+    for failure in report['failed']:
+        print("  {0:<40} FAILED: {1}".format(failure['name'], failure['error']))
+    print("Built {0} muscles in {1:.3f}s ({2} failed)".format(
+        len(report['muscles']), report['total'], len(report['failed'])))
+
+
+# Muscle Presets
+# -----------------------------------
+# A preset stores every muscle's definition with its origin, insertion and center positions relative to its attach
+# objects (see muscleGeometry.toAttachSpace), so it can be rebuilt on another skeleton with other proportions.
+MUSCLE_PRESET_VERSION = 1
+MUSCLE_PRESET_POSITION_ROLES = (('originPos', 'muscleOrigin'), ('insertionPos', 'muscleInsertion'),
+                                ('centerPos', 'muscleDriver'))
+MUSCLE_PRESET_DECIMALS = 6
+
+
+def _roundedList(values):
+    return [round(value, MUSCLE_PRESET_DECIMALS) for value in values]
+
+
+#Write every muscle in the scene (or the given data nodes) to a compact json preset, returns the muscle count
+@profilePhase('exportMusclePreset')
+def exportMusclePreset(filePath, dataNodes=None):
+    if dataNodes is None:
+        dataNodes = sorted(getMuscleRegistry().dataNodes())
+    muscles = [readDataNode(dataNode) for dataNode in dataNodes]
+
+    #attach objects and muscle joints of every muscle in one query
+    nodes = [members[role] for _, members in muscles
+             for role in ('originAttachObj', 'insertionAttachObj', 'muscleOrigin', 'muscleInsertion', 'muscleDriver')]
+    positions = getWorldPositions(nodes).reshape(len(muscles), 5, 3) if muscles else np.zeros((0, 5, 3))
+    attachPositions = muscleGeometry.toAttachSpace(positions[:, 2:], positions[:, 0], positions[:, 1])
+
+    presetMuscles = []
+    for (data, members), musclePositions in zip(muscles, attachPositions):
+        presetMuscle = {'name': data['name'],
+                        'originAttachObj': members['originAttachObj'],
+                        'insertionAttachObj': members['insertionAttachObj'],
+                        'restLength': round(data['restLength'], MUSCLE_PRESET_DECIMALS),
+                        'compressionFactor': data['compressionFactor'],
+                        'stretchFactor': data['stretchFactor'],
+                        'stretchOffset': _roundedList(data['stretchOffset']),
+                        'compressionOffset': _roundedList(data['compressionOffset']),
+                        'volumeMode': data['volumeMode'],
+                        'segmentCount': data['segmentCount'],
+                        'segmentProfile': data['segmentProfile']}
+        for (key, _), position in zip(MUSCLE_PRESET_POSITION_ROLES, musclePositions.tolist()):
+            presetMuscle[key] = _roundedList(position)
+        presetMuscles.append(presetMuscle)
+
+    with open(filePath, 'w') as presetFile:
+        json.dump({'version': MUSCLE_PRESET_VERSION, 'space': 'attach', 'muscles': presetMuscles}, presetFile,
+                  separators=(',', ':'))
+    return len(presetMuscles)
+
+
+def loadMusclePreset(filePath):
+    with open(filePath) as presetFile:
+        preset = json.load(presetFile)
+    if preset.get('space') != 'attach' or preset.get('version', 0) > MUSCLE_PRESET_VERSION:
+        raise RuntimeError("{0} is not a muscle preset this version can read".format(filePath))
+    return preset['muscles']
+
+
+#Rebuild a preset in one batch. attachMap renames attach objects for another skeleton ({'L_arm': 'L_upperArm'}),
+#muscles that already exist are rebuilt. Rest lengths come from the new skeleton. Returns (muscleGroups, report)
+@profilePhase('importMusclePreset')
+def importMusclePreset(filePath, attachMap=None):
+    attachMap = attachMap or {}
+    presetMuscles = []
+    failed = []
+    for presetMuscle in loadMusclePreset(filePath):
+        presetMuscle = dict(presetMuscle)
+        for role in ('originAttachObj', 'insertionAttachObj'):
+            presetMuscle[role] = attachMap.get(presetMuscle[role], presetMuscle[role])
+        missing = [presetMuscle[role] for role in ('originAttachObj', 'insertionAttachObj')
+                   if not mc.objExists(presetMuscle[role])]
+        if missing:
+            failed.append({'name': presetMuscle['name'], 'error': "Missing attach objects {0}".format(missing)})
+            continue
+        presetMuscles.append(presetMuscle)
+
+    specs = []
+    if presetMuscles:
+        attachPositions = getWorldPositions([presetMuscle[role] for presetMuscle in presetMuscles
+                                             for role in ('originAttachObj', 'insertionAttachObj')])
+        attachPositions = attachPositions.reshape(len(presetMuscles), 2, 3)
+        localPositions = [[presetMuscle[key] for key, _ in MUSCLE_PRESET_POSITION_ROLES] for presetMuscle in presetMuscles]
+        worldPositions = muscleGeometry.fromAttachSpace(localPositions, attachPositions[:, 0], attachPositions[:, 1])
+        for presetMuscle, musclePositions in zip(presetMuscles, worldPositions.tolist()):
+            spec = dict((key, presetMuscle.get(key)) for key in ('name', 'originAttachObj', 'insertionAttachObj',
+                                                                 'compressionFactor', 'stretchFactor', 'stretchOffset',
+                                                                 'compressionOffset', 'volumeMode',
+                                                                 'segmentCount', 'segmentProfile'))
+            for (key, _), position in zip(MUSCLE_PRESET_POSITION_ROLES, musclePositions):
+                spec[key] = position
+            specs.append(spec)
+
+    registry = getMuscleRegistry()
+    with MuscleTransaction('importMusclePreset'):
+        for spec in specs:
+            existing = registry.getMuscle(spec['name'])
+            if existing:
+                existing.delete()
+        muscleGroups, report = batchCreateMuscles(specs, chunkName='importMusclePreset')
+    report['failed'] = failed + report['failed']
+    return muscleGroups, report
+
+
+# Auto Placement
+# -----------------------------------
+# Snaps the edit locators of muscles onto a skin or muscle guide mesh. The mesh's vertices go into a
+# muscleGeometry.VertexGrid once, every muscle is then placed with a few vectorized nearest vertex queries.
+meshIndexCache = {}
+
+
+def getMeshPoints(mesh):
+    #World space vertex positions of a mesh (or of a transform's mesh shape) as an (N, 3) array
+    selectionList = om2.MSelectionList()
+    selectionList.add(mesh)
+    dagPath = selectionList.getDagPath(0)
+    if not dagPath.node().hasFn(om2.MFn.kMesh):
+        dagPath.extendToShape()
+    return np.array(om2.MFnMesh(dagPath).getPoints(om2.MSpace.kWorld))[:, :3]
+
+
+#The index is kept per mesh name, rebuild it after the mesh was changed
+def getMeshIndex(mesh, rebuild=False):
+    if rebuild or mesh not in meshIndexCache:
+        meshIndexCache[mesh] = muscleGeometry.VertexGrid(getMeshPoints(mesh))
+    return meshIndexCache[mesh]
+
+
+#Place the origin, insertion and center locators of the given muscles that are in edit mode. Without a list the
+#registered muscles are used, those are the ones that were updated once and then put back in edit mode.
+#depth / attachDepth go from the medial axis between the attach joints (0) to the surface (1), direction picks the
+#side of the limb the muscle sits on, e.g. (0, 0, 1) for the front. Returns the muscle groups that were placed
+@profilePhase('autoPlaceMuscles')
+def autoPlaceMuscles(mesh, muscleGroups=None, direction=None, depth=0.5, attachDepth=0.0, update=False):
+    if muscleGroups is None:
+        muscleGroups = getMuscleRegistry().getMuscles()
+    muscleGroups = [muscleGroup for muscleGroup in muscleGroups
+                    if all(loc and mc.objExists(loc) for loc in
+                           (muscleGroup.originLoc, muscleGroup.insertionLoc, muscleGroup.centerLoc))]
+    if not muscleGroups:
+        return []
+
+    attachPositions = getWorldPositions([attachObj for muscleGroup in muscleGroups
+                                         for attachObj in (muscleGroup.originAttachObj, muscleGroup.insertionAttachObj)])
+    attachPositions = attachPositions.reshape(len(muscleGroups), 2, 3)
+    placements = muscleGeometry.surfacePlacements(getMeshIndex(mesh), attachPositions[:, 0], attachPositions[:, 1],
+                                                  direction=direction, depth=depth, attachDepth=attachDepth)
+
+    with MuscleTransaction('autoPlaceMuscles'):
+        for muscleGroup, positions in zip(muscleGroups, placements.tolist()):
+            for loc, position in zip((muscleGroup.originLoc, muscleGroup.insertionLoc, muscleGroup.centerLoc), positions):
+                mc.xform(loc, translation=position, worldSpace=True)
+            if update:
+                muscleGroup.update()
+    return muscleGroups
+
+
+# Skin Weights
+# -----------------------------------
+# Initial weights for the muscle bind joints on a skinned mesh: JOmuscle, or the segment joints of a segmented
+# muscle. A muscle is a chain of capsules from muscleOrigin through muscleDriver (the belly) to muscleInsertion with
+# a radius of radiusRatio times its length, every bind joint takes its stretch of it (see
+# muscleGeometry.capsuleWeights).
+# All capsules are weighted against the mesh's VertexGrid in one vectorized pass, then MFnSkinCluster.setWeights
+# writes only the vertices a capsule reaches and only the muscle joints, normalize makes room by scaling the
+# vertex's other weights down. The writes go in blocks of SKIN_WEIGHT_CHUNK vertices from one region of the mesh, so
+# a block only carries the few muscle joints near it instead of every vertex times every joint.
+# API weight edits aren't undoable, the influences added to the skinCluster are.
+SKIN_WEIGHT_CHUNK = 20000
+
+
+def getSkinCluster(mesh):
+    skinClusters = mc.ls(mc.listHistory(mesh) or [], type='skinCluster')
+    return skinClusters[0] if skinClusters else None
+
+
+def listBindJoints(muscleGroup):
+    return list(muscleGroup.segmentJoints) or [muscleGroup.JOmuscle]
+
+
+#Weight the bind joints of the given muscles (the registered ones by default) on a mesh bound to the skeleton.
+#strength is the share a vertex deep inside a muscle gives to it, falloff the width of the blend beyond the radius
+#relative to the radius. Joints that aren't influences yet are added with zero weight first.
+#Returns the number of vertices that got muscle weights
+@profilePhase('capsuleSkinWeights')
+def capsuleSkinWeights(mesh, muscleGroups=None, strength=1.0, falloff=1.0, radiusRatio=0.15, skinCluster=None):
+    if muscleGroups is None:
+        muscleGroups = getMuscleRegistry().getMuscles()
+    muscleGroups = [muscleGroup for muscleGroup in muscleGroups
+                    if all(node and mc.objExists(node) for node in
+                           (muscleGroup.muscleOrigin, muscleGroup.muscleInsertion, muscleGroup.muscleDriver,
+                            muscleGroup.JOmuscle))]
+    if not muscleGroups:
+        return 0
+    skinCluster = skinCluster or getSkinCluster(mesh)
+    if not skinCluster:
+        raise RuntimeError("{0} has no skinCluster, bind it to the skeleton first".format(mesh))
+
+    positions = getWorldPositions([node for muscleGroup in muscleGroups for node in
+                                   (muscleGroup.muscleOrigin, muscleGroup.muscleInsertion, muscleGroup.muscleDriver)])
+    positions = positions.reshape(len(muscleGroups), 3, 3)
+    radii = muscleGeometry.restLengths(positions[:, 0], positions[:, 1])*radiusRatio
+    bindJoints = [listBindJoints(muscleGroup) for muscleGroup in muscleGroups]
+    starts, ends, muscleIds, capsuleJoints = muscleGeometry.capsuleSegments(
+        positions[:, 0], positions[:, 1], positions[:, 2], [len(joints) for joints in bindJoints])
+    #the skin's current shape, a cached index may be from another pose
+    grid = getMeshIndex(mesh, rebuild=True)
+    vertexIds, jointIds, weights = muscleGeometry.capsuleWeights(grid, starts, ends, radii[muscleIds], falloff,
+                                                                 jointIds=capsuleJoints)
+    weights = muscleGeometry.blendCapsuleWeights(vertexIds, weights, len(grid.vertices), strength)
+
+    joints = [mc.ls(joint, long=True)[0] for joints in bindJoints for joint in joints]
+    with MuscleTransaction('capsuleSkinWeights'):
+        influences = set(mc.ls(mc.skinCluster(skinCluster, query=True, influence=True) or [], long=True))
+        missing = [joint for joint in joints if joint not in influences]
+        if missing:
+            mc.skinCluster(skinCluster, edit=True, addInfluence=missing, weight=0.0)
+        if len(weights):
+            setSkinWeights(skinCluster, mesh, joints, vertexIds, jointIds, weights, vertexOrder=grid.order)
+    return len(np.unique(vertexIds))
+
+
+#Write sparse (vertexIds, jointIds, weights) to a skinCluster, jointIds index into joints (long names)
+def setSkinWeights(skinCluster, mesh, joints, vertexIds, jointIds, weights, vertexOrder=None,
+                   chunkSize=SKIN_WEIGHT_CHUNK):
+    selectionList = om2.MSelectionList()
+    selectionList.add(skinCluster)
+    selectionList.add(mesh)
+    skinFn = oma2.MFnSkinCluster(selectionList.getDependNode(0))
+    meshPath = selectionList.getDagPath(1)
+    if not meshPath.node().hasFn(om2.MFn.kMesh):
+        meshPath.extendToShape()
+
+    influenceIndices = dict((path.fullPathName(), index) for index, path in enumerate(skinFn.influenceObjects()))
+    jointIndices = np.array([influenceIndices[joint] for joint in joints])
+    for vertices, chunkJoints, chunkWeights in muscleGeometry.denseWeightChunks(vertexIds, jointIds, weights,
+                                                                                vertexOrder, chunkSize):
+        componentFn = om2.MFnSingleIndexedComponent()
+        components = componentFn.create(om2.MFn.kMeshVertComponent)
+        componentFn.addElements(vertices.tolist())
+        skinFn.setWeights(meshPath, components, om2.MIntArray(jointIndices[chunkJoints].tolist()),
+                          om2.MDoubleArray(chunkWeights.ravel().tolist()), normalize=True)
+
+
+# Muscle Registry
+# -----------------------------------
+# Keeps an in-memory index of every muscle data node in the scene. The scene is scanned once, after that
+# node added/removed and name changed callbacks keep the index current instead of querying the scene again.
+MUSCLE_SIDES = ('Left', 'Right', 'Center')
+
+
+def getMuscleSide(muscleName):
+    #same tokens as the mirror name table
+    for leftPattern, _, rightPattern, _ in MIRROR_NAME_PATTERNS:
+        if leftPattern.search(muscleName):
+            return 'Left'
+        if rightPattern.search(muscleName):
+            return 'Right'
+    return 'Center'
+
+
+class MuscleRegistry:
+    def __init__(self):
+        self.entries = {}       # dataNode -> {'name', 'side', 'originAttachObj', 'insertionAttachObj'}
+        self.nameIndex = {}     # muscleName -> dataNode
+        self.sideIndex = {side: set() for side in MUSCLE_SIDES}
+        self.attachIndex = {}   # attachObj -> set of dataNodes
+        #network nodes added since the last lookup, their attributes don't exist yet inside the added callback
+        self.pending = set()
+        self.callbackIds = []
+        self.scan()
+
+    def scan(self):
+        #data nodes from older versions of the tool are rewritten in the current layout first
+        migrateLegacyDataNodes()
+
+        for index in (self.entries, self.nameIndex, self.attachIndex):
+            index.clear()
+        for dataNodes in self.sideIndex.values():
+            dataNodes.clear()
+        self.pending.clear()
+
+        #recursive finds the data nodes of referenced and namespaced rigs too
+        dataNodes = mc.ls("*.muscleData", type="network", objectsOnly=True, recursive=True)
+        if not dataNodes:
+            return
+        #one listConnections call returns the members of every muscle
+        connections = mc.listConnections([f"{node}.members" for node in dataNodes], source=True, destination=False,
+                                         connections=True) or []
+        dataNodeMembers = parseMemberConnections(connections)
+        for node in dataNodes:
+            data = json.loads(mc.getAttr(f"{node}.muscleData") or "{}")
+            members = dataNodeMembers.get(node, {})
+            self.addEntry(node, data.get('name', ''), members.get('originAttachObj'), members.get('insertionAttachObj'))
+
+    def addEntry(self, dataNode, muscleName, originAttachObj, insertionAttachObj):
+        side = getMuscleSide(muscleName)
+        self.entries[dataNode] = {'name': muscleName, 'side': side,
+                                  'originAttachObj': originAttachObj, 'insertionAttachObj': insertionAttachObj}
+        self.nameIndex[muscleName] = dataNode
+        self.sideIndex[side].add(dataNode)
+        for attachObj in (originAttachObj, insertionAttachObj):
+            if attachObj:
+                self.attachIndex.setdefault(attachObj, set()).add(dataNode)
+
+    def removeEntry(self, dataNode):
+        self.pending.discard(dataNode)
+        entry = self.entries.pop(dataNode, None)
+        if entry is None:
+            return
+        if self.nameIndex.get(entry['name']) == dataNode:
+            del self.nameIndex[entry['name']]
+        self.sideIndex[entry['side']].discard(dataNode)
+        for attachObj in (entry['originAttachObj'], entry['insertionAttachObj']):
+            dataNodes = self.attachIndex.get(attachObj)
+            if dataNodes is not None:
+                dataNodes.discard(dataNode)
+                if not dataNodes:
+                    del self.attachIndex[attachObj]
+
+    def resolvePending(self):
+        pending, self.pending = self.pending, set()
+        for node in pending:
+            if not mc.objExists(node) or not mc.attributeQuery("muscleData", node=node, exists=True):
+                continue
+            data, members = readDataNode(node)
+            self.addEntry(node, data['name'], members.get('originAttachObj'), members.get('insertionAttachObj'))
+
+    # Callbacks
+    def addCallbacks(self):
+        if self.callbackIds:
+            return
+        self.callbackIds = [
+            om2.MDGMessage.addNodeAddedCallback(self.onNodeAdded, "network"),
+            om2.MDGMessage.addNodeRemovedCallback(self.onNodeRemoved, "dependNode"),
+            om2.MNodeMessage.addNameChangedCallback(om2.MObject.kNullObj, self.onNameChanged),
+            om2.MSceneMessage.addCallback(om2.MSceneMessage.kAfterNew, self.onSceneChanged),
+            om2.MSceneMessage.addCallback(om2.MSceneMessage.kAfterOpen, self.onSceneChanged),
+        ]
+
+    def removeCallbacks(self):
+        if self.callbackIds:
+            om2.MMessage.removeCallbacks(self.callbackIds)
+        self.callbackIds = []
+
+    def onNodeAdded(self, node, clientData=None):
+        self.pending.add(om2.MFnDependencyNode(node).name())
+
+    def onNodeRemoved(self, node, clientData=None):
+        name = om2.MFnDependencyNode(node).name()
+        if name in self.entries or name in self.pending:
+            self.removeEntry(name)
+        elif name in self.attachIndex:
+            for dataNode in self.attachIndex.pop(name):
+                entry = self.entries[dataNode]
+                for key in ('originAttachObj', 'insertionAttachObj'):
+                    if entry[key] == name:
+                        entry[key] = None
+
+    def onNameChanged(self, node, previousName, clientData=None):
+        name = om2.MFnDependencyNode(node).name()
+        if previousName in self.pending:
+            self.pending.discard(previousName)
+            self.pending.add(name)
+        if previousName in self.entries:
+            entry = self.entries.pop(previousName)
+            self.entries[name] = entry
+            self.nameIndex[entry['name']] = name
+            self.sideIndex[entry['side']].discard(previousName)
+            self.sideIndex[entry['side']].add(name)
+            for attachObj in (entry['originAttachObj'], entry['insertionAttachObj']):
+                dataNodes = self.attachIndex.get(attachObj)
+                if dataNodes is not None and previousName in dataNodes:
+                    dataNodes.discard(previousName)
+                    dataNodes.add(name)
+        if previousName in self.attachIndex:
+            dataNodes = self.attachIndex.pop(previousName)
+            self.attachIndex[name] = dataNodes
+            for dataNode in dataNodes:
+                entry = self.entries[dataNode]
+                for key in ('originAttachObj', 'insertionAttachObj'):
+                    if entry[key] == previousName:
+                        entry[key] = name
+
+    def onSceneChanged(self, clientData=None):
+        self.scan()
+
+    # Lookups
+    def dataNodes(self):
+        self.resolvePending()
+        return list(self.entries)
+
+    def getDataNode(self, muscleName):
+        self.resolvePending()
+        return self.nameIndex.get(muscleName)
+
+    def getDataNodesBySide(self, side):
+        self.resolvePending()
+        return list(self.sideIndex.get(side, ()))
+
+    def getDataNodesByAttachObj(self, attachObj):
+        #every muscle whose origin or insertion is attached to attachObj
+        self.resolvePending()
+        return list(self.attachIndex.get(attachObj, ()))
+
+    def muscleNames(self):
+        self.resolvePending()
+        return sorted(self.nameIndex)
+
+    def getMuscle(self, muscleName):
+        dataNode = self.getDataNode(muscleName)
+        return MuscleJointGroup.getMuscleObjFromDataNode(dataNode) if dataNode else None
+
+    def getMuscles(self):
+        #Rehydrate every muscle in the scene, this only reads the data nodes
+        return [MuscleJointGroup.getMuscleObjFromDataNode(dataNode) for dataNode in self.dataNodes()]
+
+
+muscleRegistry = None
+
+
+#Shared registry with callbacks installed, built on first use
+def getMuscleRegistry():
+    global muscleRegistry
+    if muscleRegistry is None:
+        muscleRegistry = MuscleRegistry()
+        muscleRegistry.addCallbacks()
+    return muscleRegistry
+
+
+# Update Dirty Muscles
+# -----------------------------------
+#Update only the muscles whose locators or parameters changed since their last update, all muscles in the scene
+#are checked unless a list is given. Returns a report with the names of the 'rebuilt', 'volume' and 'skipped' muscles
+@profilePhase('updateDirtyMuscles')
+def updateDirtyMuscles(muscleGroups=None):
+    start = time.perf_counter()
+    if muscleGroups is None:
+        muscleGroups = getMuscleRegistry().getMuscles()
+    report = {'rebuilt': [], 'volume': [], 'skipped': [], 'total': 0.0}
+    with MuscleTransaction('updateDirtyMuscles'):
+        for muscleGroup in muscleGroups:
+            report[muscleGroup.updateIfDirty()].append(muscleGroup.muscleName)
+    report['total'] = time.perf_counter() - start
+    return report
+
+
+def printUpdateReport(report):
+    print("Rebuilt {0}, volume only {1}, skipped {2} muscles in {3:.3f}s".format(
+        len(report['rebuilt']), len(report['volume']), len(report['skipped']), report['total']))
+
+
+# Live Edit
+# -----------------------------------
+# Opt-in. While a live edit session runs, every muscle in edit mode has attribute changed callbacks on its edit
+# locators. A move only marks the muscle pending and, for the first move of a burst, queues one lowest priority
+# evalDeferred refresh, so a drag that sets the translate hundreds of times costs one refresh once Maya is idle.
+# The refresh runs liveUpdate() on the pending muscles only, which redoes their volume driver for the new rest
+# length without closing the edit. Muscles entering edit mode later are picked up by edit() itself.
+LIVE_EDIT_ATTRIBUTES = ('translate', 'translateX', 'translateY', 'translateZ')
+liveEditSession = None
+
+
+class LiveEditSession:
+    def __init__(self):
+        #muscleName: {'muscle', 'restLength', 'callbackIds'}
+        self.watched = {}
+        self.pending = set()
+        self.refreshQueued = False
+        self.callbackIds = []
+
+    def start(self, muscleGroups=None):
+        if muscleGroups is None:
+            muscleGroups = getMuscleRegistry().getMuscles()
+        for muscleGroup in muscleGroups:
+            if muscleGroup.getLocatorPositions() is not None:
+                self.watch(muscleGroup)
+        self.callbackIds = [
+            om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeNew, self.onSceneChanging),
+            om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeOpen, self.onSceneChanging),
+        ]
+
+    def stop(self):
+        if self.callbackIds:
+            om2.MMessage.removeCallbacks(self.callbackIds)
+        self.callbackIds = []
+        for muscleName in list(self.watched):
+            self.unwatchName(muscleName)
+
+    def watch(self, muscleGroup):
+        self.unwatchName(muscleGroup.muscleName)
+        locs = [loc for loc in (muscleGroup.originLoc, muscleGroup.insertionLoc, muscleGroup.centerLoc)
+                if loc and mc.objExists(loc)]
+        self.watched[muscleGroup.muscleName] = {
+            'muscle': muscleGroup,
+            'restLength': mc.getAttr("{0}.translateX".format(muscleGroup.muscleTip)),
+            'callbackIds': [om2.MNodeMessage.addAttributeChangedCallback(getMObject(loc), self.onLocatorChanged,
+                                                                         muscleGroup.muscleName) for loc in locs],
+        }
+
+    def unwatch(self, muscleGroup):
+        self.unwatchName(muscleGroup.muscleName)
+
+    def unwatchName(self, muscleName):
+        entry = self.watched.pop(muscleName, None)
+        self.pending.discard(muscleName)
+        if entry and entry['callbackIds']:
+            om2.MMessage.removeCallbacks(entry['callbackIds'])
+
+    def onLocatorChanged(self, message, plug, otherPlug, muscleName):
+        if not message & om2.MNodeMessage.kAttributeSet:
+            return
+        if plug.partialName(useLongNames=True) not in LIVE_EDIT_ATTRIBUTES:
+            return
+        self.pending.add(muscleName)
+        if not self.refreshQueued:
+            self.refreshQueued = True
+            mc.evalDeferred(self.refresh, lowestPriority=True)
+
+    def refresh(self):
+        #Returns the names of the muscles whose rest length changed
+        self.refreshQueued = False
+        pending, self.pending = self.pending, set()
+        refreshed = []
+        with MuscleTransaction('liveEdit'):
+            for muscleName in sorted(pending):
+                entry = self.watched.get(muscleName)
+                if entry is None:
+                    continue
+                muscleGroup = entry['muscle']
+                if muscleGroup.getLocatorPositions() is None:
+                    #updated or deleted some other way
+                    self.unwatchName(muscleName)
+                    continue
+                restLength = muscleGroup.liveUpdate(entry['restLength'])
+                if restLength != entry['restLength']:
+                    entry['restLength'] = restLength
+                    refreshed.append(muscleName)
+        return refreshed
+
+    def onSceneChanging(self, clientData=None):
+        stopLiveEdit()
+
+
+#Start a live edit session on every muscle in edit mode (or the given ones) and on those edited afterwards
+def startLiveEdit(muscleGroups=None):
+    global liveEditSession
+    stopLiveEdit()
+    session = LiveEditSession()
+    session.start(muscleGroups)
+    liveEditSession = session
+    return session
+
+
+def stopLiveEdit():
+    global liveEditSession
+    session, liveEditSession = liveEditSession, None
+    if session is not None:
+        session.stop()
+
+
+# Muscle LOD
+# -----------------------------------
+# One switch for every muscle in the scene: the 'lod' enum of the muscleLOD network node, or of a rig control
+# driving it. A condition node per level turns the enum into a nodeState, blocking (2) from that level on, and each
+# muscle's constraints and volume nodes have their nodeState connected to the level that turns them off (see
+# MuscleJointGroup.listLodNodes). Blocked nodes don't evaluate at all and hold their last output, so at 'off' the
+# driven joint channels are switched to their rest values by a blend each (MUSCLE_LOD_REST_CHANNELS), with the
+# condition's outColorG as the switch. At 'cheap' the aimed joints hold the pose they had when the level went down.
+# It all works in playback without any tool code running. Muscles hook themselves up whenever they are created or
+# updated.
+MUSCLE_LOD_LEVELS = ('full', 'cheap', 'off')
+MUSCLE_LOD_NODE = 'muscleLOD'
+MUSCLE_LOD_ATTR = 'lod'
+NODE_STATE_BLOCKING = 2
+#role, joint channel, blend node type, live input, rest input, output, switch.
+#'{0}' takes the axis of the blend's child plugs, BLEND_AXES in the joint's X/Y/Z order
+MUSCLE_LOD_REST_CHANNELS = (
+    ('muscleBase', 'rotate', 'pairBlend', 'inRotate{0}1', 'inRotate{0}2', 'outRotate{0}', 'weight'),
+    ('muscleTip', 'translate', 'pairBlend', 'inTranslate{0}1', 'inTranslate{0}2', 'outTranslate{0}', 'weight'),
+    ('muscleDriver', 'translate', 'pairBlend', 'inTranslate{0}1', 'inTranslate{0}2', 'outTranslate{0}', 'weight'),
+    ('JOmuscle', 'translate', 'pairBlend', 'inTranslate{0}1', 'inTranslate{0}2', 'outTranslate{0}', 'weight'),
+    ('JOmuscle', 'scale', 'blendColors', 'color2{0}', 'color1{0}', 'output{0}', 'blender'),
+)
+BLEND_AXES = {'pairBlend': 'XYZ', 'blendColors': 'RGB'}
+
+
+def getMuscleLodNode():
+    return MUSCLE_LOD_NODE if mc.objExists(MUSCLE_LOD_NODE) else None
+
+
+def getMuscleLodPlug(lodNode, level):
+    #the nodeState plug of the nodes that level turns off
+    return "{0}_{1}_condition.outColorR".format(lodNode, level)
+
+
+def getMuscleLodRestPlug(lodNode):
+    #1 at 'off', the switch of the rest blends
+    return "{0}_off_condition.outColorG".format(lodNode)
+
+
+#Create the LOD switch and hook every muscle up to it. With a control, the control gets a muscleLod enum that
+#drives the switch, e.g. the rig's global control so animators find it in the channel box. Returns the LOD node
+def createMuscleLod(control=None):
+    with MuscleTransaction('createMuscleLod'):
+        lodNode = getMuscleLodNode()
+        if not lodNode:
+            lodNode = mc.createNode('network', name=MUSCLE_LOD_NODE)
+            mc.addAttr(lodNode, longName=MUSCLE_LOD_ATTR, attributeType='enum', enumName=':'.join(MUSCLE_LOD_LEVELS))
+            mc.setAttr("{0}.{1}".format(lodNode, MUSCLE_LOD_ATTR), channelBox=True)
+            for levelIndex, level in enumerate(MUSCLE_LOD_LEVELS[1:], 1):
+                condition = mc.createNode('condition', name="{0}_{1}_condition".format(lodNode, level))
+                mc.connectAttr("{0}.{1}".format(lodNode, MUSCLE_LOD_ATTR), "{0}.firstTerm".format(condition))
+                mc.setAttr("{0}.secondTerm".format(condition), levelIndex)
+                #operation 3 is greater or equal: a level also turns off what the cheaper levels do
+                mc.setAttr("{0}.operation".format(condition), 3)
+                mc.setAttr("{0}.colorIfTrueR".format(condition), NODE_STATE_BLOCKING)
+                mc.setAttr("{0}.colorIfFalseR".format(condition), 0)
+                mc.setAttr("{0}.colorIfTrueG".format(condition), 1)
+                mc.setAttr("{0}.colorIfFalseG".format(condition), 0)
+
+        if control:
+            controlPlug = "{0}.muscleLod".format(control)
+            if not mc.attributeQuery('muscleLod', node=control, exists=True):
+                mc.addAttr(control, longName='muscleLod', attributeType='enum', enumName=':'.join(MUSCLE_LOD_LEVELS),
+                           keyable=True)
+            mc.connectAttr(controlPlug, "{0}.{1}".format(lodNode, MUSCLE_LOD_ATTR), force=True)
+
+        for muscleGroup in getMuscleRegistry().getMuscles():
+            muscleGroup.connectLod()
+    return lodNode
+
+
+def getMuscleLod():
+    lodNode = getMuscleLodNode()
+    if not lodNode:
+        return MUSCLE_LOD_LEVELS[0]
+    return MUSCLE_LOD_LEVELS[int(mc.getAttr("{0}.{1}".format(lodNode, MUSCLE_LOD_ATTR)))]
+
+
+#Switch every muscle to 'full', 'cheap' or 'off', creating the switch on first use
+def setMuscleLod(level):
+    if level not in MUSCLE_LOD_LEVELS:
+        raise RuntimeError("Invalid muscle LOD '{0}', use one of {1}".format(level, MUSCLE_LOD_LEVELS))
+    lodNode = getMuscleLodNode() or createMuscleLod()
+    lodPlug = "{0}.{1}".format(lodNode, MUSCLE_LOD_ATTR)
+    #a rig control drives the switch, set the control instead
+    controlPlugs = mc.listConnections(lodPlug, source=True, destination=False, plugs=True)
+    mc.setAttr(controlPlugs[0] if controlPlugs else lodPlug, MUSCLE_LOD_LEVELS.index(level))
+
+
+#Back to full evaluation for good: the switch is deleted and every muscle node evaluates normally again
+def removeMuscleLod():
+    lodNode = getMuscleLodNode()
+    if not lodNode:
+        return
+    with MuscleTransaction('removeMuscleLod'):
+        #disconnected plugs keep their last value, so everything goes back to full first
+        setMuscleLod('full')
+        for muscleGroup in getMuscleRegistry().getMuscles():
+            muscleGroup.disconnectLodRest()
+        levelNodes = mc.listConnections(lodNode, source=False, destination=True, type='condition') or []
+        for condition in levelNodes:
+            for statePlug in mc.listConnections("{0}.outColorR".format(condition), source=False, destination=True,
+                                                plugs=True) or []:
+                mc.disconnectAttr("{0}.outColorR".format(condition), statePlug)
+                mc.setAttr(statePlug, 0)
+        mc.delete(levelNodes + [lodNode])
+
+
+# Muscle Cache
+# -----------------------------------
+# bakeMuscleCache evaluates every muscle once per frame and streams the transforms of the MUSCLE_CACHE_ROLES joints
+# into a memory-mapped .npy file of shape (frames, muscles, len(MUSCLE_CACHE_ROLES), len(MUSCLE_CACHE_CHANNELS)).
+# Only one chunk of frames is held in memory. A JSON sidecar (<file>.json) lists the frame range and the nodes.
+# Rotations are stored in radians, Maya's internal unit.
+# The roles are every joint of a muscle something drives: muscleBase (point and aim constraint) and muscleTip
+# (point constraint) too, so while a cache plays none of the muscle's constraints or volume nodes have anything
+# left to drive and the live network doesn't evaluate at all. Version 1 caches only held JOmuscle and muscleDriver,
+# they still play, the sidecar lists the nodes.
+MUSCLE_CACHE_VERSION = 2
+MUSCLE_CACHE_ROLES = ('JOmuscle', 'muscleDriver', 'muscleBase', 'muscleTip')
+MUSCLE_CACHE_CHANNELS = ('translateX', 'translateY', 'translateZ', 'rotateX', 'rotateY', 'rotateZ',
+                         'scaleX', 'scaleY', 'scaleZ')
+MUSCLE_CACHE_PATTERN = re.compile(r'^(translate|rotate|scale)[XYZ]?$')
+muscleCachePlayer = None
+
+
+def getMuscleCacheInfoPath(filePath):
+    return filePath + '.json'
+
+
+def getChannelPlugs(nodes):
+    #One om2 plug per cached channel, in the same order as the cache's last two axes
+    selectionList = om2.MSelectionList()
+    for node in nodes:
+        selectionList.add(node)
+    plugs = []
+    for index in range(len(nodes)):
+        nodeFn = om2.MFnDependencyNode(selectionList.getDependNode(index))
+        plugs.extend(nodeFn.findPlug(channel, False) for channel in MUSCLE_CACHE_CHANNELS)
+    return plugs
+
+
+@profilePhase('bakeMuscleCache')
+def bakeMuscleCache(filePath, muscleGroups=None, startFrame=None, endFrame=None, chunkSize=100):
+    #Returns the path of the sidecar. All muscles in the scene are baked unless a list is given
+    if muscleCachePlayer is not None:
+        raise RuntimeError("Stop cached playback before baking a muscle cache")
+    if muscleGroups is None:
+        muscleGroups = getMuscleRegistry().getMuscles()
+    if startFrame is None:
+        startFrame = mc.playbackOptions(query=True, minTime=True)
+    if endFrame is None:
+        endFrame = mc.playbackOptions(query=True, maxTime=True)
+    startFrame, endFrame = int(round(startFrame)), int(round(endFrame))
+    if endFrame < startFrame:
+        raise RuntimeError("End frame {0} is before start frame {1}".format(endFrame, startFrame))
+
+    nodes = [getattr(muscleGroup, role) for muscleGroup in muscleGroups for role in MUSCLE_CACHE_ROLES]
+    plugs = getChannelPlugs(nodes)
+    frameCount = endFrame - startFrame + 1
+    shape = (frameCount, len(muscleGroups), len(MUSCLE_CACHE_ROLES), len(MUSCLE_CACHE_CHANNELS))
+    cache = np.lib.format.open_memmap(filePath, mode='w+', dtype=np.float32, shape=shape)
+    chunk = np.empty((min(chunkSize, frameCount), len(plugs)), dtype=np.float32)
+
+    currentFrame = mc.currentTime(query=True)
+    try:
+        with MuscleTransaction('bakeMuscleCache'):
+            for chunkStart in range(0, frameCount, len(chunk)):
+                chunkFrames = min(len(chunk), frameCount - chunkStart)
+                for row in range(chunkFrames):
+                    mc.currentTime(startFrame + chunkStart + row, update=True)
+                    chunk[row] = [plug.asDouble() for plug in plugs]
+                cache[chunkStart:chunkStart + chunkFrames] = chunk[:chunkFrames].reshape((chunkFrames,) + shape[1:])
+                cache.flush()
+    finally:
+        mc.currentTime(currentFrame, update=True)
+        del cache
+
+    info = {'version': MUSCLE_CACHE_VERSION,
+            'startFrame': startFrame,
+            'endFrame': endFrame,
+            'muscles': [muscleGroup.muscleName for muscleGroup in muscleGroups],
+            'roles': list(MUSCLE_CACHE_ROLES),
+            'channels': list(MUSCLE_CACHE_CHANNELS),
+            'nodes': nodes,
+            'rotateUnit': 'radian'}
+    infoPath = getMuscleCacheInfoPath(filePath)
+    with open(infoPath, 'w') as infoFile:
+        json.dump(info, infoFile, indent=2)
+    return infoPath
+
+
+def readMuscleCache(filePath):
+    #Returns (info, cache), the cache stays on disk and is paged in as frames are read
+    with open(getMuscleCacheInfoPath(filePath)) as infoFile:
+        info = json.load(infoFile)
+    return info, np.load(filePath, mmap_mode='r')
+
+
+class MuscleCachePlayer:
+    #Drives the cached joints from a baked cache on every time change instead of their live network.
+    #The incoming connections of the cached channels are broken while playing and restored by stop(), and for the
+    #duration of a save so the scene is written with its live network
+    def __init__(self, filePath):
+        self.filePath = filePath
+        self.info, self.cache = readMuscleCache(filePath)
+        self.nodes = [node for node in self.info['nodes'] if mc.objExists(node)]
+        if len(self.nodes) != len(self.info['nodes']):
+            missing = sorted(set(self.info['nodes']) - set(self.nodes))
+            raise RuntimeError("Cached nodes are missing from the scene: {0}".format(missing))
+        self.plugs = []
+        self.connections = []
+        self.callbackIds = []
+
+    def start(self):
+        if self.callbackIds:
+            return
+        self.disconnectLive()
+        self.plugs = getChannelPlugs(self.nodes)
+        self.callbackIds = [
+            om2.MDGMessage.addTimeChangeCallback(self.onTimeChanged),
+            om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeNew, self.onSceneChanging),
+            om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeOpen, self.onSceneChanging),
+            om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeSave, self.onBeforeSave),
+            om2.MSceneMessage.addCallback(om2.MSceneMessage.kAfterSave, self.onAfterSave),
+        ]
+        self.applyFrame(mc.currentTime(query=True))
+
+    def stop(self):
+        if self.callbackIds:
+            om2.MMessage.removeCallbacks(self.callbackIds)
+        self.callbackIds = []
+        self.reconnectLive()
+        self.plugs = []
+
+    def disconnectLive(self):
+        for node in self.nodes:
+            connections = mc.listConnections(node, source=True, destination=False, connections=True, plugs=True) or []
+            for destination, source in zip(connections[::2], connections[1::2]):
+                if MUSCLE_CACHE_PATTERN.match(destination.split('.', 1)[1]):
+                    self.connections.append((source, destination))
+        for source, destination in self.connections:
+            mc.disconnectAttr(source, destination)
+
+    def reconnectLive(self):
+        for source, destination in self.connections:
+            if mc.objExists(source) and mc.objExists(destination):
+                mc.connectAttr(source, destination, force=True)
+        self.connections = []
+
+    def applyFrame(self, frame):
+        #frames outside the baked range hold the first / last frame
+        index = min(max(int(round(frame)) - self.info['startFrame'], 0), len(self.cache) - 1)
+        for plug, value in zip(self.plugs, self.cache[index].ravel().tolist()):
+            plug.setDouble(value)
+
+    def onTimeChanged(self, currentTime, clientData=None):
+        self.applyFrame(currentTime.asUnits(om2.MTime.uiUnit()))
+
+    def onSceneChanging(self, clientData=None):
+        #the live network goes back before the scene is closed or replaced
+        stopCachedPlayback()
+
+    def onBeforeSave(self, clientData=None):
+        #the scene is saved with the live network connected, cached playback resumes once it's written
+        self.reconnectLive()
+
+    def onAfterSave(self, clientData=None):
+        self.disconnectLive()
+        self.applyFrame(mc.currentTime(query=True))
+
+
+def startCachedPlayback(filePath):
+    global muscleCachePlayer
+    stopCachedPlayback()
+    player = MuscleCachePlayer(filePath)
+    player.start()
+    muscleCachePlayer = player
+    return player
+
+
+def stopCachedPlayback():
+    global muscleCachePlayer
+    player, muscleCachePlayer = muscleCachePlayer, None
+    if player is not None:
+        player.stop()
+
+
+#Build the same test muscles with every backend and print how long each one took. Undo is off meanwhile, the api
+#backend needs that and the test muscles are deleted again anyway
+def compareBuildBackends(muscleCount=20, muscleLength=10.0):
+    global buildBackend
+    previousBackend = buildBackend
+    undoState = mc.undoInfo(query=True, state=True)
+    mc.undoInfo(stateWithoutFlush=False)
+    timings = {}
+    try:
+        for backend in BUILD_BACKENDS:
+            buildBackend = backend
+            muscleGroups = []
+            start = time.perf_counter()
+            with MuscleTransaction('compareBuildBackends'):
+                for index in range(muscleCount):
+                    muscleGroups.append(MuscleJointGroup("backendTest_{0}{1}".format(backend, index),
+                                                         muscleLength, 0.5, 1.5))
+            timings[backend] = time.perf_counter() - start
+            for muscleGroup in muscleGroups:
+                muscleGroup.delete()
+    finally:
+        buildBackend = previousBackend
+        mc.undoInfo(stateWithoutFlush=undoState)
+
+    for backend, seconds in timings.items():
+        print("{0:<6} {1} muscles in {2:.3f}s ({3:.2f}ms per muscle)".format(
+            backend, muscleCount, seconds, seconds * 1000.0 / muscleCount))
+    return timings
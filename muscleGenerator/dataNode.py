@@ -0,0 +1,148 @@
+import json
+
+import maya.cmds as mc
+
+__all__ = [
+    'MUSCLE_DATA_VERSION', 'MUSCLE_MEMBER_ROLES', 'getDataNodeName', 'readDataNode', 'writeDataNode',
+    'isLegacyDataNode', 'migrateLegacyDataNode', 'migrateLegacyDataNodes',
+]
+
+
+# Muscle Data Node
+# -----------------------------------
+# Every muscle keeps its state on one network node:
+#   muscleData - JSON blob with the parameters, carries its own schema version
+#   members[]  - message array, member.message -> members[i] where i is the role's index in MUSCLE_MEMBER_ROLES
+# Nothing is added to the member nodes, so shared attach joints stay clean however many muscles use them.
+MUSCLE_DATA_VERSION = 1
+#indices are stored in the scene, only ever append new roles
+MUSCLE_MEMBER_ROLES = ('originAttachObj', 'insertionAttachObj', 'muscleOrigin', 'muscleInsertion', 'muscleDriver',
+                       'muscleBase', 'muscleTip', 'JOmuscle', 'mainPointConstraint', 'mainAimConstraint', 'solver')
+MUSCLE_DATA_DEFAULTS = {'name': '', 'volumeMode': 'sdk', 'restLength': 1.0, 'compressionFactor': 0.5,
+                        'stretchFactor': 1.5, 'compressionOffset': [0, 0, 0], 'stretchOffset': [0, 0, 0],
+                        'solverIndex': None, 'appliedState': None, 'segmentCount': 1, 'segmentProfile': 'smooth'}
+#the version 0 layout had one attribute per value and per member, plus a <name>_dataParent attribute on every member
+LEGACY_MEMBER_ATTRS = {'originAttachObj': 'originAttachObj', 'insertionAttachObj': 'insertionAttachObj',
+                       'muscleOrigin': 'muscleOrigin', 'muscleInsertion': 'muscleInsertion',
+                       'muscleDriver': 'muscleDriver', 'muscleBase': 'muscleBase', 'muscleTip': 'muscleTip',
+                       'JOmuscle': 'JOMuscle', 'mainPointConstraint': 'mainPtConst',
+                       'mainAimConstraint': 'mainAimConst', 'solver': 'muscleSolver'}
+
+
+def getDataNodeName(muscleName):
+    return muscleName + "_dataNode"
+
+
+def upgradeMuscleData(data):
+    #Bring a blob written by an older version up to MUSCLE_DATA_VERSION, new keys take their default
+    version = data.get('version', 0)
+    if version > MUSCLE_DATA_VERSION:
+        raise RuntimeError("Muscle data version {0} is newer than this tool ({1})".format(version, MUSCLE_DATA_VERSION))
+    upgraded = dict(MUSCLE_DATA_DEFAULTS)
+    upgraded.update(data)
+    upgraded['version'] = MUSCLE_DATA_VERSION
+    return upgraded
+
+
+def parseMemberConnections(connections):
+    #listConnections(..., connections=True) pairs of ("dataNode.members[i]", member) -> {dataNode: {role: member}}
+    dataNodeMembers = {}
+    for plug, member in zip(connections[::2], connections[1::2]):
+        dataNode, attr = plug.split('.', 1)
+        role = MUSCLE_MEMBER_ROLES[int(attr[attr.index('[') + 1:attr.index(']')])]
+        dataNodeMembers.setdefault(dataNode, {})[role] = member
+    return dataNodeMembers
+
+
+def readDataNodeMembers(dataNode):
+    connections = mc.listConnections(f"{dataNode}.members", source=True, destination=False, connections=True) or []
+    return parseMemberConnections(connections).get(dataNode, {})
+
+
+#Read a muscle's whole state with one getAttr and one listConnections, returns (data, members)
+def readDataNode(dataNode):
+    #version 0 nodes are migrated the first time they're read
+    if not mc.attributeQuery("muscleData", node=dataNode, exists=True):
+        dataNode = migrateLegacyDataNode(dataNode)
+    data = upgradeMuscleData(json.loads(mc.getAttr(f"{dataNode}.muscleData") or "{}"))
+    return data, readDataNodeMembers(dataNode)
+
+
+#Write a muscle's state, the data node is created when missing and only changed members are reconnected
+def writeDataNode(dataNodeName, data, members):
+    if mc.objExists(dataNodeName) and not mc.attributeQuery("muscleData", node=dataNodeName, exists=True):
+        mc.delete(dataNodeName)
+    if mc.objExists(dataNodeName):
+        dataNode = dataNodeName
+        currentMembers = readDataNodeMembers(dataNode)
+    else:
+        dataNode = mc.createNode("network", name=dataNodeName)
+        mc.addAttr(dataNode, longName="muscleData", niceName="Muscle Data", dataType="string")
+        mc.addAttr(dataNode, longName="members", niceName="Members", attributeType="message", multi=True)
+        currentMembers = {}
+
+    data = dict(data, version=MUSCLE_DATA_VERSION)
+    mc.setAttr(f"{dataNode}.muscleData", json.dumps(data, sort_keys=True), type="string")
+
+    for index, role in enumerate(MUSCLE_MEMBER_ROLES):
+        member = members.get(role)
+        if member == currentMembers.get(role):
+            continue
+        plug = f"{dataNode}.members[{index}]"
+        if currentMembers.get(role):
+            mc.disconnectAttr(f"{currentMembers[role]}.message", plug)
+        if member:
+            mc.connectAttr(f"{member}.message", plug)
+    return dataNode
+
+
+def isLegacyDataNode(dataNode):
+    return (not mc.attributeQuery("muscleData", node=dataNode, exists=True) and
+            mc.attributeQuery("type", node=dataNode, exists=True) and
+            mc.getAttr(f"{dataNode}.type") == "muscleJointGroup")
+
+
+def readLegacyDataNode(dataNode):
+    data = {'version': 0,
+            'name': mc.getAttr(f"{dataNode}.name"),
+            'restLength': mc.getAttr(f"{dataNode}.restLength"),
+            'compressionFactor': mc.getAttr(f"{dataNode}.compressionFactor"),
+            'stretchFactor': mc.getAttr(f"{dataNode}.stretchFactor"),
+            'compressionOffset': list(mc.getAttr(f"{dataNode}.compressionOffset")[0]),
+            'stretchOffset': list(mc.getAttr(f"{dataNode}.stretchOffset")[0])}
+    if mc.attributeQuery("volumeMode", node=dataNode, exists=True):
+        data['volumeMode'] = mc.getAttr(f"{dataNode}.volumeMode")
+    if mc.attributeQuery("solverIndex", node=dataNode, exists=True):
+        data['solverIndex'] = int(mc.getAttr(f"{dataNode}.solverIndex"))
+
+    members = {}
+    for role, attr in LEGACY_MEMBER_ATTRS.items():
+        if mc.attributeQuery(attr, node=dataNode, exists=True):
+            members[role] = (mc.listConnections(f"{dataNode}.{attr}", destination=True, source=False) or [None])[0]
+    if not members.get('solver'):
+        data['solverIndex'] = None
+    return data, members
+
+
+#Rewrite a version 0 data node in the current layout and drop the _dataParent attributes it put on its members
+def migrateLegacyDataNode(dataNode):
+    data, members = readLegacyDataNode(dataNode)
+    mc.delete(dataNode)
+    dataParentAttr = f"{data['name']}_dataParent"
+    for member in members.values():
+        if member and mc.attributeQuery(dataParentAttr, node=member, exists=True):
+            mc.deleteAttr(f"{member}.{dataParentAttr}")
+    #the new data node stays in the namespace of the old one
+    namespace = dataNode.rpartition(':')[0]
+    dataNodeName = getDataNodeName(data['name'])
+    if namespace:
+        dataNodeName = f"{namespace}:{dataNodeName}"
+    return writeDataNode(dataNodeName, upgradeMuscleData(data), members)
+
+
+#Migrate every version 0 data node in the scene, returns the new data nodes
+def migrateLegacyDataNodes():
+    #recursive finds the legacy data nodes of referenced and namespaced rigs too
+    legacyNodes = mc.ls("*.type", type="network", objectsOnly=True, recursive=True)
+    dataNodes = [node for node in legacyNodes if isLegacyDataNode(node)]
+    return [migrateLegacyDataNode(dataNode) for dataNode in dataNodes]
@@ -0,0 +1,179 @@
+# Scene batch driver
+# -----------------------------------
+# Re-runs a muscle setup over many scenes with a pool of worker processes, one mayapy session per worker:
+#   mayapy -m muscleGenerator.farm chars/*.ma --spec arms.json --preset legs.json --output-dir out --workers 8
+#   mayapy -m muscleGenerator.farm --jobs jobs.json --report farm.json
+# A job opens its scene, rebuilds the muscles from its spec files and presets, mirrors, refreshes every other
+# muscle in the scene against the current skeleton and saves. jobs.json is a list of jobs:
+#   {"scene": "a.ma", "output": "out/a.ma", "specs": [...], "presets": [...], "attachMap": "map.json",
+#    "mirror": "Left", "axis": "x", "refresh": true}
+# The driver collects a per-scene report with the timings of each step and the muscles that failed.
+# Exits with 1 when any scene failed.
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+FARM_JOB_DEFAULTS = {'output': None, 'specs': [], 'presets': [], 'attachMap': None, 'mirror': None, 'axis': 'x',
+                     'refresh': True}
+
+
+def normalizeFarmJob(job):
+    if not job.get('scene'):
+        raise ValueError("Farm job {0} is missing 'scene'".format(job))
+    farmJob = dict(FARM_JOB_DEFAULTS)
+    farmJob.update(job)
+    #scenes are saved in place unless the job says otherwise
+    farmJob['output'] = farmJob['output'] or farmJob['scene']
+    return farmJob
+
+
+def loadFarmJobs(filePath):
+    with open(filePath) as jobFile:
+        return [normalizeFarmJob(job) for job in json.load(jobFile)]
+
+
+# Worker side
+# Every worker process initializes maya.standalone once, then runs one scene job after the other
+def initializeWorker():
+    import atexit
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+    atexit.register(maya.standalone.uninitialize)
+
+
+#Edit and update muscles so their rest length, keys and center follow the skeleton they are attached to now
+def refreshMuscles(muscleGroups):
+    for muscleGroup in muscleGroups:
+        if muscleGroup.getLocatorPositions() is None:
+            muscleGroup.edit()
+        muscleGroup.update()
+    return len(muscleGroups)
+
+
+def runSceneJob(job):
+    from . import cli, core
+
+    result = {'scene': job['scene'], 'output': job['output'], 'worker': os.getpid(), 'status': 'ok', 'error': None,
+              'built': 0, 'refreshed': 0, 'failed': [], 'timings': {}}
+    start = time.perf_counter()
+    step = start
+    try:
+        cli.openScene(job['scene'])
+        result['timings']['open'] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        report = cli.buildMuscleSetup(job['specs'], job['presets'], cli.loadAttachMap(job['attachMap']),
+                                      job['mirror'], job['axis'])
+        result['built'] = len(report['muscles'])
+        result['failed'] = report['failed']
+        result['timings']['build'] = time.perf_counter() - step
+
+        if job['refresh']:
+            step = time.perf_counter()
+            built = set(muscle['name'] for muscle in report['muscles'])
+            muscleGroups = [muscleGroup for muscleGroup in core.getMuscleRegistry().getMuscles()
+                            if muscleGroup.muscleName not in built]
+            with core.MuscleTransaction('refreshMuscles'):
+                result['refreshed'] = refreshMuscles(muscleGroups)
+            result['timings']['refresh'] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        outputDir = os.path.dirname(job['output'])
+        if outputDir and not os.path.isdir(outputDir):
+            os.makedirs(outputDir)
+        cli.saveScene(job['output'])
+        result['timings']['save'] = time.perf_counter() - step
+        if result['failed']:
+            result['status'] = 'failed'
+    except Exception:
+        result['status'] = 'error'
+        result['error'] = traceback.format_exc()
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+# Driver side
+#Run the jobs on a pool of worker processes, returns the farm report with one entry per job in job order
+def runFarm(jobs, workers=None, progress=None):
+    jobs = [normalizeFarmJob(job) for job in jobs]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    results = [None]*len(jobs)
+    start = time.perf_counter()
+    #spawn, not fork: a forked Maya session isn't safe to use
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=initializeWorker) as executor:
+        futures = dict((executor.submit(runSceneJob, job), index) for index, job in enumerate(jobs))
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception:
+                #the worker process itself died, the scene is reported and the others go on
+                result = {'scene': jobs[index]['scene'], 'output': jobs[index]['output'], 'worker': None,
+                          'status': 'error', 'error': traceback.format_exc(), 'built': 0, 'refreshed': 0,
+                          'failed': [], 'timings': {}, 'seconds': 0.0}
+            results[index] = result
+            if progress:
+                progress(result)
+    total = time.perf_counter() - start
+    return {'total': total,
+            'workers': workers,
+            'scenesPerMinute': len(jobs)*60.0/total if total else 0.0,
+            'scenes': results,
+            'failed': [result['scene'] for result in results if result['status'] != 'ok']}
+
+
+def printSceneResult(result):
+    print("  {0:<50} {1:<7} {2:8.2f}s  built {3}, refreshed {4}, {5} failed".format(
+        result['scene'], result['status'], result['seconds'], result['built'], result['refreshed'],
+        len(result['failed'])))
+    for failure in result['failed']:
+        print("      {0}: {1}".format(failure['name'], failure['error']))
+    if result['error']:
+        print("      " + result['error'].strip().splitlines()[-1])
+
+
+def printFarmReport(report):
+    print("{0} scenes on {1} workers in {2:.2f}s ({3:.1f} scenes/min, {4} failed)".format(
+        len(report['scenes']), report['workers'], report['total'], report['scenesPerMinute'], len(report['failed'])))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='muscleGenerator.farm', description="Apply a muscle setup to many scenes")
+    parser.add_argument('scenes', nargs='*', help="scenes to process with the --spec/--preset setup")
+    parser.add_argument('--jobs', help="json list of jobs, see the module header")
+    parser.add_argument('--spec', action='append', default=[], help="batch build spec file, may be repeated")
+    parser.add_argument('--preset', action='append', default=[], help="muscle preset, may be repeated")
+    parser.add_argument('--attach-map', help="json file renaming preset attach objects")
+    parser.add_argument('--mirror', choices=('Left', 'Right'))
+    parser.add_argument('--axis', default='x', choices=('x', 'y', 'z'))
+    parser.add_argument('--no-refresh', action='store_true', help="leave the scenes' other muscles alone")
+    parser.add_argument('--output-dir', help="save the scenes here instead of over the originals")
+    parser.add_argument('--workers', type=int, help="worker processes, one per core by default")
+    parser.add_argument('--report', help="also write the farm report to this json file")
+    args = parser.parse_args(argv)
+
+    jobs = loadFarmJobs(args.jobs) if args.jobs else []
+    for scene in args.scenes:
+        output = os.path.join(args.output_dir, os.path.basename(scene)) if args.output_dir else None
+        jobs.append({'scene': scene, 'output': output, 'specs': args.spec, 'presets': args.preset,
+                     'attachMap': args.attach_map, 'mirror': args.mirror, 'axis': args.axis,
+                     'refresh': not args.no_refresh})
+    if not jobs:
+        parser.error("give scenes or --jobs")
+
+    report = runFarm(jobs, workers=args.workers, progress=printSceneResult)
+    printFarmReport(report)
+    if args.report:
+        with open(args.report, 'w') as reportFile:
+            json.dump(report, reportFile, indent=2, sort_keys=True)
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,477 @@
+import numpy as np
+
+
+# Muscle geometry
+# -----------------------------------
+# Plain numpy, no maya import. Every function works on N muscles at once: positions are (N, 3) arrays in world
+# space, factors are (N,) arrays or single values. The Maya side (core, muscleSolverNode) only
+# applies what comes out of here.
+WORLD_UP = np.array([0.0, 1.0, 0.0])
+#aiming straight along the up vector, Z is used as the up vector instead
+FALLBACK_UP = np.array([0.0, 0.0, 1.0])
+MIRROR_AXES = {'x': (-1.0, 1.0, 1.0), 'y': (1.0, -1.0, 1.0), 'z': (1.0, 1.0, -1.0)}
+EPSILON = 1e-9
+
+
+def asPositions(positions):
+    return np.asarray(positions, dtype=float).reshape(-1, 3)
+
+
+def asValues(values, count):
+    #a single factor is shared by every muscle
+    return np.broadcast_to(np.asarray(values, dtype=float), (count,))
+
+
+def asOffsets(offsets, count):
+    if offsets is None:
+        return np.zeros((count, 3))
+    return np.broadcast_to(np.asarray(offsets, dtype=float), (count, 3))
+
+
+def restLengths(origins, insertions):
+    return np.linalg.norm(asPositions(insertions) - asPositions(origins), axis=1)
+
+
+def aimFrames(origins, insertions, up=WORLD_UP):
+    #Rows are the X, Y and Z axes aimConstraint(aimVector=[1,0,0], upVector=[0,1,0]) gives muscleOrigin/muscleBase.
+    #up is one vector (worldUpType='scene') or one per muscle, e.g. muscleOrigin's Y for worldUpType='objectrotation'
+    aims = asPositions(insertions) - asPositions(origins)
+    lengths = np.linalg.norm(aims, axis=1)
+    #a zero length muscle keeps the world axes
+    xAxis = np.where((lengths > EPSILON)[:, None], aims/np.where(lengths > EPSILON, lengths, 1.0)[:, None],
+                     np.array([1.0, 0.0, 0.0]))
+    zAxis = np.cross(xAxis, up)
+    zAxis = np.where((np.linalg.norm(zAxis, axis=1) > EPSILON)[:, None], zAxis, np.cross(xAxis, FALLBACK_UP))
+    zAxis /= np.linalg.norm(zAxis, axis=1)[:, None]
+    yAxis = np.cross(zAxis, xAxis)
+    return np.stack([xAxis, yAxis, zAxis], axis=1)
+
+
+def frameRotations(frames):
+    #xyz euler angles in radians of row matrices [x; y; z], Maya's default rotate order
+    rotateY = np.arcsin(np.clip(-frames[:, 0, 2], -1.0, 1.0))
+    rotateX = np.arctan2(frames[:, 1, 2], frames[:, 2, 2])
+    rotateZ = np.arctan2(frames[:, 0, 1], frames[:, 0, 0])
+    return np.stack([rotateX, rotateY, rotateZ], axis=1)
+
+
+def aimRotations(origins, insertions, up=WORLD_UP):
+    return frameRotations(aimFrames(origins, insertions, up))
+
+
+def driverPositions(origins, insertions):
+    #the main pointConstraint holds muscleDriver halfway between muscleBase and muscleTip
+    return (asPositions(origins) + asPositions(insertions))*0.5
+
+
+def centerOffsets(origins, insertions, centers, frames=None):
+    #Where the center locator sits relative to the driver midpoint, in muscleBase space
+    if frames is None:
+        frames = aimFrames(origins, insertions)
+    offsets = asPositions(centers) - driverPositions(origins, insertions)
+    return np.einsum('nij,nj->ni', frames, offsets)
+
+
+def attachFrames(originAttachPositions, insertionAttachPositions):
+    #Aim frame and distance of every origin -> insertion attach object pair. Coincident attach objects get a
+    #distance of 1, so positions around them are kept as plain offsets
+    frames = aimFrames(originAttachPositions, insertionAttachPositions)
+    lengths = restLengths(originAttachPositions, insertionAttachPositions)
+    return frames, np.where(lengths > EPSILON, lengths, 1.0)
+
+
+def toAttachSpace(positions, originAttachPositions, insertionAttachPositions):
+    #(N, K, 3) world positions -> offsets from the origin attach object in its attach frame, divided by the attach
+    #distance. They follow the skeleton when it is moved, rotated or rescaled
+    originAttachPositions = asPositions(originAttachPositions)
+    frames, lengths = attachFrames(originAttachPositions, insertionAttachPositions)
+    offsets = np.asarray(positions, dtype=float).reshape(len(frames), -1, 3) - originAttachPositions[:, None, :]
+    return np.einsum('nij,nkj->nki', frames, offsets)/lengths[:, None, None]
+
+
+def fromAttachSpace(attachPositions, originAttachPositions, insertionAttachPositions):
+    #inverse of toAttachSpace, against the attach objects of the skeleton being built
+    originAttachPositions = asPositions(originAttachPositions)
+    frames, lengths = attachFrames(originAttachPositions, insertionAttachPositions)
+    offsets = np.asarray(attachPositions, dtype=float).reshape(len(frames), -1, 3)*lengths[:, None, None]
+    return originAttachPositions[:, None, :] + np.einsum('nij,nki->nkj', frames, offsets)
+
+
+def mirrorPositions(positions, axis='x'):
+    if axis not in MIRROR_AXES:
+        raise ValueError("Invalid Mirror Axis {0}".format(axis))
+    return asPositions(positions)*MIRROR_AXES[axis]
+
+
+def volumeRatios(lengths, restLengths, compressionFactors, stretchFactors):
+    #length over rest length, clamped to the range the volume driver was built for
+    restLengths = np.asarray(restLengths, dtype=float)
+    return np.clip(np.asarray(lengths, dtype=float)/np.where(restLengths > EPSILON, restLengths, 1.0),
+                   compressionFactors, stretchFactors)
+
+
+def volumeScales(ratios):
+    #scaleX follows the length, Y and Z keep the volume: sqrt(1/ratio)
+    yzScales = 1.0/np.sqrt(ratios)
+    return np.stack([ratios, yzScales, yzScales], axis=-1)
+
+
+def volumeTranslates(ratios, compressionFactors, stretchFactors, stretchOffsets, compressionOffsets):
+    #Y/Z blend linearly from 0 at rest to the stretch / compression offset, like the driven keys do
+    count = len(ratios)
+    compressionFactors = asValues(compressionFactors, count)
+    stretchFactors = asValues(stretchFactors, count)
+    stretching = stretchFactors > 1.0
+    compressing = compressionFactors < 1.0
+    stretchWeights = np.where(stretching, (ratios - 1.0)/np.where(stretching, stretchFactors - 1.0, 1.0), 0.0)
+    compressionWeights = np.where(compressing, (1.0 - ratios)/np.where(compressing, 1.0 - compressionFactors, 1.0),
+                                  0.0)
+    translates = np.clip(stretchWeights, 0.0, 1.0)[:, None]*asOffsets(stretchOffsets, count) + \
+        np.clip(compressionWeights, 0.0, 1.0)[:, None]*asOffsets(compressionOffsets, count)
+    translates[:, 0] = 0.0
+    return translates
+
+
+def volumeKeys(restLengths, compressionFactors, stretchFactors, stretchOffsets=None, compressionOffsets=None):
+    #The three driven keys of every muscle, in the order rest, stretch, compression:
+    #  driverValues (N, 3)   - muscleTip.translateX
+    #  scales (N, 3, 3)      - JOmuscle.scale per key
+    #  translates (N, 3, 3)  - JOmuscle.translate per key
+    restLengths = np.atleast_1d(np.asarray(restLengths, dtype=float))
+    count = len(restLengths)
+    ratios = np.stack([np.ones(count), asValues(stretchFactors, count), asValues(compressionFactors, count)], axis=1)
+    driverValues = restLengths[:, None]*ratios
+    scales = volumeScales(ratios)
+    translates = np.zeros((count, 3, 3))
+    translates[:, 1, 1:] = asOffsets(stretchOffsets, count)[:, 1:]
+    translates[:, 2, 1:] = asOffsets(compressionOffsets, count)[:, 1:]
+    return driverValues, scales, translates
+
+
+def volumeCurves(compressionFactor, stretchFactor, stretchOffset=None, compressionOffset=None):
+    #The driven key curves of one muscle keyed against its length ratio (muscleTip.translateX / rest length), so they
+    #don't depend on the rest length. A list of (JOmuscle attributes, [(ratio, value)] in rest, stretch, compression
+    #order): scaleY and scaleZ always match and share a curve, translateX stays 0 and an axis with no offset isn't keyed
+    ratios, scales, translates = volumeKeys(1.0, compressionFactor, stretchFactor, stretchOffset, compressionOffset)
+    ratios, scales, translates = ratios[0].tolist(), scales[0].tolist(), translates[0].tolist()
+    curves = [(('scaleX',), [(ratio, scale[0]) for ratio, scale in zip(ratios, scales)]),
+              (('scaleY', 'scaleZ'), [(ratio, scale[1]) for ratio, scale in zip(ratios, scales)])]
+    for index, axis in [(1, 'Y'), (2, 'Z')]:
+        if any(translate[index] for translate in translates):
+            curves.append((('translate' + axis,),
+                           [(ratio, translate[index]) for ratio, translate in zip(ratios, translates)]))
+    return curves
+
+
+
+# Segments
+# -----------------------------------
+# A segmented muscle spreads segmentCount bind joints from origin to insertion, each taking a share of the volume
+# change given by a falloff profile: a name from SEGMENT_PROFILES or a list of weights sampled evenly along the muscle
+SEGMENT_PROFILES = ('smooth', 'linear', 'flat')
+
+
+def segmentProfile(segmentCount, profile='smooth'):
+    #Return (positions, weights) for the segments, positions go from 0 at the origin to 1 at the insertion and
+    #weights are scaled so the strongest segment gets the whole volume change
+    if segmentCount < 1:
+        raise ValueError("Segment count must be at least 1, got {0}".format(segmentCount))
+    positions = (np.arange(segmentCount) + 0.5)/segmentCount
+    if isinstance(profile, str):
+        if profile == 'smooth':
+            weights = np.sin(np.pi*positions)
+        elif profile == 'linear':
+            weights = 1.0 - np.abs(2.0*positions - 1.0)
+        elif profile == 'flat':
+            weights = np.ones(segmentCount)
+        else:
+            raise ValueError("Invalid segment profile '{0}', use one of {1}".format(profile, SEGMENT_PROFILES))
+    else:
+        samples = np.asarray(profile, dtype=float)
+        if samples.ndim != 1 or not len(samples):
+            raise ValueError("A segment profile needs at least one weight, got {0}".format(profile))
+        weights = np.interp(positions, np.linspace(0.0, 1.0, len(samples)), samples)
+    strongest = np.abs(weights).max()
+    return positions, weights/strongest if strongest > EPSILON else weights
+
+
+def planMuscles(origins, insertions, centers=None, compressionFactors=1.0, stretchFactors=1.0,
+                stretchOffsets=None, compressionOffsets=None):
+    #Everything a muscle build computes from its locators, for N muscles in one go. centers default to the midpoint
+    origins = asPositions(origins)
+    insertions = asPositions(insertions)
+    frames = aimFrames(origins, insertions)
+    lengths = restLengths(origins, insertions)
+    driverValues, keyScales, keyTranslates = volumeKeys(lengths, compressionFactors, stretchFactors,
+                                                        stretchOffsets, compressionOffsets)
+    plan = {'restLength': lengths,
+            'frame': frames,
+            'rotation': frameRotations(frames),
+            'driverPosition': driverPositions(origins, insertions),
+            'centerOffset': np.zeros((len(lengths), 3)),
+            'keyDriverValues': driverValues,
+            'keyScales': keyScales,
+            'keyTranslates': keyTranslates}
+    if centers is not None:
+        plan['centerOffset'] = centerOffsets(origins, insertions, centers, frames)
+    return plan
+
+
+# Vertex grid
+# -----------------------------------
+# Uniform grid over a mesh's vertices for vectorized nearest vertex queries. Build it once per mesh, a query only
+# looks at the cells around each point and widens the search ring by ring for the points that still need it.
+class VertexGrid:
+    def __init__(self, vertices, verticesPerCell=8, maxRing=6):
+        self.vertices = asPositions(vertices)
+        if not len(self.vertices):
+            raise ValueError("A vertex grid needs at least one vertex")
+        self.maxRing = maxRing
+        self.minCorner = self.vertices.min(axis=0)
+        extent = self.vertices.max(axis=0) - self.minCorner
+        #flat meshes still get cubic cells of a sensible size
+        extent = np.maximum(extent, max(float(extent.max())*1e-3, EPSILON))
+        self.cellSize = float(np.prod(extent)/len(self.vertices)*verticesPerCell)**(1.0/3.0)
+        #skin vertices lie on a surface, not in the whole box, so shrink the cells until they hold about
+        #verticesPerCell vertices. The count per cell goes with the square of the cell size on a surface
+        for _ in range(4):
+            self.dimensions = np.floor(extent/self.cellSize).astype(np.int64) + 1
+            self.build()
+            averageCount = len(self.vertices)/float(len(self.keys))
+            if averageCount <= verticesPerCell*2:
+                break
+            self.cellSize *= (verticesPerCell/averageCount)**0.5
+        self.shells = {}
+
+    def build(self):
+        # vertices sorted by cell, with the start and count of every occupied cell
+        keys = self.cellKeys(self.cellsOf(self.vertices))
+        self.order = np.argsort(keys, kind='stable')
+        self.keys, self.starts, self.counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+        self.cellCenters = self.minCorner + (self.cellsOf(self.vertices[self.order[self.starts]]) + 0.5)*self.cellSize
+
+    def cellsOf(self, points):
+        return np.floor((points - self.minCorner)/self.cellSize).astype(np.int64)
+
+    def cellKeys(self, cells):
+        return (cells[:, 0]*self.dimensions[1] + cells[:, 1])*self.dimensions[2] + cells[:, 2]
+
+    def shellOffsets(self, ring):
+        #cell offsets exactly ring cells away from the center cell
+        if ring not in self.shells:
+            span = np.arange(-ring, ring + 1)
+            offsets = np.stack(np.meshgrid(span, span, span, indexing='ij'), axis=-1).reshape(-1, 3)
+            self.shells[ring] = offsets[np.abs(offsets).max(axis=1) == ring]
+        return self.shells[ring]
+
+    def nearest(self, points):
+        #Returns (indices, distances) of the closest vertex to every point
+        points = asPositions(points)
+        bestIndices = np.zeros(len(points), dtype=np.int64)
+        bestDistances = np.full(len(points), np.inf)
+        cells = self.cellsOf(points)
+        pending = np.arange(len(points))
+        for ring in range(self.maxRing + 1):
+            if not len(pending):
+                break
+            offsets = self.shellOffsets(ring)
+            queryCells = (cells[pending][:, None, :] + offsets[None, :, :]).reshape(-1, 3)
+            queryIds = np.repeat(pending, len(offsets))
+            inside = np.all((queryCells >= 0) & (queryCells < self.dimensions), axis=1)
+            keys = self.cellKeys(queryCells[inside])
+            queryIds = queryIds[inside]
+            slots = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+            occupied = self.keys[slots] == keys
+            self.keepClosest(points, queryIds[occupied], slots[occupied], bestIndices, bestDistances)
+
+            #anything outside the searched cells is at least ring cells away
+            pending = pending[bestDistances[pending] > (ring*self.cellSize)**2]
+
+        # points far from the mesh check the cells that can still hold something closer than the nearest cell
+        occupiedCells = self.cellsOf(self.vertices[self.order[self.starts]])
+        cellMin = self.minCorner + occupiedCells*self.cellSize
+        for chunk in np.array_split(pending, len(pending)*len(self.keys)//1000000 + 1):
+            if not len(chunk):
+                continue
+            gaps = np.maximum(np.maximum(cellMin[None] - points[chunk][:, None], 0.0),
+                              points[chunk][:, None] - cellMin[None] - self.cellSize)
+            cellDistances = np.einsum('pcj,pcj->pc', gaps, gaps)
+            self.keepClosest(points, chunk, np.argmin(cellDistances, axis=1), bestIndices, bestDistances)
+            queryIds, slots = np.nonzero(cellDistances < bestDistances[chunk][:, None])
+            self.keepClosest(points, chunk[queryIds], slots, bestIndices, bestDistances)
+        return bestIndices, np.sqrt(bestDistances)
+
+    def keepClosest(self, points, queryIds, slots, bestIndices, bestDistances):
+        #Check every vertex in the given cells against its point, queryIds come sorted.
+        #bestDistances holds squared distances
+        candidateIds, candidates = self.cellVertices(queryIds, slots)
+        if not len(candidates):
+            return
+        offsets = self.vertices[candidates] - points[candidateIds]
+        distances = np.einsum('ij,ij->i', offsets, offsets)
+
+        # closest candidate of every point
+        groupStarts = np.flatnonzero(np.r_[True, candidateIds[1:] != candidateIds[:-1]])
+        groupIds = candidateIds[groupStarts]
+        minimums = np.minimum.reduceat(distances, groupStarts)
+        groups = np.repeat(np.arange(len(groupStarts)), np.diff(np.r_[groupStarts, len(distances)]))
+        atMinimum = np.flatnonzero(distances == minimums[groups])
+        firstAtMinimum = atMinimum[np.r_[True, groups[atMinimum][1:] != groups[atMinimum][:-1]]]
+        closer = minimums < bestDistances[groupIds]
+        bestIndices[groupIds[closer]] = candidates[firstAtMinimum][closer]
+        bestDistances[groupIds[closer]] = minimums[closer]
+
+    def cellVertices(self, queryIds, slots):
+        #Every vertex in the given cells, paired with the query id of its cell
+        counts = self.counts[slots]
+        candidateIds = np.repeat(queryIds, counts)
+        segmentStarts = np.repeat(np.cumsum(counts) - counts, counts)
+        candidates = self.order[np.repeat(self.starts[slots], counts) + np.arange(counts.sum()) - segmentStarts]
+        return candidateIds, candidates
+
+    def verticesNearSegments(self, starts, ends, radii, maxPairs=4000000):
+        #Returns (segmentIds, vertexIds, distances) of every vertex closer than its radius to a segment, sorted by
+        #segment. Only the vertices of the occupied cells that reach into a segment's radius are checked, the segments
+        #go through in chunks so the cell/segment distance table stays under maxPairs entries
+        starts = asPositions(starts)
+        ends = asPositions(ends)
+        radii = asValues(radii, len(starts))
+        reach = radii + self.cellSize*np.sqrt(3.0)*0.5
+        results = []
+        chunkSize = max(1, maxPairs//len(self.keys))
+        for first in range(0, len(starts), chunkSize):
+            chunk = np.arange(first, min(first + chunkSize, len(starts)))
+            cellDistances = segmentDistances(self.cellCenters[None, :, :], starts[chunk][:, None, :],
+                                             ends[chunk][:, None, :])
+            queryIds, slots = np.nonzero(cellDistances <= reach[chunk][:, None])
+            segmentIds, vertexIds = self.cellVertices(chunk[queryIds], slots)
+            distances = segmentDistances(self.vertices[vertexIds], starts[segmentIds], ends[segmentIds])
+            inside = distances <= radii[segmentIds]
+            results.append((segmentIds[inside], vertexIds[inside], distances[inside]))
+        if not results:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+        return tuple(np.concatenate(arrays) for arrays in zip(*results))
+
+
+def segmentDistances(points, starts, ends):
+    #Distance of each point to the segment from start to end, the arrays broadcast against each other
+    axes = ends - starts
+    lengths = np.einsum('...j,...j->...', axes, axes)
+    along = np.einsum('...j,...j->...', points - starts, axes)/np.where(lengths > EPSILON, lengths, 1.0)
+    offsets = points - (starts + axes*np.clip(along, 0.0, 1.0)[..., None])
+    return np.sqrt(np.einsum('...j,...j->...', offsets, offsets))
+
+
+def surfacePlacements(grid, originAttachPositions, insertionAttachPositions, direction=None, depth=0.5,
+                      attachDepth=0.0):
+    #Origin, insertion and center positions (N, 3, 3) for muscles between the given attach positions.
+    #The attach positions and their midpoint are moved onto the medial axis of the mesh, halfway between the surface
+    #on the muscle's side and the surface opposite it, then pushed out towards the surface by depth (center) or
+    #attachDepth (origin, insertion): 0 stays on the medial axis, 1 is on the surface.
+    #direction picks the muscle's side, one vector or one per muscle. By default the nearest surface is used
+    originAttachPositions = asPositions(originAttachPositions)
+    insertionAttachPositions = asPositions(insertionAttachPositions)
+    count = len(originAttachPositions)
+    axisPoints = np.stack([originAttachPositions, insertionAttachPositions,
+                           driverPositions(originAttachPositions, insertionAttachPositions)], axis=1).reshape(-1, 3)
+
+    nearestIndices, radii = grid.nearest(axisPoints)
+    if direction is None:
+        directions = grid.vertices[nearestIndices] - axisPoints
+    else:
+        directions = np.repeat(np.broadcast_to(np.asarray(direction, dtype=float), (count, 3)), 3, axis=0)
+    directionLengths = np.linalg.norm(directions, axis=1)
+    directions = directions/np.where(directionLengths > EPSILON, directionLengths, 1.0)[:, None]
+
+    # probe one limb radius out on either side, the closest vertices there are the two surfaces
+    probeIndices = grid.nearest(np.concatenate([axisPoints + directions*radii[:, None],
+                                                axisPoints - directions*radii[:, None]]))[0]
+    surfaces = grid.vertices[probeIndices[:len(axisPoints)]]
+    oppositeSurfaces = grid.vertices[probeIndices[len(axisPoints):]]
+    medialPoints = (surfaces + oppositeSurfaces)*0.5
+
+    depths = np.tile([attachDepth, attachDepth, depth], count)[:, None]
+    return (medialPoints + (surfaces - medialPoints)*depths).reshape(count, 3, 3)
+
+
+# Capsule skin weights
+# -----------------------------------
+# Initial skin weights for muscle joints. A muscle runs from its origin through its belly center to its insertion,
+# each bind joint is a chain of capsules around its stretch of that path: full weight within the radius, easing to
+# zero over falloff*radius beyond it. Weights come back sparse as (vertexIds, jointIds, weights) triplets, a vertex
+# only appears with the joints that reach it.
+def capsuleSegments(origins, insertions, centers, segmentCounts):
+    #Split every muscle path into segmentCounts even stretches, one per bind joint (see segmentProfile, a segment
+    #joint sits at the middle of its stretch). A stretch across the belly center bends there and takes two capsules.
+    #Returns (starts, ends, muscleIds, jointIds), jointIds numbering the bind joints of all muscles in order
+    origins = asPositions(origins)
+    insertions = asPositions(insertions)
+    centers = asPositions(centers)
+    segmentCounts = np.asarray(np.broadcast_to(segmentCounts, (len(origins),)), dtype=np.int64)
+    starts, ends, muscleIds, jointIds = [], [], [], []
+    firstJoint = 0
+    for muscleId, segmentCount in enumerate(segmentCounts.tolist()):
+        cuts = np.union1d(np.arange(segmentCount + 1)/float(segmentCount), [0.5])
+        path = np.interp(cuts, [0.0, 0.5, 1.0], [0.0, 1.0, 2.0])
+        corners = np.stack([origins[muscleId], centers[muscleId], insertions[muscleId]])
+        points = np.stack([np.interp(path, [0.0, 1.0, 2.0], corners[:, axis]) for axis in range(3)], axis=1)
+        starts.append(points[:-1])
+        ends.append(points[1:])
+        muscleIds.append(np.full(len(cuts) - 1, muscleId))
+        jointIds.append(firstJoint + np.floor((cuts[:-1] + cuts[1:])*0.5*segmentCount).astype(np.int64))
+        firstJoint += segmentCount
+    if not starts:
+        return np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(starts), np.concatenate(ends), np.concatenate(muscleIds), np.concatenate(jointIds)
+
+
+def capsuleWeights(grid, starts, ends, radii, falloff=1.0, jointIds=None):
+    #Sparse weights of the capsules against the vertices of a VertexGrid. With jointIds the capsules of one joint
+    #count as one shape, a vertex gets the weight of the joint's closest capsule
+    radii = asValues(radii, len(asPositions(starts)))
+    falloffs = radii*max(float(falloff), 0.0)
+    capsuleIds, vertexIds, distances = grid.verticesNearSegments(starts, ends, radii + falloffs)
+    blend = np.clip((distances - radii[capsuleIds])/np.maximum(falloffs[capsuleIds], EPSILON), 0.0, 1.0)
+    #smoothstep from 1 at the radius to 0 at the outer radius
+    weights = 1.0 - blend*blend*(3.0 - 2.0*blend)
+    keep = weights > EPSILON
+    vertexIds, ownerIds, weights = vertexIds[keep], capsuleIds[keep], weights[keep]
+    if jointIds is not None:
+        ownerIds = np.asarray(jointIds)[ownerIds]
+        order = np.lexsort((ownerIds, vertexIds))
+        vertexIds, ownerIds, weights = vertexIds[order], ownerIds[order], weights[order]
+        firsts = np.flatnonzero(np.r_[True, (vertexIds[1:] != vertexIds[:-1]) | (ownerIds[1:] != ownerIds[:-1])])
+        weights = np.maximum.reduceat(weights, firsts) if len(firsts) else weights
+        vertexIds, ownerIds = vertexIds[firsts], ownerIds[firsts]
+    return vertexIds, ownerIds, weights
+
+
+def blendCapsuleWeights(vertexIds, weights, vertexCount, strength=1.0):
+    #Scale the capsule weights so the capsules of a vertex together take at most strength of it. A vertex deep
+    #inside one capsule gets strength, overlapping capsules share it in proportion to their weights.
+    #Whatever is left stays with the influences the vertex had before
+    totals = np.bincount(vertexIds, weights=weights, minlength=vertexCount)
+    shares = np.minimum(totals, 1.0)*float(strength)/np.maximum(totals, EPSILON)
+    return weights*shares[vertexIds]
+
+
+def denseWeightChunks(vertexIds, capsuleIds, weights, vertexOrder=None, chunkSize=20000):
+    #Turn sparse weights into (vertices, capsules, weights) blocks of up to chunkSize vertices, weights being
+    #(len(vertices), len(capsules)) with zeros where a capsule doesn't reach a vertex. vertexOrder ranks the vertices,
+    #e.g. VertexGrid.order, so a block covers one region of the mesh and only the few capsules near it
+    if vertexOrder is not None:
+        ranks = np.empty(len(vertexOrder), dtype=np.int64)
+        ranks[vertexOrder] = np.arange(len(vertexOrder))
+        order = np.lexsort((capsuleIds, ranks[vertexIds]))
+    else:
+        order = np.lexsort((capsuleIds, vertexIds))
+    vertexIds, capsuleIds, weights = vertexIds[order], capsuleIds[order], weights[order]
+    firsts = np.flatnonzero(np.r_[True, vertexIds[1:] != vertexIds[:-1]])
+    for first in range(0, len(firsts), chunkSize):
+        start = firsts[first]
+        end = firsts[first + chunkSize] if first + chunkSize < len(firsts) else len(vertexIds)
+        rows = np.searchsorted(firsts, np.arange(start, end), side='right') - 1 - first
+        capsules, columns = np.unique(capsuleIds[start:end], return_inverse=True)
+        block = np.zeros((rows[-1] + 1, len(capsules)))
+        block[rows, columns] = weights[start:end]
+        yield vertexIds[firsts[first:first + chunkSize]], capsules, block
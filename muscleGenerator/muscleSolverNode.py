@@ -0,0 +1,199 @@
+import os
+import sys
+
+import maya.api.OpenMaya as om2
+import numpy as np
+
+#Maya loads the plugin by its path, make the package it ships in importable for the shared muscle math
+packageRoot = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if packageRoot not in sys.path:
+    sys.path.append(packageRoot)
+from muscleGenerator import geometry as muscleGeometry
+
+
+#Python API 2.0 plugin
+def maya_useNewAPI():
+    pass
+
+
+# muscleSolver node
+# -----------------------------------
+# One node solves every muscle connected to it. Each element of the muscle[] array holds the world matrices of
+# muscleOrigin/muscleInsertion plus the rest length, factors and offsets; the matching output[] element gives
+# what the per-muscle constraints and driven keys used to compute:
+#   baseRotate      - muscleBase aiming at muscleInsertion with muscleOrigin's Y as up (the main aimConstraint)
+#   tipTranslateX   - distance to muscleInsertion (the muscleTip pointConstraint)
+#   driverTranslate - midpoint of muscleBase and muscleTip plus the center offset (the main pointConstraint)
+#   jointScale / jointTranslate - JOmuscle volume preservation from the clamped length ratio
+class MuscleSolverNode(om2.MPxNode):
+    kNodeName = "muscleSolver"
+    #Id from the range Autodesk reserves for internal/local plugins
+    kNodeId = om2.MTypeId(0x0007F7A0)
+
+    muscle = None
+    originMatrix = None
+    insertionMatrix = None
+    centerOffset = None
+    restLength = None
+    compressionFactor = None
+    stretchFactor = None
+    stretchOffset = None
+    compressionOffset = None
+
+    output = None
+    baseRotate = None
+    tipTranslateX = None
+    driverTranslate = None
+    jointScale = None
+    jointTranslate = None
+
+    def __init__(self):
+        om2.MPxNode.__init__(self)
+
+    @staticmethod
+    def creator():
+        return MuscleSolverNode()
+
+    @staticmethod
+    def initialize():
+        cls = MuscleSolverNode
+        numericAttr = om2.MFnNumericAttribute()
+        matrixAttr = om2.MFnMatrixAttribute()
+        unitAttr = om2.MFnUnitAttribute()
+        compoundAttr = om2.MFnCompoundAttribute()
+
+        def addVector(longName, shortName, default=0.0, output=False):
+            attr = numericAttr.create(longName, shortName, om2.MFnNumericData.k3Double, default)
+            numericAttr.writable = not output
+            numericAttr.storable = not output
+            return attr
+
+        def addDouble(longName, shortName, default=0.0, output=False):
+            attr = numericAttr.create(longName, shortName, om2.MFnNumericData.kDouble, default)
+            numericAttr.writable = not output
+            numericAttr.storable = not output
+            return attr
+
+        # inputs
+        cls.originMatrix = matrixAttr.create("originMatrix", "om")
+        cls.insertionMatrix = matrixAttr.create("insertionMatrix", "im")
+        cls.centerOffset = addVector("centerOffset", "co")
+        cls.restLength = addDouble("restLength", "rl", 1.0)
+        cls.compressionFactor = addDouble("compressionFactor", "cf", 0.5)
+        cls.stretchFactor = addDouble("stretchFactor", "sf", 1.5)
+        cls.stretchOffset = addVector("stretchOffset", "so")
+        cls.compressionOffset = addVector("compressionOffset", "cpo")
+
+        cls.muscle = compoundAttr.create("muscle", "mus")
+        for child in (cls.originMatrix, cls.insertionMatrix, cls.centerOffset, cls.restLength,
+                      cls.compressionFactor, cls.stretchFactor, cls.stretchOffset, cls.compressionOffset):
+            compoundAttr.addChild(child)
+        compoundAttr.array = True
+        compoundAttr.usesArrayDataBuilder = True
+
+        # outputs
+        rotateChildren = []
+        for axis in 'XYZ':
+            rotateChildren.append(unitAttr.create("baseRotate{0}".format(axis), "br{0}".format(axis.lower()),
+                                                  om2.MFnUnitAttribute.kAngle, 0.0))
+            unitAttr.writable = False
+            unitAttr.storable = False
+        cls.baseRotate = numericAttr.create("baseRotate", "br", *rotateChildren)
+        numericAttr.writable = False
+        numericAttr.storable = False
+        cls.tipTranslateX = addDouble("tipTranslateX", "ttx", output=True)
+        cls.driverTranslate = addVector("driverTranslate", "dt", output=True)
+        cls.jointScale = addVector("jointScale", "js", 1.0, output=True)
+        cls.jointTranslate = addVector("jointTranslate", "jt", output=True)
+
+        cls.output = compoundAttr.create("output", "out")
+        for child in (cls.baseRotate, cls.tipTranslateX, cls.driverTranslate, cls.jointScale, cls.jointTranslate):
+            compoundAttr.addChild(child)
+        compoundAttr.array = True
+        compoundAttr.usesArrayDataBuilder = True
+        compoundAttr.writable = False
+        compoundAttr.storable = False
+
+        cls.addAttribute(cls.muscle)
+        cls.addAttribute(cls.output)
+
+        outputs = (cls.output, cls.baseRotate, cls.tipTranslateX, cls.driverTranslate, cls.jointScale,
+                   cls.jointTranslate)
+        for inputAttr in (cls.muscle, cls.originMatrix, cls.insertionMatrix, cls.centerOffset, cls.restLength,
+                          cls.compressionFactor, cls.stretchFactor, cls.stretchOffset, cls.compressionOffset):
+            for outputAttr in outputs:
+                cls.attributeAffects(inputAttr, outputAttr)
+
+    def compute(self, plug, dataBlock):
+        #every non-input attribute lives under output[], so any request solves all muscles at once
+        cls = MuscleSolverNode
+
+        # gather every muscle into flat arrays
+        muscleArray = dataBlock.inputArrayValue(cls.muscle)
+        count = len(muscleArray)
+        indices = []
+        originMatrices = np.empty((count, 4, 4))
+        insertionMatrices = np.empty((count, 4, 4))
+        centerOffsets = np.empty((count, 3))
+        parameters = np.empty((count, 3))
+        stretchOffsets = np.empty((count, 3))
+        compressionOffsets = np.empty((count, 3))
+        for element in range(count):
+            muscleArray.jumpToPhysicalElement(element)
+            indices.append(muscleArray.elementLogicalIndex())
+            handle = muscleArray.inputValue()
+            originMatrices[element] = np.reshape(list(handle.child(cls.originMatrix).asMatrix()), (4, 4))
+            insertionMatrices[element] = np.reshape(list(handle.child(cls.insertionMatrix).asMatrix()), (4, 4))
+            centerOffsets[element] = handle.child(cls.centerOffset).asDouble3()
+            parameters[element] = (handle.child(cls.restLength).asDouble(),
+                                   handle.child(cls.compressionFactor).asDouble(),
+                                   handle.child(cls.stretchFactor).asDouble())
+            stretchOffsets[element] = handle.child(cls.stretchOffset).asDouble3()
+            compressionOffsets[element] = handle.child(cls.compressionOffset).asDouble3()
+
+        results = solveMuscles(originMatrices, insertionMatrices, centerOffsets, parameters[:, 0],
+                               parameters[:, 1], parameters[:, 2], stretchOffsets, compressionOffsets)
+        baseRotations, tipLengths, driverTranslations, jointScales, jointTranslations = results
+
+        outputArray = dataBlock.outputArrayValue(cls.output)
+        builder = outputArray.builder()
+        for element, index in enumerate(indices):
+            handle = builder.addElement(index)
+            handle.child(cls.baseRotate).set3Double(*baseRotations[element])
+            handle.child(cls.tipTranslateX).setDouble(tipLengths[element])
+            handle.child(cls.driverTranslate).set3Double(*driverTranslations[element])
+            handle.child(cls.jointScale).set3Double(*jointScales[element])
+            handle.child(cls.jointTranslate).set3Double(*jointTranslations[element])
+        outputArray.set(builder)
+        outputArray.setAllClean()
+        dataBlock.setClean(plug)
+
+
+#Vectorized solve for N muscles, matrices are (N, 4, 4) in Maya's row-vector layout
+def solveMuscles(originMatrices, insertionMatrices, centerOffsets, restLengths, compressionFactors,
+                 stretchFactors, stretchOffsets, compressionOffsets):
+    # insertion position in muscleOrigin space, muscleBase sits at its origin and aims with muscleOrigin's Y as up
+    insertionPositions = np.einsum('ni,nij->nj', insertionMatrices[:, 3, :], np.linalg.inv(originMatrices))[:, :3]
+    lengths = np.linalg.norm(insertionPositions, axis=1)
+    baseRotations = muscleGeometry.aimRotations(np.zeros_like(insertionPositions), insertionPositions)
+
+    driverTranslations = centerOffsets.copy()
+    driverTranslations[:, 0] += lengths*0.5
+
+    ratios = muscleGeometry.volumeRatios(lengths, restLengths, compressionFactors, stretchFactors)
+    jointScales = muscleGeometry.volumeScales(ratios)
+    jointTranslations = muscleGeometry.volumeTranslates(ratios, compressionFactors, stretchFactors,
+                                                        stretchOffsets, compressionOffsets)
+
+    return baseRotations, lengths, driverTranslations, jointScales, jointTranslations
+
+
+def initializePlugin(plugin):
+    pluginFn = om2.MFnPlugin(plugin, "BarrucadeZ", "1.0")
+    pluginFn.registerNode(MuscleSolverNode.kNodeName, MuscleSolverNode.kNodeId,
+                          MuscleSolverNode.creator, MuscleSolverNode.initialize)
+
+
+def uninitializePlugin(plugin):
+    pluginFn = om2.MFnPlugin(plugin)
+    pluginFn.deregisterNode(MuscleSolverNode.kNodeId)
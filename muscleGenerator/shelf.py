@@ -0,0 +1,38 @@
+# Shelf and menu entry points
+# -----------------------------------
+# Both only store a command string, the UI module is imported when the button or menu item is clicked. To get the
+# menu in every session, add this to userSetup.py:
+#   import maya.utils
+#   maya.utils.executeDeferred("import muscleGenerator.shelf; muscleGenerator.shelf.installMenu()")
+import maya.cmds as mc
+import maya.mel as mel
+
+MENU_NAME = 'muscleGeneratorMenu'
+OPEN_UI_COMMAND = "import muscleGenerator.ui; muscleGenerator.ui.create_muscle_ui()"
+OPEN_PROFILE_COMMAND = "import muscleGenerator.ui; muscleGenerator.ui.show_profile_ui()"
+LOAD_SOLVER_COMMAND = "import muscleGenerator.solver; muscleGenerator.solver.loadMuscleSolverPlugin()"
+
+
+#Add a Muscle Control Panel button to a shelf, the current shelf tab when none is given. Returns the button
+def installShelfButton(shelf=None):
+    if shelf is None:
+        shelf = mc.tabLayout(mel.eval("$tmp = $gShelfTopLevel"), query=True, selectTab=True)
+    existing = [button for button in mc.shelfLayout(shelf, query=True, childArray=True) or []
+                if mc.shelfButton(button, query=True, exists=True) and
+                mc.shelfButton(button, query=True, command=True) == OPEN_UI_COMMAND]
+    if existing:
+        return existing[0]
+    return mc.shelfButton(parent=shelf, label="Muscles", imageOverlayLabel="MSC", image="commandButton.png",
+                          annotation="Muscle Control Panel", command=OPEN_UI_COMMAND, sourceType="python")
+
+
+#Add a Muscle Generator menu to Maya's main window, replacing the one from an earlier call. Returns the menu
+def installMenu():
+    if mc.menu(MENU_NAME, exists=True):
+        mc.deleteUI(MENU_NAME, menu=True)
+    menu = mc.menu(MENU_NAME, parent=mel.eval("$tmp = $gMainWindow"), label="Muscle Generator", tearOff=True)
+    mc.menuItem(parent=menu, label="Muscle Control Panel", command=OPEN_UI_COMMAND, sourceType="python")
+    mc.menuItem(parent=menu, label="Muscle Profile", command=OPEN_PROFILE_COMMAND, sourceType="python")
+    mc.menuItem(parent=menu, divider=True)
+    mc.menuItem(parent=menu, label="Load Muscle Solver Plugin", command=LOAD_SOLVER_COMMAND, sourceType="python")
+    return menu
@@ -0,0 +1,39 @@
+import os
+
+import maya.cmds as mc
+
+from .core import MuscleTransaction
+
+__all__ = ['MUSCLE_SOLVER_PLUGIN', 'loadMuscleSolverPlugin', 'createMuscleSolver', 'connectMusclesToSolver']
+
+
+# Muscle Solver
+# -----------------------------------
+# The muscleSolver plugin node (muscleSolverNode.py) solves many muscles in one compute
+MUSCLE_SOLVER_PLUGIN = 'muscleSolverNode.py'
+
+
+def loadMuscleSolverPlugin():
+    if mc.pluginInfo(MUSCLE_SOLVER_PLUGIN, query=True, loaded=True):
+        return
+    #the plugin ships in this package, fall back to MAYA_PLUG_IN_PATH when it was installed somewhere else
+    localPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), MUSCLE_SOLVER_PLUGIN)
+    mc.loadPlugin(localPath if os.path.exists(localPath) else MUSCLE_SOLVER_PLUGIN, quiet=True)
+
+
+def createMuscleSolver(name='muscleSolver1'):
+    loadMuscleSolverPlugin()
+    return mc.createNode('muscleSolver', name=name)
+
+
+#Move updated muscle groups onto one muscleSolver node, the first solver in the scene is used unless one is given
+def connectMusclesToSolver(muscleGroups, solver=None):
+    loadMuscleSolverPlugin()
+    with MuscleTransaction('connectMusclesToSolver'):
+        if solver is None:
+            solvers = mc.ls(type='muscleSolver')
+            solver = solvers[0] if solvers else createMuscleSolver()
+        for muscleGroup in muscleGroups:
+            if muscleGroup.solver is None:
+                muscleGroup.connectToSolver(solver)
+    return solver
@@ -0,0 +1,295 @@
+import maya.cmds as mc
+
+from . import core
+from . import geometry as muscleGeometry
+from .core import (BUILD_BACKENDS, MUSCLE_LOD_LEVELS, VOLUME_MODES, MuscleJointGroup, autoPlaceMuscles,
+                   bakeMuscleCache, batchCreateMuscles, capsuleSkinWeights, exportMusclePreset, getMuscleLod,
+                   getMuscleRegistry, importMusclePreset, loadMuscleSpecs, mirror, mirrorAll, printBatchReport,
+                   printUpdateReport, profiler, setBuildBackend, setMuscleLod, setProfiling, startCachedPlayback,
+                   startLiveEdit, stopCachedPlayback, stopLiveEdit, updateDirtyMuscles)
+from .solver import connectMusclesToSolver
+
+
+# Create UI Window
+def create_muscle_ui():
+    # Check existed window
+    if mc.window("muscleUI", exists=True):
+        mc.deleteUI("muscleUI", window=True)
+    
+    # Create window
+    window = mc.window("muscleUI", title="Muscle Control Panel", widthHeight=(300, 200))
+    mc.columnLayout(adjustableColumn=True)
+    
+    # Pt1：Input box and slider for muscle name and deform factor
+    mc.text(label="Muscle Name:")
+    muscle_name_field = mc.textField()
+
+    mc.text(label="Origin Attach Object:")
+    origin_attach_obj_field = mc.textField()
+
+    mc.text(label="Insertion Attach Object:")
+    insertion_attach_obj_field = mc.textField()
+
+    mc.text(label="Compression Factor (0-1):")
+    compression_slider = mc.floatSlider(min=0.0, max=1.0, value=0.5, step=0.01)
+
+    mc.text(label="Stretch Factor (1-3):")
+    stretch_slider = mc.floatSlider(min=1.0, max=3.0, value=1.5, step=0.01)
+
+    volume_mode_menu = mc.optionMenu(label="Volume Mode")
+    for volumeMode in VOLUME_MODES:
+        mc.menuItem(label=volumeMode)
+
+    mc.text(label="Segments (1 = JOmuscle only):")
+    segment_count_slider = mc.intSlider(min=1, max=9, value=1, step=1)
+
+    segment_profile_menu = mc.optionMenu(label="Segment Profile")
+    for segmentProfile in muscleGeometry.SEGMENT_PROFILES:
+        mc.menuItem(label=segmentProfile)
+
+    # the api backend isn't undoable, it only runs with undo turned off
+    def set_build_backend(backend):
+        try:
+            setBuildBackend(backend)
+        except RuntimeError as error:
+            setBuildBackend('cmds')
+            mc.optionMenu(backend_menu, edit=True, value=core.buildBackend)
+            mc.warning(str(error))
+
+    backend_menu = mc.optionMenu(label="Build Backend", changeCommand=lambda backend: set_build_backend(backend),
+                                 annotation="api builds faster but isn't undoable, it only runs with undo turned off")
+    for backend in BUILD_BACKENDS:
+        mc.menuItem(label=backend)
+    mc.optionMenu(backend_menu, edit=True, value=core.buildBackend)
+
+    # Create Button
+    def create_muscle():
+        muscleName = mc.textField(muscle_name_field, query=True, text=True)
+        originAttachObj = mc.textField(origin_attach_obj_field, query=True, text=True)
+        insertionAttachObj = mc.textField(insertion_attach_obj_field, query=True, text=True)
+        compressionFactor = mc.floatSlider(compression_slider, query=True, value=True)
+        stretchFactor = mc.floatSlider(stretch_slider, query=True, value=True)
+        volumeMode = mc.optionMenu(volume_mode_menu, query=True, value=True)
+        segmentCount = mc.intSlider(segment_count_slider, query=True, value=True)
+        segmentProfile = mc.optionMenu(segment_profile_menu, query=True, value=True)
+        
+        # Call createFromAttachObjects to create muscleGroup
+        global muscleGroup
+        muscleGroup = MuscleJointGroup.createFromAttachObjects(
+            muscleName, originAttachObj, insertionAttachObj, compressionFactor, stretchFactor,
+            volumeMode=volumeMode, segmentCount=segmentCount, segmentProfile=segmentProfile)
+
+    mc.button(label="Create", command=lambda _: create_muscle())
+
+    
+
+    # Pt2: Update Button
+    def update_muscle():
+        if 'muscleGroup' in globals():
+            muscleGroup.update()
+        else:
+            mc.warning("No muscle group created yet. Please create a muscle first.")
+
+    mc.button(label="Update", command=lambda _: update_muscle())
+
+    mc.button(label="Update Dirty Muscles", command=lambda _: printUpdateReport(updateDirtyMuscles()))
+
+    # Pt3: ReEdit Button 
+    def edit_muscle():
+        if 'muscleGroup' in globals():
+            muscleGroup.edit()
+        else:
+            mc.warning("No muscle group created yet. Please create a muscle first.")
+
+    mc.button(label="ReEdit", command=lambda _: edit_muscle())
+
+    # Live edit: locator moves refresh the muscle's volume once Maya is idle, no Update needed to preview
+    def toggle_live_edit(enabled):
+        if enabled:
+            startLiveEdit()
+        else:
+            stopLiveEdit()
+
+    mc.checkBox(label="Live Edit", value=core.liveEditSession is not None,
+                changeCommand=lambda enabled: toggle_live_edit(enabled))
+
+    #Mirror
+    # Input attach obj in Mirror
+    mc.text(label="Mirror Origin Attach Object:")
+    mirror_origin_attach_obj_field = mc.textField()
+
+    mc.text(label="Mirror Insertion Attach Object:")
+    mirror_insertion_attach_obj_field = mc.textField()
+
+    # Mirror
+    def mirror_muscle():
+        if 'muscleGroup' in globals():
+            mirror_origin_attach_obj = mc.textField(mirror_origin_attach_obj_field, query=True, text=True)
+            mirror_insertion_attach_obj = mc.textField(mirror_insertion_attach_obj_field, query=True, text=True)
+            mirror(muscleGroup, mirror_origin_attach_obj, mirror_insertion_attach_obj, mirrorAxis='x')
+
+        else:
+            mc.warning("No muscle group created yet. Please create a muscle first.")
+
+    mc.button(label="Mirror", command=lambda _: mirror_muscle())
+
+    def mirror_all_muscles(side):
+        muscleGroups, report = mirrorAll(side=side, axis='x')
+        printBatchReport(report)
+
+    mc.button(label="Mirror All Left To Right", command=lambda _: mirror_all_muscles('Left'))
+    mc.button(label="Mirror All Right To Left", command=lambda _: mirror_all_muscles('Right'))
+
+    # Load a muscle that is already in the scene
+    mc.text(label="Muscles In Scene:")
+    muscle_list = mc.textScrollList(allowMultiSelection=False, height=80)
+
+    def refresh_muscle_list():
+        mc.textScrollList(muscle_list, edit=True, removeAll=True)
+        for muscleName in getMuscleRegistry().muscleNames():
+            mc.textScrollList(muscle_list, edit=True, append=muscleName)
+
+    def load_muscle():
+        selected = mc.textScrollList(muscle_list, query=True, selectItem=True)
+        if not selected:
+            mc.warning("Select a muscle in the list first.")
+            return
+        global muscleGroup
+        muscleGroup = getMuscleRegistry().getMuscle(selected[0])
+
+    mc.button(label="Refresh Muscle List", command=lambda _: refresh_muscle_list())
+    mc.button(label="Load Selected Muscle", command=lambda _: load_muscle())
+    refresh_muscle_list()
+
+    # Solver
+    def connect_muscle_to_solver():
+        if 'muscleGroup' in globals():
+            connectMusclesToSolver([muscleGroup])
+        else:
+            mc.warning("No muscle group created yet. Please create a muscle first.")
+
+    mc.button(label="Connect To Muscle Solver", command=lambda _: connect_muscle_to_solver())
+
+    # Batch build from a spec file
+    def batch_build_muscles():
+        filePaths = mc.fileDialog2(fileFilter="Muscle Specs (*.json *.csv)", fileMode=1,
+                                   caption="Batch Build Muscles")
+        if not filePaths:
+            return
+        global muscleGroup
+        muscleGroups, report = batchCreateMuscles(loadMuscleSpecs(filePaths[0]))
+        printBatchReport(report)
+        if muscleGroups:
+            muscleGroup = muscleGroups[-1]
+
+    mc.button(label="Batch Build From File...", command=lambda _: batch_build_muscles())
+
+    # Auto placement on a mesh
+    mc.text(label="Placement Mesh:")
+    placement_mesh_field = mc.textField()
+    mc.text(label="Center Depth (0 medial - 1 surface):")
+    placement_depth_slider = mc.floatSlider(min=0.0, max=1.0, value=0.5, step=0.01)
+
+    def auto_place_muscles():
+        mesh = mc.textField(placement_mesh_field, query=True, text=True)
+        if not mesh or not mc.objExists(mesh):
+            mc.warning("Enter the skin or muscle guide mesh to place the muscles on.")
+            return
+        depth = mc.floatSlider(placement_depth_slider, query=True, value=True)
+        #the muscle just created has no data node yet, it isn't registered until its first update
+        muscleGroups = getMuscleRegistry().getMuscles()
+        if 'muscleGroup' in globals() and muscleGroup.muscleName not in getMuscleRegistry().muscleNames():
+            muscleGroups.append(muscleGroup)
+        placed = autoPlaceMuscles(mesh, muscleGroups, depth=depth)
+        print("Placed {0} muscles on {1}".format(len(placed), mesh))
+
+    mc.button(label="Auto Place Muscles In Edit Mode", command=lambda _: auto_place_muscles())
+
+    # Initial skin weights for the muscle joints
+    mc.text(label="Skinned Mesh:")
+    skin_mesh_field = mc.textField()
+    mc.text(label="Muscle Weight Strength (0-1):")
+    skin_strength_slider = mc.floatSlider(min=0.0, max=1.0, value=1.0, step=0.01)
+
+    def capsule_skin_weights():
+        mesh = mc.textField(skin_mesh_field, query=True, text=True)
+        if not mesh or not mc.objExists(mesh):
+            mc.warning("Enter the skinned mesh to weight the muscle joints on.")
+            return
+        strength = mc.floatSlider(skin_strength_slider, query=True, value=True)
+        weighted = capsuleSkinWeights(mesh, strength=strength)
+        print("Weighted {0} vertices of {1} to the muscle joints".format(weighted, mesh))
+
+    mc.button(label="Muscle Capsule Skin Weights", command=lambda _: capsule_skin_weights())
+
+    # Presets
+    def export_muscle_preset():
+        filePaths = mc.fileDialog2(fileFilter="Muscle Preset (*.json)", fileMode=0, caption="Export Muscle Preset")
+        if filePaths:
+            print("Exported {0} muscles to {1}".format(exportMusclePreset(filePaths[0]), filePaths[0]))
+
+    def import_muscle_preset():
+        filePaths = mc.fileDialog2(fileFilter="Muscle Preset (*.json)", fileMode=1, caption="Import Muscle Preset")
+        if not filePaths:
+            return
+        global muscleGroup
+        muscleGroups, report = importMusclePreset(filePaths[0])
+        printBatchReport(report)
+        if muscleGroups:
+            muscleGroup = muscleGroups[-1]
+        refresh_muscle_list()
+
+    mc.button(label="Export Preset...", command=lambda _: export_muscle_preset())
+    mc.button(label="Import Preset...", command=lambda _: import_muscle_preset())
+
+    # Muscle cache
+    def bake_muscle_cache():
+        filePaths = mc.fileDialog2(fileFilter="Muscle Cache (*.npy)", fileMode=0, caption="Bake Muscle Cache")
+        if filePaths:
+            infoPath = bakeMuscleCache(filePaths[0])
+            print("Muscle cache written to {0} ({1})".format(filePaths[0], infoPath))
+
+    def play_muscle_cache():
+        filePaths = mc.fileDialog2(fileFilter="Muscle Cache (*.npy)", fileMode=1, caption="Play Muscle Cache")
+        if filePaths:
+            startCachedPlayback(filePaths[0])
+
+    mc.button(label="Bake Muscle Cache...", command=lambda _: bake_muscle_cache())
+    mc.button(label="Play From Cache...", command=lambda _: play_muscle_cache())
+    mc.button(label="Stop Cached Playback", command=lambda _: stopCachedPlayback())
+
+    # Muscle LOD: how much of every muscle in the scene evaluates, for faster playback while animating
+    lod_menu = mc.optionMenu(label="Muscle LOD", changeCommand=lambda level: setMuscleLod(level))
+    for level in MUSCLE_LOD_LEVELS:
+        mc.menuItem(label=level)
+    mc.optionMenu(lod_menu, edit=True, value=getMuscleLod())
+
+    # Profiling
+    mc.checkBox(label="Profile Muscle Phases", value=profiler.enabled,
+                changeCommand=lambda enabled: setProfiling(enabled))
+    mc.button(label="Show Profile", command=lambda _: show_profile_ui())
+
+    
+    mc.showWindow(window)
+
+def show_profile_ui():
+    if mc.window("muscleProfileUI", exists=True):
+        mc.deleteUI("muscleProfileUI", window=True)
+
+    window = mc.window("muscleProfileUI", title="Muscle Profile", widthHeight=(520, 300))
+    mc.columnLayout(adjustableColumn=True)
+    profile_table = mc.scrollField(text=profiler.formatTable(), editable=False, wordWrap=False, height=240,
+                                   font="fixedWidthFont")
+
+    def reset_profile():
+        profiler.reset()
+        mc.scrollField(profile_table, edit=True, text=profiler.formatTable())
+
+    def save_profile():
+        filePaths = mc.fileDialog2(fileFilter="JSON (*.json)", fileMode=0, caption="Save Muscle Profile")
+        if filePaths:
+            profiler.dump(filePaths[0])
+
+    mc.button(label="Reset", command=lambda _: reset_profile())
+    mc.button(label="Save JSON...", command=lambda _: save_profile())
+    mc.showWindow(window)
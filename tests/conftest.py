@@ -0,0 +1,9 @@
+# Tests run on plain Python. muscleGenerator.geometry needs numpy only, anything importing maya uses the recording
+# stand-in in benchmarks/fake_maya (see FAKE_MAYA_DIR)
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_MAYA_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'fake_maya')
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,84 @@
+# muscleGenerator.farm end to end on the maya stand-in in benchmarks/fake_maya: two scenes, two spawned workers.
+# The stand-in pickles scenes on save, so a scene written here opens in the worker processes
+import json
+import os
+import sys
+
+import pytest
+
+from conftest import FAKE_MAYA_DIR
+
+if FAKE_MAYA_DIR not in sys.path:
+    sys.path.insert(0, FAKE_MAYA_DIR)
+
+from maya import _fake, cmds as mc
+from muscleGenerator import core, farm
+
+
+def saveCharacterScene(scenePath, height):
+    #attach joints on both sides and one muscle on the right that the farm refreshes
+    _fake.reset()
+    core.muscleRegistry = None
+    for side, sign in (('Left', 1.0), ('Right', -1.0)):
+        mc.select(clear=True)
+        mc.joint(name='{0}_up'.format(side), position=(sign, height, 0.0))
+        mc.select(clear=True)
+        mc.joint(name='{0}_lo'.format(side), position=(sign, 0.0, 0.0))
+    core.MuscleJointGroup.createFromAttachObjects('Right_extra', 'Right_up', 'Right_lo', 0.5, 1.5).update()
+    mc.file(rename=scenePath)
+    mc.file(save=True, force=True)
+
+
+@pytest.fixture
+def farmScenes(tmp_path):
+    scenes = [str(tmp_path / 'char{0}.ma'.format(index)) for index in range(2)]
+    for index, scenePath in enumerate(scenes):
+        saveCharacterScene(scenePath, 10.0 + index)
+    specPath = str(tmp_path / 'specs.json')
+    with open(specPath, 'w') as specFile:
+        json.dump([{'name': 'Left_bi', 'originAttachObj': 'Left_up', 'insertionAttachObj': 'Left_lo',
+                    'originPos': [1, 9, 0], 'insertionPos': [1, 1, 0]}], specFile)
+    yield scenes, specPath
+    _fake.reset()
+    core.muscleRegistry = None
+
+
+def test_farmBuildsEveryScene(tmp_path, farmScenes):
+    scenes, specPath = farmScenes
+    outputDir = tmp_path / 'out'
+    reportPath = str(tmp_path / 'report.json')
+    exitCode = farm.main(scenes + ['--spec', specPath, '--mirror', 'Left', '--output-dir', str(outputDir),
+                                   '--workers', '2', '--report', reportPath])
+    assert exitCode == 0
+
+    with open(reportPath) as reportFile:
+        report = json.load(reportFile)
+    assert report['workers'] == 2
+    assert report['failed'] == []
+    assert [result['scene'] for result in report['scenes']] == scenes
+    for result in report['scenes']:
+        assert result['status'] == 'ok'
+        assert result['failed'] == []
+        assert set(result['timings']) == {'open', 'build', 'refresh', 'save'}
+
+    # the saved scenes hold the spec muscle, its mirror and the refreshed muscle that was already there
+    for scenePath in scenes:
+        outputPath = str(outputDir / os.path.basename(scenePath))
+        assert os.path.exists(outputPath)
+        mc.file(outputPath, open=True, force=True)
+        dataNodes = sorted(node for node in mc.ls() if node.endswith('_dataNode'))
+        assert dataNodes == ['Left_bi_dataNode', 'Right_bi_dataNode', 'Right_extra_dataNode']
+
+
+def test_farmReportsMissingScene(tmp_path, farmScenes):
+    scenes, specPath = farmScenes
+    missing = str(tmp_path / 'missing.ma')
+    exitCode = farm.main([scenes[0], missing, '--spec', specPath, '--output-dir', str(tmp_path / 'out'),
+                          '--workers', '2', '--report', str(tmp_path / 'report.json')])
+    assert exitCode == 1
+
+    with open(str(tmp_path / 'report.json')) as reportFile:
+        report = json.load(reportFile)
+    statuses = dict((result['scene'], result['status']) for result in report['scenes'])
+    assert statuses == {scenes[0]: 'ok', missing: 'error'}
+    assert report['failed'] == [missing]
@@ -0,0 +1,178 @@
+# muscleGenerator.geometry against hand computed values, no maya needed
+import numpy as np
+import pytest
+
+from muscleGenerator import geometry as muscleGeometry
+
+
+def rotationMatrix(rotation):
+    #row matrix of xyz euler angles (X applied first), the inverse of frameRotations
+    rotateX, rotateY, rotateZ = rotation
+    cx, sx, cy, sy, cz, sz = (np.cos(rotateX), np.sin(rotateX), np.cos(rotateY), np.sin(rotateY),
+                              np.cos(rotateZ), np.sin(rotateZ))
+    xMatrix = np.array([[1.0, 0.0, 0.0], [0.0, cx, sx], [0.0, -sx, cx]])
+    yMatrix = np.array([[cy, 0.0, -sy], [0.0, 1.0, 0.0], [sy, 0.0, cy]])
+    zMatrix = np.array([[cz, sz, 0.0], [-sz, cz, 0.0], [0.0, 0.0, 1.0]])
+    return xMatrix.dot(yMatrix).dot(zMatrix)
+
+
+# Rest length and aim
+# -----------------------------------
+def test_restLengths():
+    lengths = muscleGeometry.restLengths([[0, 0, 0], [1, 2, 2], [5, 5, 5]], [[3, 4, 0], [1, 2, 2], [5, 5, 6]])
+    np.testing.assert_allclose(lengths, [5.0, 0.0, 1.0])
+
+
+def test_restLengthsSinglePosition():
+    np.testing.assert_allclose(muscleGeometry.restLengths([0, 0, 0], [0, 0, 2]), [2.0])
+
+
+def test_aimFramesAreOrthonormalAndAimAtInsertion():
+    rng = np.random.default_rng(3)
+    origins = rng.normal(size=(50, 3))
+    insertions = origins + rng.normal(size=(50, 3))
+    frames = muscleGeometry.aimFrames(origins, insertions)
+    aims = insertions - origins
+    np.testing.assert_allclose(frames[:, 0], aims/np.linalg.norm(aims, axis=1)[:, None], atol=1e-12)
+    np.testing.assert_allclose(np.einsum('nij,nkj->nik', frames, frames), np.broadcast_to(np.eye(3), (50, 3, 3)),
+                               atol=1e-12)
+    #right handed, and Y leans towards the world up
+    np.testing.assert_allclose(np.linalg.det(frames), 1.0)
+    assert np.all(frames[:, 1, 1] >= 0.0)
+
+
+def test_aimFramesAlongX():
+    frames = muscleGeometry.aimFrames([0, 0, 0], [4, 0, 0])
+    np.testing.assert_allclose(frames[0], np.eye(3), atol=1e-12)
+
+
+def test_aimFramesZeroLengthKeepsWorldAxes():
+    frames = muscleGeometry.aimFrames([[1, 2, 3]], [[1, 2, 3]])
+    np.testing.assert_allclose(frames[0], np.eye(3), atol=1e-12)
+    np.testing.assert_allclose(muscleGeometry.aimRotations([[1, 2, 3]], [[1, 2, 3]]), [[0.0, 0.0, 0.0]], atol=1e-12)
+
+
+@pytest.mark.parametrize('insertion', [(0, 5, 0), (0, -5, 0)])
+def test_aimFramesParallelToUpUsesFallback(insertion):
+    frames = muscleGeometry.aimFrames([0, 0, 0], insertion)[0]
+    assert np.all(np.isfinite(frames))
+    np.testing.assert_allclose(frames[0], np.sign(insertion[1])*np.array([0.0, 1.0, 0.0]), atol=1e-12)
+    np.testing.assert_allclose(frames.dot(frames.T), np.eye(3), atol=1e-12)
+    #the fallback up is world Z
+    np.testing.assert_allclose(frames[2], np.cross(frames[0], muscleGeometry.FALLBACK_UP), atol=1e-12)
+
+
+def test_aimFramesPerMuscleUp():
+    frames = muscleGeometry.aimFrames([[0, 0, 0], [0, 0, 0]], [[1, 0, 0], [1, 0, 0]], up=[[0, 1, 0], [0, 0, 1]])
+    np.testing.assert_allclose(frames[0, 1], [0, 1, 0], atol=1e-12)
+    np.testing.assert_allclose(frames[1, 1], [0, 0, 1], atol=1e-12)
+
+
+def test_aimRotationsRebuildTheFrames():
+    rng = np.random.default_rng(5)
+    origins = rng.normal(size=(30, 3))
+    insertions = origins + rng.normal(size=(30, 3))
+    frames = muscleGeometry.aimFrames(origins, insertions)
+    rotations = muscleGeometry.aimRotations(origins, insertions)
+    for frame, rotation in zip(frames, rotations):
+        np.testing.assert_allclose(rotationMatrix(rotation), frame, atol=1e-9)
+
+
+def test_aimRotationsKnownAngles():
+    rotations = muscleGeometry.aimRotations([[0, 0, 0], [0, 0, 0], [0, 0, 0]], [[1, 1, 0], [0, 0, -3], [0, 3, 0]])
+    #45 degrees up around Z, along -Z 90 degrees around Y. Straight up takes world Z as up: Y points along Z
+    np.testing.assert_allclose(np.degrees(rotations[0]), [0.0, 0.0, 45.0], atol=1e-9)
+    np.testing.assert_allclose(np.degrees(rotations[1]), [0.0, 90.0, 0.0], atol=1e-9)
+    np.testing.assert_allclose(np.degrees(rotations[2]), [90.0, 0.0, 90.0], atol=1e-9)
+
+
+# Mirror
+# -----------------------------------
+@pytest.mark.parametrize('axis, expected', [('x', [-1, 2, 3]), ('y', [1, -2, 3]), ('z', [1, 2, -3])])
+def test_mirrorPositions(axis, expected):
+    np.testing.assert_allclose(muscleGeometry.mirrorPositions([1, 2, 3], axis), [expected])
+
+
+def test_mirrorPositionsTwiceIsIdentity():
+    positions = np.random.default_rng(0).normal(size=(10, 3))
+    np.testing.assert_allclose(muscleGeometry.mirrorPositions(muscleGeometry.mirrorPositions(positions)), positions)
+
+
+def test_mirrorPositionsInvalidAxis():
+    with pytest.raises(ValueError):
+        muscleGeometry.mirrorPositions([1, 2, 3], 'w')
+
+
+# Volume
+# -----------------------------------
+def test_volumeRatiosClampToFactors():
+    ratios = muscleGeometry.volumeRatios([5.0, 10.0, 20.0, 1.0], 10.0, 0.5, 1.5)
+    np.testing.assert_allclose(ratios, [0.5, 1.0, 1.5, 0.5])
+
+
+def test_volumeRatiosZeroRestLength():
+    ratios = muscleGeometry.volumeRatios([0.0, 1.2], [0.0, 0.0], 0.5, 1.5)
+    assert np.all(np.isfinite(ratios))
+    np.testing.assert_allclose(ratios, [0.5, 1.2])
+
+
+def test_volumeScalesKeepVolume():
+    ratios = np.array([0.5, 1.0, 1.5, 2.0])
+    scales = muscleGeometry.volumeScales(ratios)
+    np.testing.assert_allclose(scales[:, 0], ratios)
+    np.testing.assert_allclose(scales[:, 1], scales[:, 2])
+    np.testing.assert_allclose(np.prod(scales, axis=1), 1.0)
+
+
+def test_volumeTranslatesBlendToOffsets():
+    ratios = np.array([1.0, 1.25, 1.5, 2.0, 0.75, 0.5])
+    translates = muscleGeometry.volumeTranslates(ratios, 0.5, 1.5, [9, 2, 4], [9, -1, 0])
+    np.testing.assert_allclose(translates, [[0, 0, 0], [0, 1, 2], [0, 2, 4], [0, 2, 4], [0, -0.5, 0], [0, -1, 0]])
+
+
+def test_volumeTranslatesWithoutRange():
+    #factors of 1 leave nothing to blend over, the offsets never apply
+    translates = muscleGeometry.volumeTranslates(np.array([0.5, 1.0, 2.0]), 1.0, 1.0, [0, 2, 4], [0, -1, 0])
+    np.testing.assert_allclose(translates, 0.0)
+
+
+def test_volumeKeysMatchScalesAndTranslates():
+    driverValues, scales, translates = muscleGeometry.volumeKeys([10.0, 4.0], 0.5, 1.5, [0, 1, 2], [0, -1, 0])
+    np.testing.assert_allclose(driverValues, [[10, 15, 5], [4, 6, 2]])
+    np.testing.assert_allclose(scales[0], muscleGeometry.volumeScales(np.array([1.0, 1.5, 0.5])))
+    np.testing.assert_allclose(translates[1], [[0, 0, 0], [0, 1, 2], [0, -1, 0]])
+
+
+# Segments
+# -----------------------------------
+@pytest.mark.parametrize('profile', muscleGeometry.SEGMENT_PROFILES)
+def test_segmentProfileNamed(profile):
+    positions, weights = muscleGeometry.segmentProfile(5, profile)
+    np.testing.assert_allclose(positions, [0.1, 0.3, 0.5, 0.7, 0.9])
+    assert weights.max() == pytest.approx(1.0)
+    #every named profile is symmetric around the middle of the muscle
+    np.testing.assert_allclose(weights, weights[::-1])
+
+
+def test_segmentProfileValues():
+    np.testing.assert_allclose(muscleGeometry.segmentProfile(4, 'linear')[1], [1.0/3.0, 1.0, 1.0, 1.0/3.0])
+    np.testing.assert_allclose(muscleGeometry.segmentProfile(3, 'flat')[1], [1.0, 1.0, 1.0])
+    positions, weights = muscleGeometry.segmentProfile(1, 'smooth')
+    np.testing.assert_allclose(positions, [0.5])
+    np.testing.assert_allclose(weights, [1.0])
+
+
+def test_segmentProfileFromWeights():
+    positions, weights = muscleGeometry.segmentProfile(3, [0.0, 2.0])
+    #sampled at 1/6, 1/2 and 5/6 of the way from 0 to 2, then scaled so the strongest is 1
+    np.testing.assert_allclose(weights, [0.2, 0.6, 1.0])
+
+
+def test_segmentProfileAllZeroWeights():
+    np.testing.assert_allclose(muscleGeometry.segmentProfile(3, [0.0, 0.0])[1], [0.0, 0.0, 0.0])
+
+
+@pytest.mark.parametrize('segmentCount, profile', [(0, 'smooth'), (3, 'wobbly'), (3, []), (3, [[1.0]])])
+def test_segmentProfileInvalid(segmentCount, profile):
+    with pytest.raises(ValueError):
+        muscleGeometry.segmentProfile(segmentCount, profile)
@@ -0,0 +1,77 @@
+# muscleGenerator.core.MuscleRegistry lookups on the maya stand-in in benchmarks/fake_maya, with the muscle's nodes
+# moved into a namespace the way a referenced rig brings them in
+import sys
+
+import pytest
+
+from conftest import FAKE_MAYA_DIR
+
+if FAKE_MAYA_DIR not in sys.path:
+    sys.path.insert(0, FAKE_MAYA_DIR)
+
+from maya import _fake, cmds as mc
+from muscleGenerator import core, dataNode
+
+
+@pytest.fixture
+def namespacedMuscle():
+    #a root namespace muscle and one whose data node, joints and attach objects sit in rig:
+    _fake.reset()
+    core.muscleRegistry = None
+    for prefix in ('', 'rig:'):
+        mc.select(clear=True)
+        upper = mc.joint(name='{0}Left_up'.format(prefix), position=(1.0, 10.0, 0.0))
+        mc.select(clear=True)
+        lower = mc.joint(name='{0}Left_lo'.format(prefix), position=(1.0, 0.0, 0.0))
+        muscleName = 'Left_root' if not prefix else 'Left_ref'
+        muscle = core.MuscleJointGroup.createFromAttachObjects(muscleName, upper, lower, 0.5, 1.5)
+        muscle.update()
+        if prefix:
+            mc.rename(core.getDataNodeName(muscleName), prefix + core.getDataNodeName(muscleName))
+    core.muscleRegistry = None
+    yield
+    _fake.reset()
+    core.muscleRegistry = None
+
+
+def test_registryFindsNamespacedDataNodes(namespacedMuscle):
+    registry = core.MuscleRegistry()
+    assert registry.getDataNode('Left_ref') == 'rig:' + core.getDataNodeName('Left_ref')
+    assert registry.getDataNode('Left_root') == core.getDataNodeName('Left_root')
+    assert registry.muscleNames() == ['Left_ref', 'Left_root']
+    assert 'rig:' + core.getDataNodeName('Left_ref') in registry.getDataNodesBySide('Left')
+    assert registry.getDataNodesByAttachObj('rig:Left_up') == ['rig:' + core.getDataNodeName('Left_ref')]
+
+
+def test_registryRehydratesNamespacedMuscles(namespacedMuscle):
+    muscle = core.getMuscleRegistry().getMuscle('Left_ref')
+    assert muscle.muscleName == 'Left_ref'
+    assert muscle.originAttachObj == 'rig:Left_up'
+    assert sorted(muscle.muscleName for muscle in core.getMuscleRegistry().getMuscles()) == ['Left_ref', 'Left_root']
+
+
+def makeLegacyDataNode(dataNodeName, muscleName):
+    #the version 0 layout, plain attributes and no members
+    legacyNode = mc.createNode("network", name=dataNodeName)
+    for attr in ("name", "type"):
+        mc.addAttr(legacyNode, longName=attr, dataType="string")
+    for attr in ("restLength", "compressionFactor", "stretchFactor"):
+        mc.addAttr(legacyNode, longName=attr, attributeType="double")
+    for attr in ("compressionOffset", "stretchOffset"):
+        mc.addAttr(legacyNode, longName=attr, attributeType="float3")
+        for axis in "XYZ":
+            mc.addAttr(legacyNode, longName=attr + axis, attributeType="float", parent=attr)
+    mc.setAttr("{0}.name".format(legacyNode), muscleName, type="string")
+    mc.setAttr("{0}.type".format(legacyNode), "muscleJointGroup", type="string")
+    mc.setAttr("{0}.restLength".format(legacyNode), 10.0)
+    mc.setAttr("{0}.compressionFactor".format(legacyNode), 0.5)
+    mc.setAttr("{0}.stretchFactor".format(legacyNode), 1.5)
+    return legacyNode
+
+
+def test_migrateNamespacedLegacyDataNodes(namespacedMuscle):
+    makeLegacyDataNode('rig:Left_old_dataNode', 'Left_old')
+    assert dataNode.migrateLegacyDataNodes() == ['rig:' + core.getDataNodeName('Left_old')]
+    data, members = dataNode.readDataNode('rig:' + core.getDataNodeName('Left_old'))
+    assert data['name'] == 'Left_old' and data['restLength'] == 10.0
+    assert core.MuscleRegistry().getDataNode('Left_old') == 'rig:' + core.getDataNodeName('Left_old')
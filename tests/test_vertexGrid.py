@@ -0,0 +1,188 @@
+# muscleGenerator.geometry's VertexGrid queries and capsule weights against brute force distance matrices, no maya
+import numpy as np
+import pytest
+
+from muscleGenerator import geometry as muscleGeometry
+
+
+def randomMesh(rng):
+    return rng.normal(size=(600, 3))*[4.0, 2.0, 1.0]
+
+
+def flatMesh(rng):
+    #a plane with all Z equal, the grid gets no extent along Z
+    return np.c_[rng.uniform(-5.0, 5.0, size=(400, 2)), np.zeros(400)]
+
+
+def collinearMesh(rng):
+    return np.outer(rng.uniform(-5.0, 5.0, size=200), [1.0, 2.0, -0.5])
+
+
+def singleVertexMesh(rng):
+    return np.array([[1.0, -2.0, 0.5]])
+
+
+MESHES = [randomMesh, flatMesh, collinearMesh, singleVertexMesh]
+
+
+def bruteSegmentDistances(vertices, starts, ends):
+    #(segments, vertices) distance matrix, one segment at a time
+    distances = np.empty((len(starts), len(vertices)))
+    for index, (start, end) in enumerate(zip(starts, ends)):
+        axis = end - start
+        length = axis.dot(axis)
+        along = np.clip((vertices - start).dot(axis)/length, 0.0, 1.0) if length > 0.0 else np.zeros(len(vertices))
+        distances[index] = np.linalg.norm(vertices - (start + along[:, None]*axis), axis=1)
+    return distances
+
+
+def makeSegments(rng, vertices, count=25, maxRadius=0.6):
+    #segments around the mesh plus one of zero length, radii from nothing to maxRadius of the mesh size
+    center = vertices.mean(axis=0)
+    scale = max(float(np.ptp(vertices, axis=0).max()), 1.0)
+    starts = center + rng.normal(size=(count, 3))*scale*0.5
+    ends = starts + rng.normal(size=(count, 3))*scale*0.3
+    ends[0] = starts[0]
+    radii = rng.uniform(0.0, maxRadius, size=count)*scale
+    return starts, ends, radii
+
+
+# Nearest vertex
+# -----------------------------------
+@pytest.mark.parametrize('mesh', MESHES)
+def test_nearestMatchesBruteForce(mesh):
+    rng = np.random.default_rng(11)
+    vertices = mesh(rng)
+    grid = muscleGeometry.VertexGrid(vertices)
+    #points on and around the mesh, and far outside of it
+    points = np.concatenate([vertices[:20] + rng.normal(size=(min(20, len(vertices)), 3))*0.1,
+                             rng.normal(size=(100, 3))*5.0, rng.normal(size=(10, 3))*200.0])
+    indices, distances = grid.nearest(points)
+    bruteDistances = np.linalg.norm(points[:, None, :] - vertices[None, :, :], axis=2)
+    np.testing.assert_allclose(distances, bruteDistances.min(axis=1), atol=1e-9)
+    #ties may pick either vertex, the picked one has to be at the nearest distance
+    np.testing.assert_allclose(bruteDistances[np.arange(len(points)), indices], distances, atol=1e-9)
+
+
+def test_nearestOnVertices():
+    vertices = randomMesh(np.random.default_rng(5))
+    indices, distances = muscleGeometry.VertexGrid(vertices).nearest(vertices)
+    np.testing.assert_array_equal(indices, np.arange(len(vertices)))
+    np.testing.assert_allclose(distances, 0.0)
+
+
+def test_vertexGridNeedsVertices():
+    with pytest.raises(ValueError):
+        muscleGeometry.VertexGrid(np.zeros((0, 3)))
+
+
+# Vertices near segments
+# -----------------------------------
+@pytest.mark.parametrize('mesh', MESHES)
+@pytest.mark.parametrize('maxPairs', [4000000, 1])
+def test_verticesNearSegmentsMatchesBruteForce(mesh, maxPairs):
+    #maxPairs 1 puts every segment in a chunk of its own
+    rng = np.random.default_rng(7)
+    vertices = mesh(rng)
+    starts, ends, radii = makeSegments(rng, vertices)
+    grid = muscleGeometry.VertexGrid(vertices)
+    segmentIds, vertexIds, distances = grid.verticesNearSegments(starts, ends, radii, maxPairs=maxPairs)
+
+    bruteDistances = bruteSegmentDistances(vertices, starts, ends)
+    bruteSegmentIds, bruteVertexIds = np.nonzero(bruteDistances <= radii[:, None])
+    assert np.all(np.diff(segmentIds) >= 0)
+    order = np.lexsort((vertexIds, segmentIds))
+    np.testing.assert_array_equal(segmentIds[order], bruteSegmentIds)
+    np.testing.assert_array_equal(vertexIds[order], bruteVertexIds)
+    np.testing.assert_allclose(distances[order], bruteDistances[bruteSegmentIds, bruteVertexIds], atol=1e-9)
+
+
+def test_verticesNearSegmentsNothingInReach():
+    grid = muscleGeometry.VertexGrid(randomMesh(np.random.default_rng(2)))
+    segmentIds, vertexIds, distances = grid.verticesNearSegments([[100.0, 0.0, 0.0]], [[110.0, 0.0, 0.0]], 1.0)
+    assert len(segmentIds) == len(vertexIds) == len(distances) == 0
+
+
+# Capsule weights
+# -----------------------------------
+def bruteCapsuleWeights(vertices, starts, ends, radii, falloff, jointIds=None):
+    #(owners, vertices) weight matrix, a joint takes its closest capsule
+    distances = bruteSegmentDistances(vertices, starts, ends)
+    falloffs = radii*falloff
+    blend = np.clip((distances - radii[:, None])/np.maximum(falloffs, muscleGeometry.EPSILON)[:, None], 0.0, 1.0)
+    weights = 1.0 - blend*blend*(3.0 - 2.0*blend)
+    weights[weights <= muscleGeometry.EPSILON] = 0.0
+    if jointIds is None:
+        return weights
+    jointWeights = np.zeros((max(jointIds) + 1, len(vertices)))
+    for capsuleId, jointId in enumerate(jointIds):
+        jointWeights[jointId] = np.maximum(jointWeights[jointId], weights[capsuleId])
+    return jointWeights
+
+
+def sparseToDense(vertexIds, ownerIds, weights, shape):
+    dense = np.zeros(shape)
+    dense[ownerIds, vertexIds] = weights
+    return dense
+
+
+@pytest.mark.parametrize('mesh', MESHES)
+@pytest.mark.parametrize('falloff', [0.0, 1.0, 2.5])
+def test_capsuleWeightsMatchBruteForce(mesh, falloff):
+    rng = np.random.default_rng(13)
+    vertices = mesh(rng)
+    starts, ends, radii = makeSegments(rng, vertices)
+    grid = muscleGeometry.VertexGrid(vertices)
+    vertexIds, capsuleIds, weights = muscleGeometry.capsuleWeights(grid, starts, ends, radii, falloff=falloff)
+    expected = bruteCapsuleWeights(vertices, starts, ends, radii, falloff)
+    assert np.all(weights > 0.0) and np.all(weights <= 1.0)
+    np.testing.assert_allclose(sparseToDense(vertexIds, capsuleIds, weights, expected.shape), expected, atol=1e-9)
+
+
+def test_capsuleWeightsPerJoint():
+    rng = np.random.default_rng(17)
+    vertices = randomMesh(rng)
+    origins = rng.normal(size=(4, 3))*2.0
+    insertions = origins + rng.normal(size=(4, 3))*3.0
+    centers = (origins + insertions)*0.5 + rng.normal(size=(4, 3))*0.5
+    starts, ends, muscleIds, jointIds = muscleGeometry.capsuleSegments(origins, insertions, centers, [1, 3, 2, 4])
+    radii = np.full(len(starts), 1.5)
+    grid = muscleGeometry.VertexGrid(vertices)
+    vertexIds, ownerIds, weights = muscleGeometry.capsuleWeights(grid, starts, ends, radii, jointIds=jointIds)
+    #one weight per vertex and joint
+    pairs = vertexIds*(jointIds.max() + 1) + ownerIds
+    assert len(np.unique(pairs)) == len(pairs)
+    expected = bruteCapsuleWeights(vertices, starts, ends, radii, 1.0, jointIds)
+    np.testing.assert_allclose(sparseToDense(vertexIds, ownerIds, weights, expected.shape), expected, atol=1e-9)
+
+
+# Blending
+# -----------------------------------
+@pytest.mark.parametrize('mesh', MESHES)
+def test_blendCapsuleWeightsSumToOne(mesh):
+    rng = np.random.default_rng(19)
+    vertices = mesh(rng)
+    #thinner capsules so some vertices only get falloff, and one right on the first vertex
+    starts, ends, radii = makeSegments(rng, vertices, count=60, maxRadius=0.2)
+    starts[1] = ends[1] = vertices[0]
+    grid = muscleGeometry.VertexGrid(vertices)
+    vertexIds, capsuleIds, weights = muscleGeometry.capsuleWeights(grid, starts, ends, radii)
+    blended = muscleGeometry.blendCapsuleWeights(vertexIds, weights, len(vertices))
+    totals = np.bincount(vertexIds, weights=weights, minlength=len(vertices))
+    blendedTotals = np.bincount(vertexIds, weights=blended, minlength=len(vertices))
+    #a vertex inside a capsule, or with overlapping capsules adding up past 1, gives the capsules all of it
+    np.testing.assert_allclose(blendedTotals[totals >= 1.0], 1.0)
+    #the falloff alone keeps its weight, the rest stays with the old influences
+    np.testing.assert_allclose(blendedTotals[totals < 1.0], totals[totals < 1.0])
+    assert np.all(blendedTotals <= 1.0 + 1e-12)
+    #overlapping capsules share in proportion to their weights
+    shares = blended/np.where(weights > 0.0, weights, 1.0)
+    np.testing.assert_allclose(shares, np.minimum(totals[vertexIds], 1.0)/totals[vertexIds])
+
+
+def test_blendCapsuleWeightsStrength():
+    vertexIds = np.array([0, 0, 1, 2, 2])
+    weights = np.array([1.0, 1.0, 0.5, 0.25, 0.25])
+    blended = muscleGeometry.blendCapsuleWeights(vertexIds, weights, 4, strength=0.6)
+    np.testing.assert_allclose(blended, [0.3, 0.3, 0.3, 0.15, 0.15])
+    np.testing.assert_allclose(np.bincount(vertexIds, weights=blended, minlength=4), [0.6, 0.3, 0.3, 0.0])